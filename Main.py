@@ -1,25 +1,39 @@
+import tempfile
+import time
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-
-# Set up the page
-st.set_page_config(
-    page_title="WHO AWaRe Drug Classifier",
-    page_icon="💊",
-    layout="wide"
-)
-
-# Title and description
-st.title("WHO AWaRe Antibiotic Classification")
-st.markdown("""
+
+from aware import metrics
+from aware.cards import CARDS_PER_PAGE, render_cards
+from aware.export import EXPORT_FORMATS, export_file, export_label, export_mime, export_name, rewound
+from aware.reference import get_reference
+from aware.styling import PAGE_SIZES, page_count
+
+# Stage timings are exported on AWARE_METRICS_PORT; AWARE_PROFILE=cprofile dumps a profile per rerun
+metrics.serve_from_env()
+profiler = metrics.start_profile()
+rerun_started = time.perf_counter()
+
+try:
+    # Set up the page
+    st.set_page_config(
+        page_title="WHO AWaRe Drug Classifier",
+        page_icon="💊",
+        layout="wide"
+    )
+
+    # Title and description
+    st.title("WHO AWaRe Antibiotic Classification")
+    st.markdown("""
 This app classifies antibiotics into the WHO AWaRe categories (Access, Watch, Reserve) based on the 2023 WHO classification.
 Select drugs from the list or upload a file to get their classification.
 """)
 
-# Sidebar for information
-with st.sidebar:
-    st.header("About AWaRe Classification")
-    st.markdown("""
+    # Sidebar for information
+    with st.sidebar:
+        st.header("About AWaRe Classification")
+        st.markdown("""
     **AWaRe Categories:**
     - **🟢 Access**: First or second choice empiric treatment options
     - **🟡 Watch**: Higher resistance potential, key stewardship targets
@@ -32,540 +46,418 @@ with st.sidebar:
     *Source: [WHO-MHP-HPS-EML-2023.04](https://www.who.int/publications/i/item/WHO-MHP-HPS-EML-2023.04)*
     """)
 
-    st.divider()
-    st.caption("Developed using WHO drug classification data")
-
-
-# Create drug database from the provided data
-def create_drug_database():
-    """Create drug database from the provided Excel text content"""
-
-    # Full list of drugs from the Excel file
-    data = [
-        # Format: Antibiotic, Class, ATC, Category, EML
-        ["Amikacin", "Aminoglycosides", "J01GB06", "Access", "Yes"],
-        ["Amoxicillin", "Penicillins", "J01CA04", "Access", "Yes"],
-        ["Amoxicillin/clavulanic-acid", "Beta-lactam/beta-lactamase-inhibitor", "J01CR02", "Access", "Yes"],
-        ["Ampicillin", "Penicillins", "J01CA01", "Access", "Yes"],
-        ["Ampicillin/sulbactam", "Beta-lactam/beta-lactamase-inhibitor", "J01CR01", "Access", "No"],
-        ["Arbekacin", "Aminoglycosides", "J01GB12", "Watch", "No"],
-        ["Aspoxicillin", "Penicillins", "J01CA19", "Watch", "No"],
-        ["Azidocillin", "Penicillins", "J01CE04", "Access", "No"],
-        ["Azithromycin", "Macrolides", "J01FA10", "Watch", "Yes"],
-        ["Azlocillin", "Penicillins", "J01CA09", "Watch", "No"],
-        ["Aztreonam", "Monobactams", "J01DF01", "Reserve", "No"],
-        ["Bacampicillin", "Penicillins", "J01CA06", "Access", "No"],
-        ["Bekanamycin", "Aminoglycosides", "J01GB13", "Watch", "No"],
-        ["Benzathine-benzylpenicillin", "Penicillins", "J01CE08", "Access", "Yes"],
-        ["Benzylpenicillin", "Penicillins", "J01CE01", "Access", "Yes"],
-        ["Biapenem", "Carbapenems", "J01DH05", "Watch", "No"],
-        ["Brodimoprim", "Trimethoprim-derivatives", "J01EA02", "Access", "No"],
-        ["Carbenicillin", "Penicillins", "J01CA03", "Watch", "No"],
-        ["Carindacillin", "Penicillins", "J01CA05", "Watch", "No"],
-        ["Carumonam", "Monobactams", "J01DF02", "Reserve", "No"],
-        ["Cefacetrile", "First-generation-cephalosporins", "J01DB10", "Access", "No"],
-        ["Cefaclor", "Second-generation-cephalosporins", "J01DC04", "Watch", "No"],
-        ["Cefadroxil", "First-generation-cephalosporins", "J01DB05", "Access", "No"],
-        ["Cefalexin", "First-generation-cephalosporins", "J01DB01", "Access", "Yes"],
-        ["Cefaloridine", "First-generation-cephalosporins", "J01DB02", "Access", "No"],
-        ["Cefalotin", "First-generation-cephalosporins", "J01DB03", "Access", "No"],
-        ["Cefamandole", "Second-generation-cephalosporins", "J01DC03", "Watch", "No"],
-        ["Cefapirin", "First-generation-cephalosporins", "J01DB08", "Access", "No"],
-        ["Cefatrizine", "First-generation-cephalosporins", "J01DB07", "Access", "No"],
-        ["Cefazedone", "First-generation-cephalosporins", "J01DB06", "Access", "No"],
-        ["Cefazolin", "First-generation-cephalosporins", "J01DB04", "Access", "Yes"],
-        ["Cefbuperazone", "Second-generation-cephalosporins", "J01DC13", "Watch", "No"],
-        ["Cefcapene-pivoxil", "Third-generation-cephalosporins", "J01DD17", "Watch", "No"],
-        ["Cefdinir", "Third-generation-cephalosporins", "J01DD15", "Watch", "No"],
-        ["Cefditoren-pivoxil", "Third-generation-cephalosporins", "J01DD16", "Watch", "No"],
-        ["Cefepime", "Fourth-generation-cephalosporins", "J01DE01", "Watch", "No"],
-        ["Cefetamet-pivoxil", "Third-generation-cephalosporins", "J01DD10", "Watch", "No"],
-        ["Cefiderocol", "Other-cephalosporins", "J01DI04", "Reserve", "Yes"],
-        ["Cefixime", "Third-generation-cephalosporins", "J01DD08", "Watch", "Yes"],
-        ["Cefmenoxime", "Third-generation-cephalosporins", "J01DD05", "Watch", "No"],
-        ["Cefmetazole", "Second-generation-cephalosporins", "J01DC09", "Watch", "No"],
-        ["Cefminox", "Second-generation-cephalosporins", "J01DC12", "Watch", "No"],
-        ["Cefodizime", "Third-generation-cephalosporins", "J01DD09", "Watch", "No"],
-        ["Cefonicid", "Second-generation-cephalosporins", "J01DC06", "Watch", "No"],
-        ["Cefoperazone", "Third-generation-cephalosporins", "J01DD12", "Watch", "No"],
-        ["Ceforanide", "Second-generation-cephalosporins", "J01DC11", "Watch", "No"],
-        ["Cefoselis", "Fourth-generation-cephalosporins", "to be assigned", "Watch", "No"],
-        ["Cefotaxime", "Third-generation-cephalosporins", "J01DD01", "Watch", "Yes"],
-        ["Cefotetan", "Second-generation-cephalosporins", "J01DC05", "Watch", "No"],
-        ["Cefotiam", "Second-generation-cephalosporins", "J01DC07", "Watch", "No"],
-        ["Cefoxitin", "Second-generation-cephalosporins", "J01DC01", "Watch", "No"],
-        ["Cefozopran", "Fourth-generation-cephalosporins", "J01DE03", "Watch", "No"],
-        ["Cefpiramide", "Third-generation-cephalosporins", "J01DD11", "Watch", "No"],
-        ["Cefpirome", "Fourth-generation-cephalosporins", "J01DE02", "Watch", "No"],
-        ["Cefpodoxime-proxetil", "Third-generation-cephalosporins", "J01DD13", "Watch", "No"],
-        ["Cefprozil", "Second-generation-cephalosporins", "J01DC10", "Watch", "No"],
-        ["Cefradine", "First-generation-cephalosporins", "J01DB09", "Access", "No"],
-        ["Cefroxadine", "First-generation-cephalosporins", "J01DB11", "Access", "No"],
-        ["Cefsulodin", "Third-generation-cephalosporins", "J01DD03", "Watch", "No"],
-        ["Ceftaroline-fosamil", "Fifth-generation cephalosporins", "J01DI02", "Reserve", "No"],
-        ["Ceftazidime", "Third-generation-cephalosporins", "J01DD02", "Watch", "Yes"],
-        ["Ceftazidime/avibactam", "Third-generation-cephalosporins", "J01DD52", "Reserve", "Yes"],
-        ["Cefteram-pivoxil", "Third-generation-cephalosporins", "J01DD18", "Watch", "No"],
-        ["Ceftezole", "First-generation-cephalosporins", "J01DB12", "Access", "No"],
-        ["Ceftibuten", "Third-generation-cephalosporins", "J01DD14", "Watch", "No"],
-        ["Ceftizoxime", "Third-generation-cephalosporins", "J01DD07", "Watch", "No"],
-        ["Ceftobiprole-medocaril", "Fifth-generation cephalosporins", "J01DI01", "Reserve", "No"],
-        ["Ceftolozane/tazobactam", "Fifth-generation cephalosporins", "J01DI54", "Reserve", "Yes"],
-        ["Ceftriaxone", "Third-generation-cephalosporins", "J01DD04", "Watch", "Yes"],
-        ["Cefuroxime", "Second-generation-cephalosporins", "J01DC02", "Watch", "Yes"],
-        ["Chloramphenicol", "Amphenicols", "J01BA01", "Access", "Yes"],
-        ["Chlortetracycline", "Tetracyclines", "J01AA03", "Watch", "No"],
-        ["Cinoxacin", "Quinolones", "J01MB06", "Watch", "No"],
-        ["Ciprofloxacin", "Fluoroquinolones", "J01MA02", "Watch", "Yes"],
-        ["Clarithromycin", "Macrolides", "J01FA09", "Watch", "Yes"],
-        ["Clindamycin", "Lincosamides", "J01FF01", "Access", "Yes"],
-        ["Clofoctol", "Phenol derivatives", "J01XX03", "Watch", "No"],
-        ["Clometocillin", "Penicillins", "J01CE07", "Access", "No"],
-        ["Clomocycline", "Tetracyclines", "J01AA11", "Watch", "No"],
-        ["Cloxacillin", "Penicillins", "J01CF02", "Access", "Yes"],
-        ["Colistin_IV", "Polymyxins", "J01XB01", "Reserve", "Yes"],
-        ["Colistin_oral", "Polymyxins", "A07AA10", "Reserve", "No"],
-        ["Dalbavancin", "Glycopeptides", "J01XA04", "Reserve", "No"],
-        ["Dalfopristin/quinupristin", "Streptogramins", "J01FG02", "Reserve", "No"],
-        ["Daptomycin", "Lipopeptides", "J01XX09", "Reserve", "No"],
-        ["Delafloxacin", "Fluoroquinolones", "J01MA23", "Watch", "No"],
-        ["Demeclocycline", "Tetracyclines", "J01AA01", "Watch", "No"],
-        ["Dibekacin", "Aminoglycosides", "J01GB09", "Watch", "No"],
-        ["Dicloxacillin", "Penicillins", "J01CF01", "Access", "Yes"],
-        ["Dirithromycin", "Macrolides", "J01FA13", "Watch", "No"],
-        ["Doripenem", "Carbapenems", "J01DH04", "Watch", "No"],
-        ["Doxycycline", "Tetracyclines", "J01AA02", "Access", "Yes"],
-        ["Enoxacin", "Fluoroquinolones", "J01MA04", "Watch", "No"],
-        ["Epicillin", "Penicillins", "J01CA07", "Access", "No"],
-        ["Eravacycline", "Tetracyclines", "J01AA13", "Reserve", "No"],
-        ["Ertapenem", "Carbapenems", "J01DH03", "Watch", "No"],
-        ["Erythromycin", "Macrolides", "J01FA01", "Watch", "Yes"],
-        ["Faropenem", "Penems", "J01DI03", "Reserve", "No"],
-        ["Fidaxomicin", "Macrolides", "A07AA12", "Watch", "No"],
-        ["Fleroxacin", "Fluoroquinolones", "J01MA08", "Watch", "No"],
-        ["Flomoxef", "Second-generation-cephalosporins", "J01DC14", "Watch", "No"],
-        ["Flucloxacillin", "Penicillins", "J01CF05", "Access", "Yes"],
-        ["Flumequine", "Quinolones", "J01MB07", "Watch", "No"],
-        ["Flurithromycin", "Macrolides", "J01FA14", "Watch", "No"],
-        ["Fosfomycin_IV", "Phosphonics", "J01XX01", "Reserve", "Yes"],
-        ["Fosfomycin_oral", "Phosphonics", "J01XX01", "Watch", "No"],
-        ["Furazidin", "Nitrofuran derivatives", "J01XE03", "Access", "No"],
-        ["Fusidic-acid", "Steroid antibacterials", "J01XC01", "Watch", "No"],
-        ["Garenoxacin", "Fluoroquinolones", "J01MA19", "Watch", "No"],
-        ["Gatifloxacin", "Fluoroquinolones", "J01MA16", "Watch", "No"],
-        ["Gemifloxacin", "Fluoroquinolones", "J01MA15", "Watch", "No"],
-        ["Gentamicin", "Aminoglycosides", "J01GB03", "Access", "Yes"],
-        ["Grepafloxacin", "Fluoroquinolones", "J01MA11", "Watch", "No"],
-        ["Hetacillin", "Penicillins", "J01CA18", "Access", "No"],
-        ["Iclaprim", "Trimethoprim-derivatives", "J01EA03", "Reserve", "No"],
-        ["Imipenem/cilastatin", "Carbapenems", "J01DH51", "Watch", "Yes"],
-        ["Imipenem/cilastatin/relebactam", "Carbapenems", "J01DH56", "Reserve", "No"],
-        ["Isepamicin", "Aminoglycosides", "J01GB11", "Watch", "No"],
-        ["Josamycin", "Macrolides", "J01FA07", "Watch", "No"],
-        ["Kanamycin_IV", "Aminoglycosides", "J01GB04", "Watch", "No"],
-        ["Kanamycin_oral", "Aminoglycosides", "A07AA08", "Watch", "No"],
-        ["Lascufloxacin", "Fluoroquinolones", "J01MA25", "Watch", "No"],
-        ["Latamoxef", "Third-generation-cephalosporins", "J01DD06", "Watch", "No"],
-        ["Lefamulin", "Pleuromutilin", "J01XX12", "Reserve", "No"],
-        ["Levofloxacin", "Fluoroquinolones", "J01MA12", "Watch", "No"],
-        ["Levonadifloxacin", "Fluoroquinolones", "J01MA24", "Watch", "No"],
-        ["Lincomycin", "Lincosamides", "J01FF02", "Watch", "No"],
-        ["Linezolid", "Oxazolidinones", "J01XX08", "Reserve", "Yes"],
-        ["Lomefloxacin", "Fluoroquinolones", "J01MA07", "Watch", "No"],
-        ["Loracarbef", "Second-generation-cephalosporins", "J01DC08", "Watch", "No"],
-        ["Lymecycline", "Tetracyclines", "J01AA04", "Watch", "No"],
-        ["Mecillinam", "Penicillins", "J01CA11", "Access", "No"],
-        ["Meropenem", "Carbapenems", "J01DH02", "Watch", "Yes"],
-        ["Meropenem/vaborbactam", "Carbapenems", "J01DH52", "Reserve", "Yes"],
-        ["Metacycline", "Tetracyclines", "J01AA05", "Watch", "No"],
-        ["Metampicillin", "Penicillins", "J01CA14", "Access", "No"],
-        ["Meticillin", "Penicillins", "J01CF03", "Access", "Yes"],
-        ["Metronidazole_IV", "Imidazoles", "J01XD01", "Access", "Yes"],
-        ["Metronidazole_oral", "Imidazoles", "P01AB01", "Access", "Yes"],
-        ["Mezlocillin", "Penicillins", "J01CA10", "Watch", "No"],
-        ["Micronomicin", "Aminoglycosides", "to be assigned", "Watch", "No"],
-        ["Midecamycin", "Macrolides", "J01FA03", "Watch", "No"],
-        ["Minocycline_IV", "Tetracyclines", "J01AA08", "Reserve", "No"],
-        ["Minocycline_oral", "Tetracyclines", "J01AA08", "Watch", "No"],
-        ["Miocamycin", "Macrolides", "J01FA11", "Watch", "No"],
-        ["Moxifloxacin", "Fluoroquinolones", "J01MA14", "Watch", "No"],
-        ["Nafcillin", "Penicillins", "J01CF06", "Access", "Yes"],
-        ["Nemonoxacin", "Quinolones", "J01MB08", "Watch", "No"],
-        ["Neomycin_IV", "Aminoglycosides", "J01GB05", "Watch", "No"],
-        ["Neomycin_oral", "Aminoglycosides", "A07AA01", "Watch", "No"],
-        ["Netilmicin", "Aminoglycosides", "J01GB07", "Watch", "No"],
-        ["Nifurtoinol", "Nitrofuran derivatives", "J01XE02", "Access", "No"],
-        ["Nitrofurantoin", "Nitrofuran-derivatives", "J01XE01", "Access", "Yes"],
-        ["Norfloxacin", "Fluoroquinolones", "J01MA06", "Watch", "No"],
-        ["Ofloxacin", "Fluoroquinolones", "J01MA01", "Watch", "No"],
-        ["Oleandomycin", "Macrolides", "J01FA05", "Watch", "No"],
-        ["Omadacycline", "Tetracyclines", "J01AA15", "Reserve", "No"],
-        ["Oritavancin", "Glycopeptides", "J01XA05", "Reserve", "No"],
-        ["Ornidazole_IV", "Imidazoles", "J01XD03", "Access", "No"],
-        ["Ornidazole_oral", "Imidazoles", "P01AB03", "Access", "No"],
-        ["Oxacillin", "Penicillins", "J01CF04", "Access", "Yes"],
-        ["Oxolinic-acid", "Quinolones", "J01MB05", "Watch", "No"],
-        ["Oxytetracycline", "Tetracyclines", "J01AA06", "Watch", "No"],
-        ["Panipenem", "Carbapenems", "J01DH55", "Watch", "No"],
-        ["Pazufloxacin", "Fluoroquinolones", "J01MA18", "Watch", "No"],
-        ["Pefloxacin", "Fluoroquinolones", "J01MA03", "Watch", "No"],
-        ["Penamecillin", "Penicillins", "J01CE06", "Access", "No"],
-        ["Penimepicycline", "Tetracyclines", "J01AA10", "Watch", "No"],
-        ["Pheneticillin", "Penicillins", "J01CE05", "Watch", "No"],
-        ["Phenoxymethylpenicillin", "Penicillins", "J01CE02", "Access", "Yes"],
-        ["Pipemidic-acid", "Quinolones", "J01MB04", "Watch", "No"],
-        ["Piperacillin", "Penicillins", "J01CA12", "Watch", "No"],
-        ["Piperacillin/tazobactam", "Beta-lactam/beta-lactamase-inhibitor_anti-pseudomonal", "J01CR05", "Watch", "Yes"],
-        ["Piromidic-acid", "Quinolones", "J01MB03", "Watch", "No"],
-        ["Pivampicillin", "Penicillins", "J01CA02", "Access", "No"],
-        ["Pivmecillinam", "Penicillins", "J01CA08", "Access", "No"],
-        ["Plazomicin", "Aminoglycosides", "J01GB14", "Reserve", "Yes"],
-        ["Polymyxin-B_IV", "Polymyxins", "J01XB02", "Reserve", "Yes"],
-        ["Polymyxin-B_oral", "Polymyxins", "A07AA05", "Reserve", "No"],
-        ["Pristinamycin", "Streptogramins", "J01FG01", "Watch", "No"],
-        ["Procaine-benzylpenicillin", "Penicillins", "J01CE09", "Access", "Yes"],
-        ["Propicillin", "Penicillins", "J01CE03", "Access", "No"],
-        ["Prulifloxacin", "Fluoroquinolones", "J01MA17", "Watch", "No"],
-        ["Ribostamycin", "Aminoglycosides", "J01GB10", "Watch", "No"],
-        ["Rifabutin", "Rifamycins", "J04AB04", "Watch", "No"],
-        ["Rifampicin", "Rifamycins", "J04AB02", "Watch", "No"],
-        ["Rifamycin_IV", "Rifamycins", "J04AB03", "Watch", "No"],
-        ["Rifamycin_oral", "Rifamycins", "A07AA13", "Watch", "No"],
-        ["Rifaximin", "Rifamycins", "A07AA11", "Watch", "No"],
-        ["Rokitamycin", "Macrolides", "J01FA12", "Watch", "No"],
-        ["Rolitetracycline", "Tetracyclines", "J01AA09", "Watch", "No"],
-        ["Rosoxacin", "Quinolones", "J01MB01", "Watch", "No"],
-        ["Roxithromycin", "Macrolides", "J01FA06", "Watch", "No"],
-        ["Rufloxacin", "Fluoroquinolones", "J01MA10", "Watch", "No"],
-        ["Sarecycline", "Tetracyclines", "J01AA14", "Watch", "No"],
-        ["Secnidazole", "Imidazoles", "P01AB07", "Access", "No"],
-        ["Sisomicin", "Aminoglycosides", "J01GB08", "Watch", "No"],
-        ["Sitafloxacin", "Fluoroquinolones", "J01MA21", "Watch", "No"],
-        ["Solithromycin", "Macrolides", "J01FA16", "Watch", "No"],
-        ["Sparfloxacin", "Fluoroquinolones", "J01MA09", "Watch", "No"],
-        ["Spectinomycin", "Aminocyclitols", "J01XX04", "Access", "Yes"],
-        ["Spiramycin", "Macrolides", "J01FA02", "Watch", "No"],
-        ["Streptoduocin", "Aminoglycosides", "J01GA02", "Watch", "No"],
-        ["Streptomycin_IV", "Aminoglycosides", "J01GA01", "Watch", "No"],
-        ["Streptomycin_oral", "Aminoglycosides", "A07AA04", "Watch", "No"],
-        ["Sulbactam", "Beta-lactamase-inhibitors", "J01CG01", "Access", "No"],
-        ["Sulbenicillin", "Penicillins", "J01CA16", "Watch", "No"],
-        ["Sulfadiazine", "Sulfonamides", "J01EC02", "Access", "No"],
-        ["Sulfadiazine/tetroxoprim", "Sulfonamide-trimethoprim-combinations", "J01EE06", "Access", "No"],
-        ["Sulfadiazine/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE02", "Access", "No"],
-        ["Sulfadimethoxine", "Sulfonamides", "J01ED01", "Access", "No"],
-        ["Sulfadimidine", "Sulfonamides", "J01EB03", "Access", "No"],
-        ["Sulfadimidine/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE05", "Access", "No"],
-        ["Sulfafurazole", "Sulfonamides", "J01EB05", "Access", "No"],
-        ["Sulfaisodimidine", "Sulfonamides", "J01EB01", "Access", "No"],
-        ["Sulfalene", "Sulfonamides", "J01ED02", "Access", "No"],
-        ["Sulfamazone", "Sulfonamides", "J01ED09", "Access", "No"],
-        ["Sulfamerazine", "Sulfonamides", "J01ED07", "Access", "No"],
-        ["Sulfamerazine/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE07", "Access", "No"],
-        ["Sulfamethizole", "Sulfonamides", "J01EB02", "Access", "No"],
-        ["Sulfamethoxazole", "Sulfonamides", "J01EC01", "Access", "No"],
-        ["Sulfamethoxazole/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE01", "Access", "Yes"],
-        ["Sulfamethoxypyridazine", "Sulfonamides", "J01ED05", "Access", "No"],
-        ["Sulfametomidine", "Sulfonamides", "J01ED03", "Access", "No"],
-        ["Sulfametoxydiazine", "Sulfonamides", "J01ED04", "Access", "No"],
-        ["Sulfametrole/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE03", "Access", "No"],
-        ["Sulfamoxole", "Sulfonamides", "J01EC03", "Access", "No"],
-        ["Sulfamoxole/trimethoprim", "Sulfonamide-trimethoprim-combinations", "J01EE04", "Access", "No"],
-        ["Sulfanilamide", "Sulfonamides", "J01EB06", "Access", "No"],
-        ["Sulfaperin", "Sulfonamides", "J01ED06", "Access", "No"],
-        ["Sulfaphenazole", "Sulfonamides", "J01ED08", "Access", "No"],
-        ["Sulfapyridine", "Sulfonamides", "J01EB04", "Access", "No"],
-        ["Sulfathiazole", "Sulfonamides", "J01EB07", "Access", "No"],
-        ["Sulfathiourea", "Sulfonamides", "J01EB08", "Access", "No"],
-        ["Sultamicillin", "Beta-lactam/beta-lactamase-inhibitor", "J01CR04", "Access", "No"],
-        ["Talampicillin", "Penicillins", "J01CA15", "Access", "No"],
-        ["Tazobactam", "Beta-lactamase-inhibitors", "J01CG02", "Watch", "No"],
-        ["Tebipenem", "Carbapenems", "J01DH06", "Watch", "No"],
-        ["Tedizolid", "Oxazolidinones", "J01XX11", "Reserve", "Yes"],
-        ["Teicoplanin", "Glycopeptides", "J01XA02", "Watch", "No"],
-        ["Telavancin", "Glycopeptides", "J01XA03", "Reserve", "No"],
-        ["Telithromycin", "Macrolides", "J01FA15", "Watch", "No"],
-        ["Temafloxacin", "Fluoroquinolones", "J01MA05", "Watch", "No"],
-        ["Temocillin", "Penicillins", "J01CA17", "Watch", "No"],
-        ["Tetracycline", "Tetracyclines", "J01AA07", "Access", "No"],
-        ["Thiamphenicol", "Amphenicols", "J01BA02", "Access", "No"],
-        ["Ticarcillin", "Penicillins", "J01CA13", "Watch", "No"],
-        ["Tigecycline", "Glycylcyclines", "J01AA12", "Reserve", "No"],
-        ["Tinidazole_IV", "Imidazoles", "J01XD02", "Access", "No"],
-        ["Tinidazole_oral", "Imidazoles", "P01AB02", "Access", "No"],
-        ["Tobramycin", "Aminoglycosides", "J01GB01", "Watch", "No"],
-        ["Tosufloxacin", "Fluoroquinolones", "J01MA22", "Watch", "No"],
-        ["Trimethoprim", "Trimethoprim-derivatives", "J01EA01", "Access", "Yes"],
-        ["Troleandomycin", "Macrolides", "J01FA08", "Watch", "No"],
-        ["Trovafloxacin", "Fluoroquinolones", "J01MA13", "Watch", "No"],
-        ["Vancomycin_IV", "Glycopeptides", "J01XA01", "Watch", "Yes"],
-        ["Vancomycin_oral", "Glycopeptides", "A07AA09", "Watch", "Yes"],
-    ]
-
-    # Create DataFrame
-    df = pd.DataFrame(data, columns=['Antibiotic', 'Class', 'ATC', 'Category', 'EML'])
-    return df
-
-
-# Load the drug database
-drug_db = create_drug_database()
-
-# Get list of all drug names for the selectbox
-all_drug_names = sorted(drug_db['Antibiotic'].tolist())
-
-# Create tabs for different input methods
-tab1, tab2 = st.tabs(["Drug Selector", "Database View"])
-
-with tab1:
-    st.header("Select Drugs for Classification")
-
-    # Multi-select dropdown for drug selection
-    selected_drugs = st.multiselect(
-        "Select drugs to classify:",
-        options=all_drug_names,
-        default=None,
-        help="Select one or more drugs from the list"
+        st.divider()
+        st.caption("Developed using WHO drug classification data")
+
+
+    # Load the shared drug database (built once per process, not on every rerun)
+    with metrics.span("reference"):
+        reference = get_reference()
+    drug_db = reference.drug_db
+    classifier = reference.classifier
+
+    # Get list of all drug names for the selectbox
+    all_drug_names = reference.drug_names
+
+    # Create tabs for different input methods. Tabs are lazy: only the open tab's
+    # content runs on a rerun, and widgets use persist_state so their values
+    # survive while their tab is hidden
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["Drug Selector", "Database View", "File Upload", "Consumption Index"],
+        key="active_tab",
+        on_change="rerun"
     )
 
-    # Display selected drugs count
-    if selected_drugs:
-        st.subheader(f"Selected {len(selected_drugs)} Drug(s)")
-
-        # Display selected drugs in a compact format
-        cols = st.columns(4)
-        for i, drug in enumerate(selected_drugs):
-            with cols[i % 4]:
-                # Get drug info
-                drug_info = drug_db[drug_db['Antibiotic'] == drug]
-                if not drug_info.empty:
-                    category = drug_info.iloc[0]['Category']
-                    # Color indicators
-                    if category == 'Access':
-                        color_indicator = "🟢"
-                    elif category == 'Watch':
-                        color_indicator = "🟡"
+    with tab1:
+        if tab1.open:
+            st.header("Select Drugs for Classification")
+
+            # Multi-select dropdown for drug selection
+            selected_drugs = st.multiselect(
+                "Select drugs to classify:",
+                options=all_drug_names,
+                default=None,
+                help="Select one or more drugs from the list",
+                key="selected_drugs",
+                persist_state="session"
+            )
+
+            # Display selected drugs count
+            if selected_drugs:
+                st.subheader(f"Selected {len(selected_drugs)} Drug(s)")
+
+                # Classify the whole selection in one lookup
+                with metrics.span("classify"):
+                    selected_info = classifier.classify(selected_drugs)
+
+                # Display selected drugs in a compact format
+                cols = st.columns(4)
+                listed = selected_info['Category'].notna()
+                for i, (drug, category, is_listed) in enumerate(zip(selected_drugs, selected_info['Category'], listed)):
+                    with cols[i % 4]:
+                        if is_listed:
+                            # Color indicators
+                            if category == 'Access':
+                                color_indicator = "🟢"
+                            elif category == 'Watch':
+                                color_indicator = "🟡"
+                            else:
+                                color_indicator = "🔴"
+
+                            st.markdown(f"**{color_indicator} {drug}**")
+
+            # Classify button
+            if selected_drugs:
+                col1, col2 = st.columns([1, 3])
+                with col1:
+                    classify_button = st.button("Classify Selected Drugs", use_container_width=True, type="primary")
+
+                # Keep the results across reruns (e.g. paging) until the selection changes
+                if classify_button:
+                    st.session_state.classified_drugs = selected_drugs
+
+                if st.session_state.get("classified_drugs") == selected_drugs:
+                    # Get classification for selected drugs
+                    results = selected_info.dropna(subset=['Category']).reset_index(drop=True)
+
+                    if not results.empty:
+                        st.success(f"Classified {len(results)} drug(s)")
+
+                        # Display results with high contrast colors, one markdown element per page of cards
+                        n_card_pages = -(-len(results) // CARDS_PER_PAGE)
+                        card_page = 1
+                        if n_card_pages > 1:
+                            card_page = st.number_input(f"Results page (of {n_card_pages}):", min_value=1,
+                                                        max_value=n_card_pages, value=1, step=1, key="card_page",
+                                                        persist_state="session")
+                        with metrics.span("cards"):
+                            st.markdown(render_cards(results, card_page - 1), unsafe_allow_html=True)
+
+                        # Download results: the file is only written when the button is clicked,
+                        # instead of on every rerun and held in the session until then
+                        results_format = st.selectbox("Download format:", options=list(EXPORT_FORMATS),
+                                                      format_func=export_label, key="results_format",
+                                                      persist_state="session")
+                        st.download_button(
+                            label=f"Download Results as {export_label(results_format)}",
+                            data=partial(export_file, results, results_format),
+                            file_name=export_name("aware_classification_results", results_format),
+                            mime=export_mime(results_format),
+                            use_container_width=True
+                        )
                     else:
-                        color_indicator = "🔴"
-
-                    st.markdown(f"**{color_indicator} {drug}**")
-
-    # Classify button
-    if selected_drugs:
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            classify_button = st.button("Classify Selected Drugs", use_container_width=True, type="primary")
-
-        if classify_button:
-            # Get classification for selected drugs
-            results = drug_db[drug_db['Antibiotic'].isin(selected_drugs)]
-
-            if not results.empty:
-                st.success(f"Classified {len(results)} drug(s)")
-
-                # Display results with high contrast colors
-                for _, row in results.iterrows():
-                    # High contrast colors - brighter for better visibility
-                    if row['Category'] == 'Access':
-                        color = "🟢"
-                        bg_color = "#66BB6A"  # Brighter green
-                        text_color = "#1B5E20"  # Dark green
-                        border_color = "#2E7D32"
-                    elif row['Category'] == 'Watch':
-                        color = "🟡"
-                        bg_color = "#FFD54F"  # Brighter yellow
-                        text_color = "#5D4037"  # Dark brown
-                        border_color = "#FF8F00"
-                    else:  # Reserve
-                        color = "🔴"
-                        bg_color = "#EF5350"  # Brighter red
-                        text_color = "#B71C1C"  # Dark red
-                        border_color = "#D32F2F"
-
-                    # Create a styled card with high contrast
-                    st.markdown(f"""
-                    <div style="
-                        background-color: {bg_color};
-                        padding: 15px;
-                        border-radius: 10px;
-                        border-left: 5px solid {border_color};
-                        margin: 10px 0;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    ">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <div>
-                                <h4 style="color: {text_color}; margin: 0; font-weight: bold; font-size: 1.2em;">{row['Antibiotic']}</h4>
-                                <p style="margin: 5px 0; color: {text_color}; font-size: 1.1em;"><strong>{color} {row['Category']}</strong></p>
-                            </div>
-                            <div style="text-align: right;">
-                                <p style="margin: 5px 0; color: {text_color};"><strong>Class:</strong> {row['Class']}</p>
-                                <p style="margin: 5px 0; color: {text_color};"><strong>EML:</strong> {"🟢 Yes" if row['EML'] == "Yes" else "🔴 No"}</p>
-                            </div>
-                        </div>
-                        <div style="margin-top: 10px; padding-top: 10px; border-top: 2px solid {border_color};">
-                            <p style="margin: 0; color: {text_color}; font-weight: bold;"><strong>ATC Code:</strong> {row['ATC']}</p>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                # Download results
-                csv = results.to_csv(index=False)
+                        st.warning("No classification data found for selected drugs.")
+            else:
+                st.info("Select drugs from the list above to see their classification.")
+
+    with tab2:
+        if tab2.open:
+            st.header("Complete Drug Database")
+
+            st.markdown("""
+        Browse the complete database of antibiotics with their AWaRe classifications.
+        Use the filters below to search for specific drugs or filter by category.
+        """)
+
+            # Add filters
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                category_filter = st.multiselect(
+                    "Filter by AWaRe Category:",
+                    options=["Access", "Watch", "Reserve"],
+                    default=None,
+                    key="category_filter",
+                    persist_state="session"
+                )
+
+            with col2:
+                eml_filter = st.multiselect(
+                    "Filter by EML Status:",
+                    options=["Yes", "No"],
+                    default=None,
+                    key="eml_filter",
+                    persist_state="session"
+                )
+
+            with col3:
+                search_db = st.text_input("Search drugs:", placeholder="Type to search...", key="search_db",
+                                          persist_state="session")
+
+            with col4:
+                atc_filter = st.text_input("ATC group:", placeholder="e.g. J01C",
+                                           help="Any ATC code or prefix (level 1-5)", key="atc_filter",
+                                           persist_state="session")
+
+            # Apply filters (served from the precomputed, memoized search and ATC indexes)
+            with metrics.span("filter"):
+                filtered_db = reference.search_index.filter(category_filter, eml_filter, search_db, atc_filter)
+
+            # Display the database with high contrast colors
+            st.subheader(f"Showing {len(filtered_db)} of {len(drug_db)} drugs")
+
+            # Only the visible page is styled and sent to the browser
+            page_col1, page_col2 = st.columns([1, 3])
+            with page_col1:
+                page_size = st.selectbox("Rows per page:", options=PAGE_SIZES, index=1, key="page_size",
+                                         persist_state="session")
+            n_pages = page_count(len(filtered_db), page_size)
+            with page_col2:
+                page_number = st.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1,
+                                              key="page_number", persist_state="session")
+
+            # Apply high contrast styling
+            with metrics.span("style"):
+                styled_db = reference.table_pages.page(category_filter, eml_filter, search_db, page_number - 1,
+                                                       page_size, atc_filter)
+
+            # Display the database (timed as "dataframe": serializing the styled page)
+            table_started = time.perf_counter()
+            st.dataframe(
+                styled_db,
+                use_container_width=True,
+                column_config={
+                    "Antibiotic": st.column_config.TextColumn(
+                        "Drug Name",
+                        help="Name of the antibiotic"
+                    ),
+                    "Category": st.column_config.TextColumn(
+                        "AWaRe Category",
+                        help="AWaRe classification category"
+                    ),
+                    "Class": st.column_config.TextColumn(
+                        "Drug Class",
+                        help="Pharmacological class of the antibiotic"
+                    ),
+                    "ATC": st.column_config.TextColumn(
+                        "ATC Code",
+                        help="Anatomical Therapeutic Chemical code"
+                    ),
+                    "EML": st.column_config.TextColumn(
+                        "EML Status",
+                        help="Included in WHO Essential Medicines List"
+                    )
+                },
+                hide_index=True
+            )
+            metrics.observe("aware_stage_duration_seconds", time.perf_counter() - table_started, stage="dataframe")
+
+            # Export every filtered row, not just the visible page, streamed to a file when clicked
+            export_col1, export_col2 = st.columns([1, 3])
+            with export_col1:
+                database_format = st.selectbox("Export format:", options=list(EXPORT_FORMATS), format_func=export_label,
+                                               key="database_format", persist_state="session")
+            with export_col2:
                 st.download_button(
-                    label="Download Results as CSV",
-                    data=csv,
-                    file_name="aware_classification_results.csv",
-                    mime="text/csv",
+                    label=f"Export {len(filtered_db)} filtered drug(s) as {export_label(database_format)}",
+                    data=partial(export_file, filtered_db, database_format),
+                    file_name=export_name("aware_drug_database", database_format),
+                    mime=export_mime(database_format)
+                )
+
+            # Database statistics with high contrast
+            st.subheader("Database Statistics")
+
+            # Counts for the active filters come from a precomputed Category x Class x EML cube;
+            # a text search or ATC group is not a cube dimension, so it selects a cube memoized per search
+            with metrics.span("stats"):
+                stats_cube = reference.stats_cube(search_db, atc_filter)
+                stats_filters = {"Category": category_filter, "EML": eml_filter}
+                category_totals = stats_cube.by("Category", **stats_filters)
+            total_drugs = int(category_totals.sum())
+            access_count = int(category_totals.get("Access", 0))
+            watch_count = int(category_totals.get("Watch", 0))
+            reserve_count = int(category_totals.get("Reserve", 0))
+            percent_base = total_drugs or 1
+
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.markdown(f"""
+            <div style="background-color: #f5f5f5; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #333;">
+                <h3 style="margin: 0; color: #333;">Total Drugs</h3>
+                <h2 style="margin: 5px 0; color: #333;">{total_drugs}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+
+            with col2:
+                st.markdown(f"""
+            <div style="background-color: #66BB6A; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #1B5E20;">
+                <h3 style="margin: 0; color: white;">Access</h3>
+                <h2 style="margin: 5px 0; color: white;">{access_count}</h2>
+                <p style="margin: 0; color: white; font-weight: bold;">{(access_count / percent_base * 100):.1f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            with col3:
+                st.markdown(f"""
+            <div style="background-color: #FFD54F; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #FF8F00;">
+                <h3 style="margin: 0; color: #5D4037;">Watch</h3>
+                <h2 style="margin: 5px 0; color: #5D4037;">{watch_count}</h2>
+                <p style="margin: 0; color: #5D4037; font-weight: bold;">{(watch_count / percent_base * 100):.1f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            with col4:
+                st.markdown(f"""
+            <div style="background-color: #EF5350; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #D32F2F;">
+                <h3 style="margin: 0; color: white;">Reserve</h3>
+                <h2 style="margin: 5px 0; color: white;">{reserve_count}</h2>
+                <p style="margin: 0; color: white; font-weight: bold;">{(reserve_count / percent_base * 100):.1f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            with st.expander("Breakdown by Class and EML status"):
+                class_breakdown = stats_cube.by(["Class", "Category"], **stats_filters).unstack(fill_value=0)
+                st.dataframe(class_breakdown.astype(int), use_container_width=True)
+                eml_breakdown = stats_cube.by(["EML", "Category"], **stats_filters).unstack(fill_value=0)
+                st.dataframe(eml_breakdown.astype(int), use_container_width=True)
+
+            with st.expander("Breakdown by ATC group"):
+                atc_level = st.selectbox(
+                    "ATC level:",
+                    options=[1, 2, 3, 4, 5],
+                    index=2,
+                    format_func=lambda level: {1: "1 - Anatomical group", 2: "2 - Therapeutic subgroup",
+                                               3: "3 - Pharmacological subgroup", 4: "4 - Chemical subgroup",
+                                               5: "5 - Chemical substance"}[level],
+                    key="atc_level",
+                    persist_state="session"
+                )
+                st.dataframe(reference.atc_index.rollup(atc_level, atc_filter), use_container_width=True)
+
+    with tab3:
+        if tab3.open:
+            st.header("Classify a Prescription File")
+
+            st.markdown("""
+        Upload a CSV, Parquet or Excel file of prescription records. Every row is classified
+        and the file is returned with the Class, ATC, Category and EML columns appended, as CSV,
+        gzip-compressed CSV, Parquet or Arrow IPC.
+        Large files are processed in chunks; for multi-GB extracts use `python -m aware.batch`.
+        Results are cached on disk: a file classified before is returned straight away, and for
+        a CSV file that only gained rows at the end, only the new rows are classified.
+        """)
+
+        # Rendered even while the tab is hidden, as file uploaders cannot persist their state
+        uploaded_file = st.file_uploader(
+            "Upload prescription records:",
+            type=["csv", "parquet", "xlsx"],
+            help="The file must have a column holding the drug name"
+        )
+
+        if tab3.open and uploaded_file is not None:
+            # Only needed once a file is uploaded
+            from aware.batch import detect_format, read_columns
+            from aware.result_cache import ResultCache
+
+            in_format = detect_format(uploaded_file.name)
+            columns = read_columns(uploaded_file, in_format)
+            name_column = st.selectbox(
+                "Column containing drug names:",
+                options=columns,
+                index=columns.index("Antibiotic") if "Antibiotic" in columns else 0,
+                key="name_column",
+                persist_state="session"
+            )
+
+            fuzzy_matching = st.checkbox(
+                "Match brand names, salts, doses and misspellings",
+                help="Free-text names are resolved to the closest AWaRe drug; the matched name and a confidence score are added",
+                key="fuzzy_matching",
+                persist_state="session"
+            )
+
+            output_format = st.selectbox(
+                "Output format:",
+                options=list(EXPORT_FORMATS),
+                format_func=export_label,
+                help="Parquet and Arrow files are several times smaller than CSV and keep the column types",
+                key="output_format",
+                persist_state="session"
+            )
+
+            if st.button("Classify File", type="primary"):
+                # Annotated rows are streamed to a temporary file chunk by chunk
+                # instead of building the whole result in memory first, unless
+                # the result cache already holds them
+                output_file = tempfile.TemporaryFile()
+                with st.spinner("Classifying..."), metrics.span("file_classify"):
+                    summary = ResultCache().classify_file(
+                        uploaded_file,
+                        output_file,
+                        name_column=name_column,
+                        in_format=in_format,
+                        out_format=output_format,
+                        fuzzy=fuzzy_matching
+                    )
+
+                st.success(f"Classified {summary['rows']:,} row(s): "
+                           f"{summary['matched']:,} matched, {summary['unmatched']:,} not found in the AWaRe list")
+                if summary["cache"] == "hit":
+                    st.caption("Served from the result cache: this file was classified before.")
+                elif summary["cache"] == "append":
+                    st.caption(f"Reused cached results for the earlier rows; "
+                               f"classified {summary['classified_rows']:,} new row(s).")
+
+                # Read from the temporary file only when clicked
+                st.download_button(
+                    label=f"Download Results as {export_label(output_format)}",
+                    data=rewound(output_file),
+                    file_name=export_name("aware_classification_results", output_format),
+                    mime=export_mime(output_format),
                     use_container_width=True
                 )
-            else:
-                st.warning("No classification data found for selected drugs.")
-    else:
-        st.info("Select drugs from the list above to see their classification.")
 
-with tab2:
-    st.header("Complete Drug Database")
+    with tab4:
+        if tab4.open:
+            st.header("AWaRe Consumption Index")
 
-    st.markdown("""
-    Browse the complete database of antibiotics with their AWaRe classifications.
-    Use the filters below to search for specific drugs or filter by category.
-    """)
+            st.markdown("""
+        Load a consumption index built with `python -m aware.consumption` to see the share of
+        Access, Watch and Reserve antibiotics in total consumption. The WHO target is for at
+        least 70% of consumption to be Access antibiotics.
+        """)
 
-    # Add filters
-    col1, col2, col3 = st.columns(3)
+        index_file = st.file_uploader("Upload a consumption index (Parquet):", type=["parquet"])
 
-    with col1:
-        category_filter = st.multiselect(
-            "Filter by AWaRe Category:",
-            options=["Access", "Watch", "Reserve"],
-            default=None
-        )
+        if tab4.open and index_file is not None:
+            import pandas as pd
 
-    with col2:
-        eml_filter = st.multiselect(
-            "Filter by EML Status:",
-            options=["Yes", "No"],
-            default=None
-        )
+            from aware.consumption import CONSUMPTION_COLUMNS
 
-    with col3:
-        search_db = st.text_input("Search drugs:", placeholder="Type to search...")
-
-    # Apply filters
-    filtered_db = drug_db.copy()
-
-    if category_filter:
-        filtered_db = filtered_db[filtered_db['Category'].isin(category_filter)]
-
-    if eml_filter:
-        filtered_db = filtered_db[filtered_db['EML'].isin(eml_filter)]
-
-    if search_db:
-        search_lower = search_db.lower()
-        filtered_db = filtered_db[
-            filtered_db['Antibiotic'].str.lower().str.contains(search_lower) |
-            filtered_db['Class'].str.lower().str.contains(search_lower) |
-            filtered_db['ATC'].str.lower().str.contains(search_lower)
-            ]
-
-    # Display the database with high contrast colors
-    st.subheader(f"Showing {len(filtered_db)} of {len(drug_db)} drugs")
-
-
-    # High contrast color mapping function
-    def highlight_rows_high_contrast(row):
-        if row['Category'] == 'Access':
-            # Bright green background with dark green text
-            return ['background-color: #66BB6A; color: #1B5E20; font-weight: bold'] * len(row)
-        elif row['Category'] == 'Watch':
-            # Bright yellow background with dark brown text
-            return ['background-color: #FFD54F; color: #5D4037; font-weight: bold'] * len(row)
-        else:  # Reserve
-            # Bright red background with dark red text
-            return ['background-color: #EF5350; color: #B71C1C; font-weight: bold'] * len(row)
-
-
-    # Apply high contrast styling
-    styled_db = filtered_db.style.apply(highlight_rows_high_contrast, axis=1)
-
-    # Display the database
-    st.dataframe(
-        styled_db,
-        use_container_width=True,
-        column_config={
-            "Antibiotic": st.column_config.TextColumn(
-                "Drug Name",
-                help="Name of the antibiotic"
-            ),
-            "Category": st.column_config.TextColumn(
-                "AWaRe Category",
-                help="AWaRe classification category"
-            ),
-            "Class": st.column_config.TextColumn(
-                "Drug Class",
-                help="Pharmacological class of the antibiotic"
-            ),
-            "ATC": st.column_config.TextColumn(
-                "ATC Code",
-                help="Anatomical Therapeutic Chemical code"
-            ),
-            "EML": st.column_config.TextColumn(
-                "EML Status",
-                help="Included in WHO Essential Medicines List"
-            )
-        },
-        hide_index=True
-    )
+            with metrics.span("consumption_load"):
+                consumption = pd.read_parquet(index_file)
+            group_columns = [col for col in consumption.columns if col not in CONSUMPTION_COLUMNS]
 
-    # Database statistics with high contrast
-    st.subheader("Database Statistics")
-
-    total_drugs = len(drug_db)
-    access_count = len(drug_db[drug_db['Category'] == 'Access'])
-    watch_count = len(drug_db[drug_db['Category'] == 'Watch'])
-    reserve_count = len(drug_db[drug_db['Category'] == 'Reserve'])
-
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.markdown(f"""
-        <div style="background-color: #f5f5f5; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #333;">
-            <h3 style="margin: 0; color: #333;">Total Drugs</h3>
-            <h2 style="margin: 5px 0; color: #333;">{total_drugs}</h2>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown(f"""
-        <div style="background-color: #66BB6A; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #1B5E20;">
-            <h3 style="margin: 0; color: white;">Access</h3>
-            <h2 style="margin: 5px 0; color: white;">{access_count}</h2>
-            <p style="margin: 0; color: white; font-weight: bold;">{(access_count / total_drugs * 100):.1f}%</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        st.markdown(f"""
-        <div style="background-color: #FFD54F; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #FF8F00;">
-            <h3 style="margin: 0; color: #5D4037;">Watch</h3>
-            <h2 style="margin: 5px 0; color: #5D4037;">{watch_count}</h2>
-            <p style="margin: 0; color: #5D4037; font-weight: bold;">{(watch_count / total_drugs * 100):.1f}%</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col4:
-        st.markdown(f"""
-        <div style="background-color: #EF5350; padding: 15px; border-radius: 10px; text-align: center; border: 2px solid #D32F2F;">
-            <h3 style="margin: 0; color: white;">Reserve</h3>
-            <h2 style="margin: 5px 0; color: white;">{reserve_count}</h2>
-            <p style="margin: 0; color: white; font-weight: bold;">{(reserve_count / total_drugs * 100):.1f}%</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-# Footer
-st.divider()
-st.markdown("""
+            # Narrow down by any non-month grouping column (e.g. Facility, Ward)
+            for col in group_columns:
+                if col == "Month":
+                    continue
+                selected_values = st.multiselect(f"Filter by {col}:",
+                                                 options=sorted(consumption[col].dropna().unique()),
+                                                 key=f"consumption_filter_{col}", persist_state="session")
+                if selected_values:
+                    consumption = consumption[consumption[col].isin(selected_values)]
+
+            st.dataframe(consumption, use_container_width=True, hide_index=True)
+
+            if "Month" in consumption.columns and not consumption.empty:
+                monthly = consumption.groupby("Month")[["Access", "Watch", "Reserve", "AWaRe Total"]].sum()
+                monthly_shares = monthly[["Access", "Watch", "Reserve"]].div(monthly["AWaRe Total"], axis=0) * 100
+                st.subheader("Share of consumption by month (%)")
+                st.line_chart(monthly_shares)
+
+    # Footer
+    st.divider()
+    st.markdown("""
 <div style="text-align: center; color: #666; font-size: 0.9em;">
     <p><strong>WHO AWaRe Antibiotic Classification Tool</strong></p>
     <p>Based on WHO Access, Watch, Reserve (AWaRe) classification of antibiotics for evaluation and monitoring of use, 2023</p>
     <p>For informational purposes only. Consult official guidelines for clinical decisions.</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+finally:
+    # Also when a rerun raises, or is interrupted by st.rerun()/st.stop() or a new widget event
+    metrics.observe("aware_stage_duration_seconds", time.perf_counter() - rerun_started, stage="rerun")
+    metrics.stop_profile(profiler)
@@ -0,0 +1 @@
+"""Headless WHO AWaRe classification logic shared by the Streamlit app and batch tools"""
@@ -0,0 +1,428 @@
+"""Real-time stewardship alerts over a stream of prescription events
+
+An AlertEngine reads prescription events, one JSON object per line:
+
+    {"time": "2026-03-02T10:15:00", "ward": "ICU", "drug": "Tigecycline"}
+    {"time": 1772446500, "ward": "ICU", "atc": "J01XX01", "route": "P"}
+
+Each event is classified with plain dict lookups into an EventIndex,
+precomputed once from the reference table by drug name (exact, then case
+insensitive, then optionally fuzzy) and by ATC code and route. Per ward, a
+sliding window of the last --window seconds keeps running counts per AWaRe
+category, updated incrementally as events enter and leave it. Rules look
+at each event and its ward's window:
+
+- ReserveRule: a Reserve drug was prescribed (repeats of the same drug on
+  the same ward are suppressed for a cooldown)
+- WatchShareRule: a ward's Watch share of classified prescriptions in the
+  window rose above a threshold (alerting again only once it has dropped
+  back below)
+
+Events are handled as they are read, so an alert is emitted within the
+poll interval of a followed file, or immediately for a socket. Alerts are
+written as JSON lines:
+
+    python -m aware.alerts --follow events.jsonl --watch-share 0.3 --window 86400
+    python -m aware.alerts --listen 127.0.0.1:9009 --alerts alerts.jsonl
+"""
+import json
+import os
+import selectors
+import socket
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from aware import metrics
+from aware.atc import ROUTE_CODES, normalize_route
+from aware.classifier import CATEGORIES
+from aware.reference import get_reference
+
+# Index of each category in a window's counts; the last slot counts unclassified drugs
+CATEGORY_CODES = {category: i for i, category in enumerate(CATEGORIES)}
+UNCLASSIFIED = len(CATEGORIES)
+
+DEFAULT_WINDOW = 24 * 3600
+
+# Event counts are added to the metrics registry every this many events
+_METRICS_EVERY = 10_000
+
+# json.loads without its per-call encoding detection and whitespace handling
+_parse_json = json.JSONDecoder().raw_decode
+
+
+class EventIndex:
+    """Drug name and ATC code -> (Antibiotic, Category) with one dict lookup per event
+
+    Built with the same vectorized lookups as batch classification, so an
+    event is classified exactly as the same row in a file would be. Names
+    the index does not hold are resolved with the reference NameMatcher
+    when fuzzy is set (memoized per distinct name).
+    """
+
+    def __init__(self, reference=None, fuzzy=False):
+        reference = reference or get_reference()
+        self.matcher = reference.matcher if fuzzy else None
+
+        names = list(reference.drug_names)
+        classified = reference.classifier.classify(names)
+        self._names = {}
+        for name, category in zip(names, classified['Category'].tolist()):
+            entry = (name, category)
+            self._names[name] = entry
+            self._names.setdefault(name.casefold(), entry)
+
+        # Every reference code, alone and with each normalized route: codes shared by
+        # route variants (IV/oral) resolve by route, or to the values the variants agree on
+        codes = sorted(set(reference.drug_db['ATC'].astype(str).str.strip().str.upper()))
+        self._codes = {}
+        for route in [None, *sorted(set(ROUTE_CODES.values()))]:
+            by_route = reference.atc_index.classify_codes(codes, [route] * len(codes) if route else None)
+            for code, name, category in zip(codes, by_route['Antibiotic'].tolist(), by_route['Category'].tolist()):
+                if not pd.isna(category):
+                    self._codes[(code, route)] = (code if pd.isna(name) else name, category)
+
+    def by_name(self, name):
+        entry = self._names.get(name)
+        if entry is None and name:
+            entry = self._names.get(name.casefold())
+            if entry is None and self.matcher is not None:
+                matched = self.matcher.resolve_one(name)[0]
+                entry = self._names.get(matched) if matched else None
+        return entry
+
+    def by_code(self, code, route=None):
+        code = code.strip().upper()
+        route = normalize_route(route) if route else None
+        return self._codes.get((code, route)) or self._codes.get((code, None))
+
+    def lookup(self, name=None, atc=None, route=None):
+        """Return (Antibiotic, Category) for a drug name or an ATC code (and route), or None"""
+        entry = self.by_name(name) if name else None
+        if entry is None and atc:
+            entry = self.by_code(atc, route)
+        return entry
+
+
+class WardWindow:
+    """Category counts of one ward's events within the last `seconds` of event time
+
+    Events are expected in roughly time order: a late event is counted,
+    and leaves the window once every event that arrived before it has.
+    """
+
+    __slots__ = ('seconds', 'events', 'counts', 'latest')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.events = deque()
+        self.counts = [0] * (UNCLASSIFIED + 1)
+        self.latest = float('-inf')
+
+    def add(self, event_time, category_code):
+        if event_time > self.latest:
+            self.latest = event_time
+        self.events.append((event_time, category_code))
+        self.counts[category_code] += 1
+        # Expire from the oldest end: amortized O(1) per event
+        horizon = self.latest - self.seconds
+        events, counts = self.events, self.counts
+        while events and events[0][0] <= horizon:
+            counts[events.popleft()[1]] -= 1
+
+    def classified(self):
+        return sum(self.counts[:UNCLASSIFIED])
+
+    def share(self, category):
+        classified = self.classified()
+        return self.counts[CATEGORY_CODES[category]] / classified if classified else 0.0
+
+
+class ReserveRule:
+    """Alert when a drug of one of categories is prescribed
+
+    A repeat of the same drug on the same ward within cooldown seconds (of
+    event time) is not alerted again.
+    """
+
+    name = 'reserve_prescribed'
+
+    def __init__(self, categories=('Reserve',), cooldown=0):
+        self.categories = frozenset(categories)
+        self.cooldown = cooldown
+        self._last_alert = {}
+
+    def check(self, event_time, ward, drug, category, window):
+        if category not in self.categories:
+            return None
+        if self.cooldown:
+            key = (ward, drug)
+            last = self._last_alert.get(key)
+            if last is not None and event_time - last < self.cooldown:
+                return None
+            self._last_alert[key] = event_time
+        return {'message': f"{category} antibiotic {drug} prescribed on ward {ward}"}
+
+
+class WatchShareRule:
+    """Alert when a ward's share of category among classified prescriptions reaches threshold
+
+    Only windows with at least min_events classified prescriptions are
+    judged. A ward alerts once per crossing: it is re-armed when its share
+    falls below threshold again.
+    """
+
+    name = 'watch_share'
+
+    def __init__(self, threshold=0.3, min_events=20, category='Watch'):
+        self.threshold = threshold
+        self.min_events = min_events
+        self.category = category
+        self._code = CATEGORY_CODES[category]
+        self._alerted = set()
+
+    def check(self, event_time, ward, drug, category, window):
+        counts = window.counts
+        classified = sum(counts[:UNCLASSIFIED])
+        if classified < self.min_events:
+            return None
+        share = counts[self._code] / classified
+        if share < self.threshold:
+            self._alerted.discard(ward)
+            return None
+        if ward in self._alerted:
+            return None
+        self._alerted.add(ward)
+        return {
+            'message': f"{self.category} share on ward {ward} is {share:.0%} of {classified} prescriptions "
+                       f"in the window (threshold {self.threshold:.0%})",
+            'share': round(share, 4),
+        }
+
+
+def event_time(value):
+    """Seconds since the epoch from a number or an ISO 8601 string; now when missing"""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+class AlertEngine:
+    """Classify events, keep per-ward windows and run the rules on each event"""
+
+    def __init__(self, rules, index=None, window=DEFAULT_WINDOW, emit=None):
+        self.rules = list(rules)
+        self.index = index or EventIndex()
+        self.window = window
+        self.emit = emit
+        self.windows = {}
+        self.n_events = 0
+        self.n_unclassified = 0
+        self.n_invalid = 0
+        self.n_alerts = 0
+        self._unreported = 0
+
+    def process(self, event, received=None):
+        """Handle one event dict and return the alerts it raised (also passed to emit)"""
+        t = event_time(event.get('time'))
+        ward = event.get('ward')
+        entry = self.index.lookup(event.get('drug'), event.get('atc'), event.get('route'))
+        if entry is None:
+            drug, category, code = event.get('drug') or event.get('atc'), None, UNCLASSIFIED
+            self.n_unclassified += 1
+        else:
+            drug, category = entry
+            code = CATEGORY_CODES[category]
+
+        window = self.windows.get(ward)
+        if window is None:
+            window = self.windows[ward] = WardWindow(self.window)
+        window.add(t, code)
+        self.n_events += 1
+        self._unreported += 1
+        if self._unreported >= _METRICS_EVERY:
+            self.report()
+
+        alerts = []
+        for rule in self.rules:
+            alert = rule.check(t, ward, drug, category, window)
+            if alert is not None:
+                alerts.append({'rule': rule.name, 'time': t, 'ward': ward, 'drug': drug, 'category': category,
+                               **alert})
+        if alerts:
+            self._raise(alerts, received)
+        return alerts
+
+    def process_line(self, line, received=None):
+        """Handle one JSON line (bytes or str); malformed lines are counted and skipped"""
+        try:
+            if isinstance(line, bytes):
+                line = line.decode()
+            line = line.strip()
+            if not line:
+                return []
+            event, end = _parse_json(line)
+            if end != len(line) or not isinstance(event, dict):
+                raise ValueError("not one JSON object")
+            return self.process(event, received)
+        except (ValueError, TypeError, AttributeError):
+            # Bad JSON, a time that is not a number or ISO 8601, or a drug that is not text
+            self.n_invalid += 1
+            return []
+
+    def _raise(self, alerts, received):
+        self.n_alerts += len(alerts)
+        for alert in alerts:
+            metrics.inc('aware_alerts', rule=alert['rule'])
+        if received is not None:
+            metrics.observe('aware_alert_latency_seconds', time.perf_counter() - received)
+        if self.emit is not None:
+            for alert in alerts:
+                self.emit(alert)
+
+    def run(self, lines):
+        """Process every line from an iterable (e.g. follow_file or listen_lines) until it ends"""
+        try:
+            for line in lines:
+                self.process_line(line, time.perf_counter())
+        finally:
+            self.report()
+
+    def report(self):
+        """Add the events handled since the last report to the metrics registry"""
+        if self._unreported:
+            metrics.inc('aware_alert_events', self._unreported)
+            self._unreported = 0
+
+    def ward_shares(self):
+        """{ward: {category: share of classified prescriptions in its window}}"""
+        return {ward: {category: window.share(category) for category in CATEGORIES}
+                for ward, window in self.windows.items()}
+
+
+def follow_file(path, poll_interval=0.1, from_start=False, stop=None):
+    """Yield complete lines appended to a file, like tail -f
+
+    Starts at the end of the file unless from_start. A truncated or
+    replaced file (log rotation) is read again from its start. Stops when
+    stop() returns true, checked whenever no new data is available.
+    """
+    f = open(path, 'rb')
+    try:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = b''
+        while True:
+            data = f.read(1 << 16)
+            if data:
+                lines = (partial + data).split(b'\n')
+                partial = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield line
+                continue
+            if stop is not None and stop():
+                return
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None and (stat.st_ino != os.fstat(f.fileno()).st_ino or stat.st_size < f.tell()):
+                f.close()
+                f = open(path, 'rb')
+                partial = b''
+                continue
+            time.sleep(poll_interval)
+    finally:
+        f.close()
+
+
+def listen_lines(host, port, stop=None):
+    """Accept TCP connections and yield complete lines from any of them as they arrive"""
+    selector = selectors.DefaultSelector()
+    server = socket.create_server((host, port))
+    server.setblocking(False)
+    selector.register(server, selectors.EVENT_READ)
+    partial = {}
+    try:
+        while stop is None or not stop():
+            for key, _ in selector.select(timeout=0.5):
+                if key.fileobj is server:
+                    connection, _ = server.accept()
+                    connection.setblocking(False)
+                    selector.register(connection, selectors.EVENT_READ)
+                    partial[connection] = b''
+                    continue
+                connection = key.fileobj
+                data = connection.recv(1 << 16)
+                if not data:
+                    selector.unregister(connection)
+                    connection.close()
+                    lines = [partial.pop(connection)]
+                else:
+                    lines = (partial[connection] + data).split(b'\n')
+                    partial[connection] = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield line
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Raise stewardship alerts from a stream of prescription events")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--follow', help="JSON-lines event file to follow as it grows")
+    source.add_argument('--listen', help="host:port to accept JSON-lines events on over TCP")
+    source.add_argument('--replay', help="JSON-lines event file to process once, from its start")
+    parser.add_argument('--from-start', action='store_true', help="With --follow, process existing lines first")
+    parser.add_argument('--alerts', help="File to append alerts to as JSON lines (default: stdout)")
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW, help="Sliding window in seconds")
+    parser.add_argument('--watch-share', type=float, default=0.3,
+                        help="Alert when a ward's Watch share in the window reaches this fraction")
+    parser.add_argument('--min-events', type=int, default=20,
+                        help="Classified prescriptions a window needs before its share is judged")
+    parser.add_argument('--cooldown', type=float, default=3600,
+                        help="Seconds before the same Reserve drug on the same ward alerts again")
+    parser.add_argument('--fuzzy', action='store_true', help="Resolve brand names, salts, routes and misspellings")
+    args = parser.parse_args(argv)
+
+    output = open(args.alerts, 'a') if args.alerts else sys.stdout
+
+    def emit(alert):
+        output.write(json.dumps(alert) + '\n')
+        output.flush()
+
+    rules = [ReserveRule(cooldown=args.cooldown),
+             WatchShareRule(threshold=args.watch_share, min_events=args.min_events)]
+    engine = AlertEngine(rules, EventIndex(fuzzy=args.fuzzy), window=args.window, emit=emit)
+    metrics.serve_from_env()
+    if args.follow:
+        lines = follow_file(args.follow, from_start=args.from_start)
+    elif args.listen:
+        host, port = args.listen.rsplit(':', 1)
+        lines = listen_lines(host, int(port))
+    else:
+        lines = open(args.replay, 'rb')
+    try:
+        engine.run(lines)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Processed {engine.n_events:,} events ({engine.n_unclassified:,} unclassified, "
+          f"{engine.n_invalid:,} invalid), raised {engine.n_alerts:,} alerts", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""Read-only HTTP classification API
+
+A dependency-free ASGI application over the shared reference table:
+
+    GET  /health
+    GET  /metrics           Prometheus text, or OpenMetrics if the Accept header asks for it
+    GET  /classify?name=Amikacin[&fuzzy=1]
+    POST /classify          {"names": ["Amikacin", ...], "fuzzy": false}
+
+Run it with any ASGI server, for example with several worker processes
+(each memory-maps the same reference snapshot):
+
+    uvicorn aware.api:app --workers 4
+    python -m aware.api --workers 4
+"""
+import asyncio
+import json
+from functools import lru_cache
+from urllib.parse import parse_qs
+
+from aware import metrics
+from aware.classifier import CLASSIFICATION_COLUMNS, text_columns
+from aware.reference import get_reference, on_invalidate
+
+RESULT_COLUMNS = ['Antibiotic', *CLASSIFICATION_COLUMNS]
+MAX_BATCH = 100_000
+
+# Batch bodies up to this size (roughly 1,000 names) have their response
+# cached; larger ones are classified on a worker thread so the event loop
+# keeps serving other requests meanwhile
+MAX_CACHED_BODY = 16 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _records(classified, resolved=None):
+    """Turn a classified frame into a list of JSON-ready dicts"""
+    # EML as Yes/No and None for unknown names, as the JSON has always had them
+    classified = text_columns(classified)
+    columns = [classified[col].tolist() for col in RESULT_COLUMNS]
+    records = [dict(zip(RESULT_COLUMNS, values)) for values in zip(*columns)]
+    if resolved is not None:
+        for record, query, confidence in zip(records, resolved['Input'].tolist(), resolved['Confidence'].tolist()):
+            record['Query'] = query
+            record['Confidence'] = round(confidence, 4)
+    return records
+
+
+def classify_names(names, fuzzy=False):
+    """Classify a list of names into JSON-ready records"""
+    reference = get_reference()
+    if not fuzzy:
+        return _records(reference.classifier.classify(names))
+    resolved = reference.matcher.resolve(names)
+    return _records(reference.classifier.classify(resolved['Antibiotic']), resolved)
+
+
+@lru_cache(maxsize=65_536)
+def _single_response(name, fuzzy):
+    record = classify_names([name], fuzzy)[0]
+    if record['Category'] is None:
+        raise HTTPError(404, f"'{name}' is not in the AWaRe list")
+    return json.dumps(record).encode()
+
+
+def _batch_response_uncached(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON")
+    names = payload.get('names') if isinstance(payload, dict) else None
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise HTTPError(400, "'names' must be a list of strings")
+    if len(names) > MAX_BATCH:
+        raise HTTPError(413, f"At most {MAX_BATCH} names per request")
+    return json.dumps({'results': classify_names(names, bool(payload.get('fuzzy')))}).encode()
+
+
+_batch_response_cached = lru_cache(maxsize=1024)(_batch_response_uncached)
+
+metrics.register_cache('api_single', _single_response)
+metrics.register_cache('api_batch', _batch_response_cached)
+
+
+@on_invalidate
+def _clear_responses():
+    # Responses were classified against the dropped reference table
+    _single_response.cache_clear()
+    _batch_response_cached.cache_clear()
+
+
+def _batch_response(body):
+    if len(body) <= MAX_CACHED_BODY:
+        return _batch_response_cached(body)
+    return _batch_response_uncached(body)
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _send(send, status, body, content_type=b'application/json'):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _handle(scope, receive):
+    path, method = scope['path'], scope['method']
+    if path == '/health' and method == 'GET':
+        return json.dumps({'status': 'ok', 'drugs': len(get_reference())}).encode()
+    if path != '/classify':
+        raise HTTPError(404, "Not found")
+
+    if method == 'GET':
+        query = parse_qs(scope.get('query_string', b'').decode())
+        if 'name' not in query:
+            raise HTTPError(400, "Missing 'name' query parameter")
+        return _single_response(query['name'][0], query.get('fuzzy', ['0'])[0] in ('1', 'true'))
+    if method == 'POST':
+        body = await _read_body(receive)
+        if len(body) > MAX_CACHED_BODY:
+            return await asyncio.to_thread(_batch_response, body)
+        return _batch_response(body)
+    raise HTTPError(405, "Method not allowed")
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the reference table before the first request arrives
+                get_reference()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    if scope['path'] == '/metrics' and scope['method'] == 'GET':
+        headers = dict(scope.get('headers', []))
+        openmetrics = metrics.wants_openmetrics(headers.get(b'accept', b'').decode())
+        content_type = metrics.OPENMETRICS_CONTENT_TYPE if openmetrics else metrics.PROMETHEUS_CONTENT_TYPE
+        await _send(send, 200, metrics.render(openmetrics).encode(), content_type.encode())
+        return
+
+    with metrics.span('api_request'):
+        try:
+            body = await _handle(scope, receive)
+            status = 200
+        except HTTPError as error:
+            body = json.dumps({'error': error.message}).encode()
+            status = error.status
+    metrics.inc('aware_api_requests', status=status)
+    await _send(send, status, body)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the AWaRe classification API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API server needs uvicorn: pip install uvicorn")
+    uvicorn.run('aware.api:app', host=args.host, port=args.port, workers=args.workers, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
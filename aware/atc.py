@@ -0,0 +1,159 @@
+"""Hierarchical ATC-code index over the reference table
+
+ATC codes are hierarchical by prefix (J -> J01 -> J01C -> J01CA -> J01CA04),
+so the reference codes are kept in one sorted array: an exact code or any
+prefix is a pair of binary searches returning a contiguous slice of rows.
+
+A few codes cover several reference entries that differ only by route
+(J01XX01 is Fosfomycin_IV, Reserve, and Fosfomycin_oral, Watch). Bulk
+classification resolves those with an optional route column. Without a
+route, only the columns on which every entry agrees are filled.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aware import metrics
+from aware.classifier import CompactValues
+from aware.matching import ROUTE_WORDS
+
+# Code length at each ATC level
+LEVEL_LENGTHS = {1: 1, 2: 3, 3: 4, 4: 5, 5: 7}
+
+ATC_CLASSIFICATION_COLUMNS = ['Antibiotic', 'Class', 'Category', 'EML']
+_VALUE_COLUMNS = ['Antibiotic', 'Class', 'ATC', 'Category', 'EML']
+
+_CODE_PATTERN = re.compile(r'^[A-Z]\d{2}[A-Z]{2}\d{2}$')
+
+# WHO ATC/DDD administration routes, on top of the free-text route words
+ROUTE_CODES = {**ROUTE_WORDS, 'p': 'iv', 'o': 'oral'}
+
+
+def _reference_route(name):
+    suffix = name.rsplit('_', 1)[1].lower() if '_' in name else None
+    return ROUTE_CODES.get(suffix)
+
+
+def normalize_route(route):
+    if route is None or (isinstance(route, float) and np.isnan(route)):
+        return None
+    return ROUTE_CODES.get(str(route).strip().lower())
+
+
+class ATCIndex:
+    """Exact, prefix and bulk ATC-code lookups over drug_db"""
+
+    def __init__(self, drug_db, categories=None, cache_size=256):
+        self.drug_db = drug_db
+        # Column order of rollup() tables; defaults to the categories present
+        self.categories = list(categories) if categories else sorted(drug_db['Category'].dropna().unique())
+        codes = drug_db['ATC'].astype(str).str.strip().str.upper()
+        valid = codes.str.match(_CODE_PATTERN).to_numpy()
+
+        # Sorted codes and the reference row each one belongs to
+        positions = np.flatnonzero(valid)
+        order = np.argsort(codes.to_numpy(dtype=str)[positions], kind='stable')
+        self.codes = codes.to_numpy(dtype=str)[positions][order]
+        self.positions = positions[order]
+
+        self._build_bulk_tables(codes[valid], drug_db[valid])
+        self._rollup = lru_cache(maxsize=cache_size)(self._rollup_uncached)
+
+    def _build_bulk_tables(self, codes, rows):
+        """Precompute the code -> row mapping used by classify_codes"""
+        values = {col: list(self.drug_db[col].astype(object)) for col in _VALUE_COLUMNS}
+        n_rows = len(self.drug_db)
+
+        unique_codes, code_rows = [], []
+        self._route_rows = {}
+        for code, group in rows.groupby(codes.to_numpy(), sort=True):
+            unique_codes.append(code)
+            if len(group) == 1:
+                code_rows.append(self.drug_db.index.get_loc(group.index[0]))
+                continue
+            # Several route variants share the code: add a merged row holding
+            # only the values they all agree on, and remember each route's row
+            for label, name in zip(group.index, group['Antibiotic']):
+                self._route_rows[(code, _reference_route(name))] = self.drug_db.index.get_loc(label)
+            code_rows.append(len(values['Antibiotic']))
+            for col in _VALUE_COLUMNS:
+                distinct = group[col].unique()
+                values[col].append(distinct[0] if len(distinct) == 1 else None)
+
+        # Encoded with a trailing null row for unknown codes (-1)
+        self._values = CompactValues(pd.DataFrame(values, dtype=object), _VALUE_COLUMNS)
+        self._code_index = pd.Index(unique_codes, dtype=object)
+        self._code_rows = np.append(np.array(code_rows, dtype=np.int64), [-1])
+        self._first_merged_row = n_rows
+
+    def prefix_positions(self, prefix):
+        """Return the reference row positions whose code starts with prefix (any ATC level)"""
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return np.sort(self.positions)
+        start = np.searchsorted(self.codes, prefix, side='left')
+        stop = np.searchsorted(self.codes, prefix + '\uffff', side='left')
+        return np.sort(self.positions[start:stop])
+
+    def lookup(self, prefix):
+        """Return the reference rows for an exact code or a prefix such as 'J01C'"""
+        return self.drug_db.iloc[self.prefix_positions(prefix)]
+
+    def rollup(self, level, prefix=''):
+        """Count reference drugs per ATC group at level (1-5) and Category
+
+        Tables are memoized per (level, prefix) and shared between callers,
+        so they must not be modified.
+        """
+        return self._rollup(level, (prefix or '').strip().upper())
+
+    def _rollup_uncached(self, level, prefix):
+        positions = self.prefix_positions(prefix)
+        rows = self.drug_db.iloc[positions]
+        groups = rows['ATC'].str.strip().str.upper().str[:LEVEL_LENGTHS[level]].rename(f'ATC level {level}')
+        table = pd.crosstab(groups, rows['Category']).reindex(columns=self.categories, fill_value=0)
+        table.columns.name = None
+        return table
+
+    def _row_codes(self, codes, routes):
+        code_ids, uniques = pd.factorize(pd.Series(codes, dtype=object))
+        normalized = pd.Index(uniques, dtype=object).astype(str).str.strip().str.upper()
+        unique_rows = self._code_rows.take(self._code_index.get_indexer(normalized))
+        rows = np.append(unique_rows, [-1]).take(code_ids)
+        if routes is None or not self._route_rows:
+            return rows
+
+        # Only rows on a merged (multi-route) code need their route looked at
+        merged = np.flatnonzero(rows >= self._first_merged_row)
+        if len(merged):
+            pair_ids, pairs = pd.factorize(pd.MultiIndex.from_arrays([
+                np.asarray(normalized, dtype=object)[code_ids[merged]],
+                pd.Series(routes).to_numpy(dtype=object)[merged],
+            ]))
+            pair_rows = np.array([self._route_rows.get((code, normalize_route(route)), -2) for code, route in pairs])
+            resolved = pair_rows.take(pair_ids)
+            rows[merged] = np.where(resolved == -2, rows[merged], resolved)
+        return rows
+
+    def classify_codes(self, codes, routes=None):
+        """Classify a Series/array of ATC codes, optionally with a parallel route array
+
+        Returns a DataFrame aligned to the input with the Antibiotic, Class,
+        ATC, Category and EML of the matching reference entry (nulls for
+        unknown codes).
+        """
+        index = codes.index if isinstance(codes, pd.Series) else None
+        rows = self._row_codes(codes, routes)
+        metrics.inc('aware_rows_processed', len(rows), kind='atc')
+        return pd.DataFrame({col: self._values.take(col, rows) for col in _VALUE_COLUMNS}, index=index)
+
+    def annotate(self, frame, atc_column, route_column=None):
+        """Return a copy of frame with the classification of its ATC codes appended"""
+        routes = frame[route_column] if route_column else None
+        classified = self.classify_codes(frame[atc_column], routes)
+        annotated = frame.copy()
+        for col in ATC_CLASSIFICATION_COLUMNS:
+            annotated[col] = classified[col].array
+        return annotated
@@ -0,0 +1,430 @@
+"""Chunked classification of prescription extract files
+
+Input rows are read, classified and written in fixed-size chunks so peak
+memory depends on the chunk size rather than on the file size. Used by the
+File Upload tab in Main.py and as a CLI:
+
+    python -m aware.batch extract.csv annotated.parquet --column Drug
+    python -m aware.batch extract.csv.gz annotated.arrow
+    python -m aware.batch extract.csv annotated.parquet --atc-column ATC --route-column Route
+    python -m aware.batch weekly_extract.csv annotated.parquet --cache
+"""
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+
+from aware import metrics
+from aware.classifier import CLASSIFICATION_COLUMNS, text_columns
+from aware.reference import get_reference
+from aware.stats import DIMENSIONS, AggregateCube
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# File suffix -> format name understood by iter_chunks / open_writer
+FORMATS = {
+    '.csv': 'csv',
+    '.gz': 'csv.gz',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.xlsx': 'xlsx',
+}
+
+
+def detect_format(name):
+    """Guess the file format from a path or uploaded file name"""
+    suffix = os.path.splitext(str(name).lower())[1]
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported file type '{suffix}', expected one of: {', '.join(sorted(FORMATS))}")
+    return FORMATS[suffix]
+
+
+def _iter_xlsx_chunks(source, chunksize):
+    from openpyxl import load_workbook
+
+    # read_only mode streams rows from the sheet XML instead of loading it all
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value) for value in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append([None if value is None else str(value) for value in row])
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=header, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(source, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most chunksize rows from a CSV, Parquet, Arrow IPC or XLSX source"""
+    if fmt in ('csv', 'csv.gz'):
+        # Read every column as text so chunk schemas stay identical
+        yield from pd.read_csv(source, dtype=str, chunksize=chunksize,
+                               compression='gzip' if fmt == 'csv.gz' else 'infer')
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif fmt == 'arrow':
+        import pyarrow as pa
+
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).to_pandas()
+    elif fmt == 'xlsx':
+        yield from _iter_xlsx_chunks(source, chunksize)
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+
+def read_columns(source, fmt):
+    """Return the column names of a source without reading its rows"""
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        columns = pq.ParquetFile(source).schema_arrow.names
+    elif fmt == 'arrow':
+        import pyarrow as pa
+
+        columns = pa.ipc.open_file(source).schema.names
+    else:
+        columns = list(next(iter_chunks(source, fmt, chunksize=1)).columns)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return columns
+
+
+class CsvChunkWriter:
+    """Append annotated chunks to a CSV file, writing the header once
+
+    The classification columns are written as text, with EML as Yes/No.
+    With compression='gzip' the file is one gzip stream, compressed chunk
+    by chunk.
+    """
+
+    def __init__(self, destination, compression=None):
+        self.destination = destination
+        self._header = True
+        self._gzip = None
+        if compression == 'gzip':
+            if isinstance(destination, (str, os.PathLike)):
+                self._gzip = gzip.open(destination, 'wb', compresslevel=6)
+            else:
+                self._gzip = gzip.GzipFile(fileobj=destination, mode='wb', compresslevel=6)
+        elif compression is not None:
+            raise ValueError(f"Unsupported compression '{compression}', expected gzip")
+
+    def write(self, chunk):
+        chunk = text_columns(chunk)
+        if self._gzip is not None:
+            self._gzip.write(chunk.to_csv(header=self._header, index=False).encode())
+        elif isinstance(self.destination, (str, os.PathLike)):
+            chunk.to_csv(self.destination, mode='w' if self._header else 'a', header=self._header, index=False)
+        else:
+            chunk.to_csv(self.destination, header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        # Only the gzip stream is closed: a file object destination stays open for the caller
+        if self._gzip is not None:
+            self._gzip.close()
+
+
+def _output_schema(table, decode_dictionaries=False):
+    """The schema every chunk of one output file is cast to
+
+    One index width for every chunk's dictionaries, and an all-null first
+    chunk would otherwise pin a column to the null type. With
+    decode_dictionaries, dictionary columns other than the classification
+    columns (whose categories are fixed) are written as plain values.
+    """
+    import pyarrow as pa
+
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type) and field.name in CLASSIFICATION_COLUMNS:
+            schema = schema.set(i, pa.field(field.name, pa.dictionary(pa.int32(), pa.string())))
+        elif pa.types.is_dictionary(field.type) and decode_dictionaries:
+            schema = schema.set(i, pa.field(field.name, field.type.value_type))
+        elif pa.types.is_null(field.type):
+            schema = schema.set(i, pa.field(field.name, pa.string()))
+    return schema
+
+
+class ParquetChunkWriter:
+    """Write annotated chunks as successive row groups of one Parquet file
+
+    Categorical classification columns are stored dictionary-encoded and
+    EML as a boolean, so they read back as categoricals and booleans.
+    """
+
+    def __init__(self, destination):
+        self.destination = destination
+        self._writer = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.destination, _output_schema(table))
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ArrowChunkWriter:
+    """Write annotated chunks as successive record batches of one Arrow IPC (Feather v2) file
+
+    Classification columns are dictionary-encoded as in Parquet. An IPC file
+    holds a single dictionary per column, so other categorical columns,
+    whose categories may differ from chunk to chunk, are written decoded.
+    """
+
+    def __init__(self, destination):
+        self.destination = destination
+        self._writer = None
+        self._sink = None
+        self._schema = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._schema = _output_schema(table, decode_dictionaries=True)
+            if isinstance(self.destination, (str, os.PathLike)):
+                self._sink = pa.OSFile(os.fspath(self.destination), 'wb')
+            self._writer = pa.ipc.new_file(self._sink or self.destination, self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+# Output formats of open_writer
+WRITE_FORMATS = ('csv', 'csv.gz', 'parquet', 'arrow')
+
+
+def open_writer(destination, fmt):
+    if fmt == 'csv':
+        return CsvChunkWriter(destination)
+    if fmt == 'csv.gz':
+        return CsvChunkWriter(destination, compression='gzip')
+    if fmt == 'parquet':
+        return ParquetChunkWriter(destination)
+    if fmt == 'arrow':
+        return ArrowChunkWriter(destination)
+    raise ValueError(f"Cannot write '{fmt}' output, use one of: {', '.join(WRITE_FORMATS)}")
+
+
+def _require_columns(chunk, *columns):
+    for column in columns:
+        if column and column not in chunk.columns:
+            raise KeyError(f"Column '{column}' not found, available columns: {', '.join(chunk.columns)}")
+
+
+def annotate_chunk(chunk, name_column, classifier, matcher=None, date_column=None, editions=None):
+    """Append the classification columns to one chunk
+
+    With a matcher, free-text names are first resolved onto reference names,
+    which are added as 'Matched Antibiotic' with their 'Match Confidence'.
+    With date_column, each row is classified under the edition of the
+    EditionStore editions in force at its date, recorded as 'Edition'.
+    """
+    _require_columns(chunk, name_column, date_column)
+    if date_column:
+        classifier = _AsOfClassifier(editions, date_column)
+    if matcher is None:
+        return classifier.annotate(chunk, name_column)
+
+    resolved = matcher.resolve(chunk[name_column])
+    chunk = chunk.assign(**{
+        'Matched Antibiotic': resolved['Antibiotic'],
+        'Match Confidence': resolved['Confidence'],
+    })
+    return classifier.annotate(chunk, 'Matched Antibiotic')
+
+
+class _AsOfClassifier:
+    """Adapts EditionStore.annotate_as_of to the DrugClassifier.annotate call above"""
+
+    def __init__(self, editions, date_column):
+        self.editions = editions
+        self.date_column = date_column
+
+    def annotate(self, frame, name_column):
+        return self.editions.annotate_as_of(frame, name_column, self.date_column)
+
+
+def annotate_atc_chunk(chunk, atc_column, atc_index, route_column=None):
+    """Append the reference Antibiotic and its classification, looked up by ATC code, to one chunk"""
+    _require_columns(chunk, atc_column, route_column)
+    return atc_index.annotate(chunk, atc_column, route_column)
+
+
+def classify_file(source, destination, name_column='Antibiotic', in_format=None, out_format=None,
+                  chunksize=DEFAULT_CHUNKSIZE, classifier=None, fuzzy=False, atc_column=None, route_column=None,
+                  edition=None, date_column=None):
+    """Classify every row of source chunk by chunk and write the annotated rows to destination
+
+    source/destination may be paths or file objects; formats are taken from
+    the file suffix unless given. fuzzy=True resolves brand names, salts,
+    routes and misspellings through the reference NameMatcher. With
+    atc_column, rows are classified by ATC code instead of by name, using
+    route_column (if given) to split codes shared by IV and oral forms.
+    edition classifies under another loaded WHO edition than the current
+    one; date_column classifies each row under the edition in force at its
+    date. Returns a dict with row and match counts.
+    """
+    in_format = in_format or detect_format(getattr(source, 'name', source))
+    out_format = out_format or detect_format(getattr(destination, 'name', destination))
+    reference = get_reference()
+    classifier = classifier or reference.classifier
+    matcher = reference.matcher if fuzzy else None
+    editions = None
+    if edition is not None or date_column:
+        # Imported here: aware.editions builds on this module
+        from aware.editions import get_editions
+        editions = get_editions()
+        if edition is not None:
+            classifier = editions.classifier(edition)
+
+    summary = {'rows': 0, 'matched': 0}
+    writer = open_writer(destination, out_format)
+    try:
+        for chunk in iter_chunks(source, in_format, chunksize):
+            with metrics.span('batch_annotate'):
+                if atc_column:
+                    annotated = annotate_atc_chunk(chunk, atc_column, reference.atc_index, route_column)
+                else:
+                    annotated = annotate_chunk(chunk, name_column, classifier, matcher, date_column, editions)
+            with metrics.span('batch_write'):
+                writer.write(annotated)
+            summary['rows'] += len(annotated)
+            summary['matched'] += int(annotated['Category'].notna().sum())
+    finally:
+        writer.close()
+    summary['unmatched'] = summary['rows'] - summary['matched']
+    return summary
+
+
+def month_labels(dates):
+    """Return dates as a Categorical of YYYY-MM labels, missing where blank or unparseable
+
+    Each distinct date value is parsed only once.
+    """
+    date_codes, uniques = pd.factorize(dates)
+    months = pd.to_datetime(pd.Series(uniques), errors='coerce').dt.strftime('%Y-%m')
+    month_codes, labels = pd.factorize(months)
+    # A missing date keeps the -1 (missing) code
+    codes = np.append(month_codes, -1).take(date_codes)
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def usage_cube(chunks, quantity_column, name_column='Antibiotic', group_columns=(), date_column=None,
+               fuzzy=False, atc_column=None, route_column=None, dimensions=DIMENSIONS):
+    """Sum quantity_column per group_columns x dimensions over an iterable of usage chunks
+
+    With date_column, rows are also grouped by their 'Month' (YYYY-MM). With
+    atc_column, rows are classified by ATC code (and route_column, if given)
+    instead of by name. Rows whose drug is not in the AWaRe list are kept
+    under 'Unclassified', rows with a blank group value or date under
+    'Unknown'. Returns an AggregateCube.
+    """
+    reference = get_reference()
+    matcher = reference.matcher if fuzzy else None
+    groups = [*group_columns, *(['Month'] if date_column else [])]
+    # Only the columns the cube needs are annotated, not the whole extract
+    key_columns = [atc_column, route_column] if atc_column else [name_column]
+    columns = list(dict.fromkeys(col for col in (*key_columns, *group_columns, quantity_column) if col))
+
+    cube = AggregateCube(groups, dimensions)
+    for chunk in chunks:
+        _require_columns(chunk, *columns, date_column)
+        with metrics.span('batch_annotate'):
+            if atc_column:
+                annotated = annotate_atc_chunk(chunk[columns], atc_column, reference.atc_index, route_column)
+            else:
+                annotated = annotate_chunk(chunk[columns], name_column, reference.classifier, matcher)
+        if date_column:
+            annotated['Month'] = month_labels(chunk[date_column])
+        with metrics.span('batch_aggregate'):
+            cube.add(annotated, measure=quantity_column)
+    return cube
+
+
+def aggregate_usage(source, quantity_column, name_column='Antibiotic', in_format=None,
+                    chunksize=DEFAULT_CHUNKSIZE, fuzzy=False, **options):
+    """Sum quantity_column per Category x Class x EML over a usage file, chunk by chunk
+
+    options (group_columns, date_column, atc_column, route_column,
+    dimensions) are passed to usage_cube. Returns an AggregateCube, e.g.
+    cube.shares('Category') for the Access share.
+    """
+    in_format = in_format or detect_format(getattr(source, 'name', source))
+    return usage_cube(iter_chunks(source, in_format, chunksize), quantity_column, name_column, fuzzy=fuzzy,
+                      **options)
+
+
+def cli_message(error):
+    """The message of an input error, for parser.error (str() of a KeyError quotes it)"""
+    if isinstance(error, FileNotFoundError):
+        return f"No such file: '{error.filename}'"
+    return str(error.args[0]) if isinstance(error, KeyError) and error.args else str(error)
+
+
+def main(argv=None):
+    # Imported here to keep argparse off the app's startup path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classify a CSV/Parquet/XLSX prescription extract into AWaRe categories")
+    parser.add_argument('input', help="CSV (optionally .gz), Parquet, Arrow IPC or XLSX file to classify")
+    parser.add_argument('output', help="Annotated output file (.csv, .csv.gz, .parquet or .arrow)")
+    parser.add_argument('--column', default='Antibiotic', help="Column holding the drug name (default: Antibiotic)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument('--fuzzy', action='store_true', help="Resolve brand names, salts, routes and misspellings")
+    parser.add_argument('--atc-column', help="Classify by the ATC codes in this column instead of by name")
+    parser.add_argument('--route-column', help="Route column (IV/oral, P/O) used with --atc-column")
+    parser.add_argument('--edition', help="Classify under this WHO edition (default: the latest)")
+    parser.add_argument('--date-column', help="Classify each row under the edition in force at this date")
+    parser.add_argument('--cache', action='store_true',
+                        help="Reuse results of earlier runs on the same file (or its append-only predecessor)")
+    parser.add_argument('--cache-dir', help="Result cache directory (default: $AWARE_CACHE_DIR or ~/.cache/aware/results)")
+    args = parser.parse_args(argv)
+
+    options = dict(name_column=args.column, chunksize=args.chunksize, fuzzy=args.fuzzy, atc_column=args.atc_column,
+                   route_column=args.route_column, edition=args.edition, date_column=args.date_column)
+    try:
+        if args.cache or args.cache_dir:
+            # Imported here: aware.result_cache builds on this module
+            from aware.result_cache import ResultCache
+            summary = ResultCache(args.cache_dir).classify_file(args.input, args.output, **options)
+        else:
+            summary = classify_file(args.input, args.output, **options)
+    except (KeyError, ValueError, FileNotFoundError) as error:
+        # A missing column, an unsupported format or edition, or no such input file
+        parser.error(cli_message(error))
+    print(f"Classified {summary['rows']:,} rows: {summary['matched']:,} matched, {summary['unmatched']:,} unmatched")
+    if 'cache' in summary:
+        print(f"Result cache: {summary['cache']}, {summary['classified_rows']:,} rows classified in this run")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Batched HTML rendering of classification result cards
+
+All cards for a result frame are built in one vectorized pass over its
+columns and share one <style> block, so the page gets a single markdown
+element per page of cards instead of one element (with its own inline CSS)
+per drug.
+"""
+import html
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import eml_flags
+
+CARDS_PER_PAGE = 100
+
+# High contrast card colours per AWaRe category; unknown categories render as Reserve
+CARD_CSS = """
+<style>
+.aware-card { padding: 15px; border-radius: 10px; border-left: 5px solid; margin: 10px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+.aware-card h4 { margin: 0; font-weight: bold; font-size: 1.2em; color: inherit; }
+.aware-card p { margin: 5px 0; color: inherit; }
+.aware-card .aware-row { display: flex; justify-content: space-between; align-items: center; }
+.aware-card .aware-category { font-size: 1.1em; font-weight: bold; }
+.aware-card .aware-right { text-align: right; }
+.aware-card .aware-atc { margin-top: 10px; padding-top: 10px; border-top: 2px solid; border-color: inherit; }
+.aware-card .aware-atc p { margin: 0; font-weight: bold; }
+.aware-access { background-color: #66BB6A; color: #1B5E20; border-color: #2E7D32; }
+.aware-watch { background-color: #FFD54F; color: #5D4037; border-color: #FF8F00; }
+.aware-reserve { background-color: #EF5350; color: #B71C1C; border-color: #D32F2F; }
+</style>
+"""
+
+CATEGORY_CLASSES = {'Access': 'aware-access', 'Watch': 'aware-watch', 'Reserve': 'aware-reserve'}
+CATEGORY_ICONS = {'Access': "🟢", 'Watch': "🟡", 'Reserve': "🔴"}
+
+
+def _escaped(series):
+    return series.astype(object).fillna('').astype(str).map(html.escape)
+
+
+def card_html(results):
+    """Return the HTML of one card per row of results, without the style block"""
+    if results.empty:
+        return ''
+    category = results['Category'].astype(object)
+    css_class = category.map(CATEGORY_CLASSES).fillna('aware-reserve')
+    icon = category.map(CATEGORY_ICONS).fillna(CATEGORY_ICONS['Reserve'])
+    eml = pd.Series(np.where(eml_flags(results['EML']).to_numpy(dtype=bool, na_value=False), "🟢 Yes", "🔴 No"),
+                    index=results.index, dtype=object)
+
+    cards = (
+        '<div class="aware-card ' + css_class + '"><div class="aware-row"><div>'
+        + '<h4>' + _escaped(results['Antibiotic']) + '</h4>'
+        + '<p class="aware-category">' + icon + ' ' + _escaped(category) + '</p>'
+        + '</div><div class="aware-right">'
+        + '<p><strong>Class:</strong> ' + _escaped(results['Class']) + '</p>'
+        + '<p><strong>EML:</strong> ' + eml + '</p>'
+        + '</div></div><div class="aware-atc"><p><strong>ATC Code:</strong> ' + _escaped(results['ATC']) + '</p></div></div>'
+    )
+    return ''.join(cards.tolist())
+
+
+def render_cards(results, page=0, per_page=CARDS_PER_PAGE):
+    """Return one self-contained HTML block for a page (0-based) of result cards"""
+    rows = results.iloc[page * per_page:(page + 1) * per_page]
+    return CARD_CSS + card_html(rows)
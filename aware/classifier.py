@@ -0,0 +1,182 @@
+"""Vectorized drug name -> AWaRe classification
+
+Classification columns are dictionary-encoded: Class, ATC and Category are
+pandas categoricals (Category with the three AWaRe levels) and EML is a
+nullable boolean. A classified row then costs one or two bytes per column
+instead of a pointer to a string, and Parquet output keeps the encoding.
+Text outputs (CSV, JSON, on-screen tables) go through text_columns(), which
+spells EML as Yes/No as before.
+"""
+import numpy as np
+import pandas as pd
+
+from aware import metrics
+from aware.drug_database import create_drug_database
+
+# Columns copied from the reference table onto every classified name
+CLASSIFICATION_COLUMNS = ['Class', 'ATC', 'Category', 'EML']
+
+# AWaRe categories, in order; every Category column uses CATEGORY_DTYPE
+CATEGORIES = ('Access', 'Watch', 'Reserve')
+CATEGORY_DTYPE = pd.CategoricalDtype(list(CATEGORIES))
+
+# EML text values (as in the WHO list and CSV files) and their boolean form
+EML_FLAGS = {'Yes': True, 'No': False, True: True, False: False}
+
+
+def eml_flags(values):
+    """Return EML values (Yes/No text or booleans) as a nullable boolean array"""
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return values.array.astype('boolean')
+    # Map each distinct value once; anything else is missing
+    ids, uniques = pd.factorize(values)
+    flags = np.array([EML_FLAGS.get(value, -1) for value in uniques] + [-1], dtype=np.int8).take(ids)
+    return pd.arrays.BooleanArray(flags == 1, flags < 0)
+
+
+def eml_labels(values):
+    """Return EML values as a Yes/No text Series, None where missing"""
+    index = values.index if isinstance(values, pd.Series) else None
+    flags = eml_flags(values)
+    labels = np.where(flags.to_numpy(dtype=bool, na_value=False), 'Yes', 'No').astype(object)
+    labels[flags.isna()] = None
+    return pd.Series(labels, index=index, dtype=object)
+
+
+def text_columns(frame):
+    """Return a shallow copy of frame with its classification columns as plain text
+
+    EML becomes Yes/No and missing values None, as CSV, JSON and on-screen
+    tables have always shown them.
+    """
+    text = frame.copy(deep=False)
+    for col in ['Antibiotic', *CLASSIFICATION_COLUMNS]:
+        if col not in text.columns:
+            continue
+        values = text[col]
+        if col == 'EML' and pd.api.types.is_bool_dtype(values.dtype):
+            text[col] = eml_labels(values)
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            labels = np.append(values.cat.categories.to_numpy(dtype=object), [None])
+            text[col] = pd.Series(labels.take(values.cat.codes.to_numpy()), index=text.index, dtype=object)
+    return text
+
+
+def compact_reference(drug_db):
+    """Return a copy of drug_db with categorical Class/ATC/Category and a boolean EML"""
+    compact = drug_db.copy()
+    for col in ('Class', 'ATC'):
+        compact[col] = drug_db[col].astype('category')
+    compact['Category'] = drug_db['Category'].astype(CATEGORY_DTYPE)
+    compact['EML'] = pd.Series(eml_flags(drug_db['EML']), index=drug_db.index)
+    return compact
+
+
+class CompactValues:
+    """Reference column values as category codes, with a trailing null slot
+
+    take() turns reference row positions (-1 for none) into a categorical or,
+    for EML, boolean column by indexing small integer codes, so no string
+    objects are touched per classified row.
+    """
+
+    def __init__(self, frame, columns):
+        self.dtypes, self.codes = {}, {}
+        for col in columns:
+            if col == 'EML':
+                flags = eml_flags(frame[col])
+                codes = np.where(flags.isna(), -1, flags.to_numpy(dtype=bool, na_value=False)).astype(np.int8)
+                self.dtypes[col] = pd.BooleanDtype()
+            else:
+                self.dtypes[col] = self._categorical_dtype(col, frame[col])
+                codes = pd.Categorical(frame[col], dtype=self.dtypes[col]).codes
+            self.codes[col] = np.append(codes, np.array([-1], dtype=codes.dtype))
+
+    @staticmethod
+    def _categorical_dtype(col, values):
+        if col == 'Category':
+            return CATEGORY_DTYPE
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values.dtype
+        return pd.CategoricalDtype(sorted(pd.unique(values.dropna())))
+
+    def array(self, col, codes):
+        """Build a column of col from per-row codes (-1 for missing)"""
+        if isinstance(self.dtypes[col], pd.BooleanDtype):
+            return pd.arrays.BooleanArray(codes == 1, codes < 0)
+        return pd.Categorical.from_codes(codes, dtype=self.dtypes[col], validate=False)
+
+    def take(self, col, rows):
+        """Return the values of col at reference rows (-1 for missing)"""
+        return self.array(col, self.codes[col].take(rows))
+
+    def encode(self, col, values):
+        """Return the codes of existing values of col, e.g. read back from an annotated file"""
+        if isinstance(self.dtypes[col], pd.BooleanDtype):
+            flags = eml_flags(values)
+            return np.where(flags.isna(), -1, flags.to_numpy(dtype=bool, na_value=False)).astype(np.int8)
+        # Codes are only reusable under the same categories in the same order: unordered
+        # CategoricalDtypes compare equal whatever the order of their categories
+        if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.equals(self.dtypes[col].categories):
+            return values.cat.codes.to_numpy(copy=True)
+        return pd.Categorical(values, dtype=self.dtypes[col]).codes.copy()
+
+
+class DrugClassifier:
+    """Vectorized drug name -> AWaRe classification lookup
+
+    The reference table is indexed once by drug name. Classifying a batch is a
+    single hash join of the input against that index followed by positional
+    takes, so the cost is linear in the number of input rows and never scans
+    the reference table per row.
+    """
+
+    def __init__(self, drug_db=None):
+        if drug_db is None:
+            drug_db = create_drug_database()
+        self.drug_db = compact_reference(drug_db.drop_duplicates('Antibiotic').reset_index(drop=True))
+        self.name_index = pd.Index(self.drug_db['Antibiotic'])
+
+        # Reference codes with a trailing null slot, so that the -1 code
+        # returned for unknown names takes a null without extra masking
+        self._values = CompactValues(self.drug_db, CLASSIFICATION_COLUMNS)
+
+    def lookup_codes(self, names):
+        """Return the reference row position of each name, or -1 if unknown"""
+        if isinstance(names, pd.Series) and isinstance(names.dtype, pd.CategoricalDtype):
+            # Resolve the (few) categories once and broadcast through the codes
+            category_codes = self.name_index.get_indexer(names.cat.categories)
+            category_codes = np.append(category_codes, [-1])
+            return category_codes.take(names.cat.codes.to_numpy())
+        return self.name_index.get_indexer(pd.Index(names, dtype=object))
+
+    def classify(self, names):
+        """Classify a Series/array of drug names
+
+        Returns a DataFrame aligned to the input with the Antibiotic name and
+        the categorical Class, ATC, Category and boolean EML columns.
+        Unknown names get nulls.
+        """
+        if not isinstance(names, pd.Series):
+            names = pd.Series(names, dtype=object)
+        codes = self.lookup_codes(names)
+        metrics.inc('aware_rows_processed', len(codes), kind='name')
+
+        result = {'Antibiotic': names}
+        for col in CLASSIFICATION_COLUMNS:
+            result[col] = self._values.take(col, codes)
+        return pd.DataFrame(result, index=names.index)
+
+    def annotate(self, frame, name_column='Antibiotic'):
+        """Return a copy of frame with the classification columns appended"""
+        classified = self.classify(frame[name_column])
+        annotated = frame.copy()
+        for col in CLASSIFICATION_COLUMNS:
+            annotated[col] = classified[col].array
+        return annotated
+
+
+def classify_drugs(names, drug_db=None):
+    """Classify drug names against drug_db (the built-in WHO 2023 list by default)"""
+    return DrugClassifier(drug_db).classify(names)
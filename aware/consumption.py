@@ -0,0 +1,122 @@
+"""AWaRe consumption index over large dispensing datasets
+
+Joins dispensing/consumption records to the reference Category and sums the
+consumed quantity (e.g. DDDs) per facility, ward and month. Files are read
+chunk by chunk into a usage AggregateCube keyed by the groups and Category,
+so memory depends on the number of groups rather than on the number of
+rows. The result has one row per group with Access/Watch/Reserve totals
+and shares of the classified total, written to Parquet for the
+Consumption Index tab:
+
+    python -m aware.consumption dispensing.parquet aware_index.parquet \\
+        --name-column Drug --quantity DDD --date-column DispenseDate --group Facility Ward
+
+Records that carry ATC codes rather than drug names can be joined with
+--atc-column (and --route-column for codes shared by IV and oral forms).
+"""
+from aware.batch import DEFAULT_CHUNKSIZE, aggregate_usage, cli_message, usage_cube
+from aware.reference import CATEGORIES
+from aware.stats import UNCLASSIFIED
+
+SHARE_COLUMNS = [f'{category} %' for category in CATEGORIES]
+
+# Value columns of a consumption index; every other column is a grouping level
+CONSUMPTION_COLUMNS = [*CATEGORIES, UNCLASSIFIED, 'AWaRe Total', *SHARE_COLUMNS]
+
+
+def category_totals(cube):
+    """Sum a usage cube over everything but its groups, into a Series indexed by (*groups, 'Category')"""
+    return cube.by([*cube.groups, 'Category']).rename('Quantity')
+
+
+def aggregate_consumption(chunks, quantity_column, name_column='Antibiotic', group_columns=(),
+                          date_column=None, fuzzy=False, atc_column=None, route_column=None):
+    """Reduce an iterable of dispensing chunks to summed quantity per group and Category
+
+    A usage cube (aware.batch.usage_cube) keyed by the groups and Category
+    only. Returns a Series indexed by (*group_columns, ['Month'], 'Category').
+    Rows with a blank group value or date are kept under 'Unknown', so the
+    totals always add up to the summed quantity of the input.
+    """
+    cube = usage_cube(chunks, quantity_column, name_column, group_columns, date_column, fuzzy, atc_column,
+                      route_column, dimensions=('Category',))
+    return category_totals(cube)
+
+
+def consumption_index(totals):
+    """Pivot per-Category totals into one row per group with AWaRe shares
+
+    Shares are percentages of the AWaRe-classified total; quantities for
+    drugs outside the list are reported separately as Unclassified.
+    """
+    group_levels = totals.index.names[:-1]
+    if group_levels:
+        table = totals.unstack('Category', fill_value=0)
+    else:
+        table = totals.to_frame().T
+    table = table.reindex(columns=[*CATEGORIES, UNCLASSIFIED], fill_value=0).astype(float)
+    table.columns.name = None
+
+    classified = table[list(CATEGORIES)].sum(axis=1)
+    table['AWaRe Total'] = classified
+    for category, share in zip(CATEGORIES, SHARE_COLUMNS):
+        table[share] = (table[category] / classified.where(classified > 0) * 100).round(2)
+
+    if group_levels:
+        return table.reset_index().sort_values(list(group_levels), ignore_index=True)
+    return table.reset_index(drop=True)
+
+
+def build_consumption_index(source, destination, quantity_column, name_column='Antibiotic', group_columns=(),
+                            date_column=None, in_format=None, chunksize=DEFAULT_CHUNKSIZE, fuzzy=False,
+                            atc_column=None, route_column=None, skip_invalid=False):
+    """Aggregate a dispensing file into an AWaRe consumption index and write it as Parquet
+
+    Raises ValueError if some rows have a quantity that is not a number,
+    unless skip_invalid is set: they are then left out, and counted in the
+    returned index's attrs['invalid_rows'].
+    """
+    cube = aggregate_usage(source, quantity_column, name_column, in_format, chunksize, fuzzy,
+                           group_columns=group_columns, date_column=date_column, atc_column=atc_column,
+                           route_column=route_column, dimensions=('Category',))
+    if cube.n_invalid and not skip_invalid:
+        raise ValueError(f"{cube.n_invalid:,} row(s) have a {quantity_column} that is not a number; "
+                         f"fix them, or skip them with --skip-invalid")
+    index = consumption_index(category_totals(cube))
+    index.attrs['invalid_rows'] = cube.n_invalid
+    index.to_parquet(destination, index=False)
+    return index
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute AWaRe consumption shares from a dispensing file")
+    parser.add_argument('input', help="CSV, Parquet or XLSX dispensing records")
+    parser.add_argument('output', help="Parquet file for the consumption index")
+    parser.add_argument('--quantity', required=True, help="Column with the consumed quantity (e.g. DDD)")
+    parser.add_argument('--name-column', default='Antibiotic', help="Column holding the drug name")
+    parser.add_argument('--group', nargs='*', default=[], help="Grouping columns, e.g. Facility Ward")
+    parser.add_argument('--date-column', help="Date column; adds a Month grouping level")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--fuzzy', action='store_true', help="Resolve brand names, salts, routes and misspellings")
+    parser.add_argument('--atc-column', help="Join on the ATC codes in this column instead of the drug name")
+    parser.add_argument('--route-column', help="Route column (IV/oral, P/O) used with --atc-column")
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help="Leave out rows whose quantity is not a number instead of failing")
+    args = parser.parse_args(argv)
+
+    try:
+        index = build_consumption_index(args.input, args.output, args.quantity, args.name_column, args.group,
+                                        args.date_column, chunksize=args.chunksize, fuzzy=args.fuzzy,
+                                        atc_column=args.atc_column, route_column=args.route_column,
+                                        skip_invalid=args.skip_invalid)
+    except (KeyError, ValueError, FileNotFoundError) as error:
+        parser.error(cli_message(error))
+    print(f"Wrote {len(index):,} group(s) to {args.output}")
+    if index.attrs['invalid_rows']:
+        print(f"Left out {index.attrs['invalid_rows']:,} row(s) whose {args.quantity} is not a number")
+
+
+if __name__ == '__main__':
+    main()
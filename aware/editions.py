@@ -0,0 +1,337 @@
+"""Several WHO AWaRe editions side by side
+
+WHO revises the AWaRe list every two years, and historical data has to be
+classified under the edition in force at the time. An EditionStore keeps
+every compiled snapshot in one keyed store: a single index over the union
+of drug names and an (edition x name) matrix of row numbers into the
+stacked edition tables. Classifying under any edition, or "as of" a date
+per record, is then one hash join on names plus one matrix take.
+
+The diff between two editions (drugs added, dropped, moved between
+categories or otherwise updated) is computed once per pair and served from
+memory. Reclassifying data already annotated under one edition only
+touches the rows whose drug appears in that diff:
+
+    python -m aware.editions diff 2021 2023
+    python -m aware.editions reclassify annotated_2021.parquet annotated_2023.parquet --from 2021 --to 2023
+"""
+import hashlib
+import threading
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aware import metrics
+from aware.batch import DEFAULT_CHUNKSIZE, detect_format, iter_chunks, open_writer
+from aware.classifier import CLASSIFICATION_COLUMNS, CompactValues, DrugClassifier, eml_labels
+from aware.drug_database import create_drug_database
+from aware.reference import on_invalidate
+from aware.snapshot import SNAPSHOT_DIR, available_editions, load_snapshot
+
+# Edition of the built-in list in aware.drug_database
+BUILTIN_EDITION = '2023'
+
+# Kinds of change reported by EditionStore.diff
+CHANGES = ('Added', 'Dropped', 'Moved', 'Updated')
+
+
+class EditionStore:
+    """Name-keyed classification under every loaded AWaRe edition
+
+    editions maps an edition label ('2021', '2023', ...) to its drug_db.
+    effective_dates maps labels to the date each edition came into force;
+    editions without one take effect on 1 January of their year.
+    """
+
+    def __init__(self, editions, effective_dates=None):
+        if not editions:
+            raise ValueError("At least one edition is needed")
+        self.editions = tuple(sorted(editions))
+        effective_dates = effective_dates or {}
+        self.effective_dates = np.array(
+            [np.datetime64(effective_dates.get(edition, f'{edition}-01-01'), 'D') for edition in self.editions]
+        )
+
+        frames = [editions[edition].drop_duplicates('Antibiotic').reset_index(drop=True) for edition in self.editions]
+        self.names = pd.Index(sorted(set().union(*(frame['Antibiotic'] for frame in frames))), dtype=object)
+
+        # Stacked edition tables with a trailing null row for names an edition does not list
+        stacked = pd.concat(frames, ignore_index=True)
+        # Encoded over the union of the editions' values, so every edition shares one dtype per column
+        self._values = CompactValues(stacked.astype(object), CLASSIFICATION_COLUMNS)
+        null_row = self._null_row = len(stacked)
+
+        # rows[e, n]: stacked row of name n in edition e; the extra last column serves unknown names (-1)
+        self._rows = np.full((len(frames), len(self.names) + 1), null_row, dtype=np.int32)
+        offset = 0
+        for e, frame in enumerate(frames):
+            self._rows[e, self.names.get_indexer(frame['Antibiotic'])] = np.arange(offset, offset + len(frame))
+            offset += len(frame)
+
+        self._frames = dict(zip(self.editions, frames))
+        self._diff = lru_cache(maxsize=None)(self._diff_uncached)
+        self._classifier = lru_cache(maxsize=None)(lambda edition: DrugClassifier(self._frames[edition]))
+        # Consecutive editions are the diffs asked for most; build them up front
+        for old, new in zip(self.editions, self.editions[1:]):
+            self._diff(old, new)
+
+    @cached_property
+    def fingerprint(self):
+        """Content hash of every edition and its effective date"""
+        hasher = hashlib.sha256()
+        for edition, effective_date in zip(self.editions, self.effective_dates):
+            hasher.update(f'{edition}:{effective_date}\n'.encode())
+            hasher.update(self._frames[edition].to_csv(index=False).encode())
+        return hasher.hexdigest()
+
+    @property
+    def latest(self):
+        return self.editions[-1]
+
+    def _edition_position(self, edition):
+        try:
+            return self.editions.index(str(edition))
+        except ValueError:
+            raise KeyError(f"Unknown edition '{edition}', available: {', '.join(self.editions)}") from None
+
+    def drug_db(self, edition):
+        """Return the reference table of one edition"""
+        return self._frames[self.editions[self._edition_position(edition)]]
+
+    def classifier(self, edition):
+        """Return a (cached) DrugClassifier for one edition, e.g. for aware.batch.classify_file"""
+        return self._classifier(self.editions[self._edition_position(edition)])
+
+    def name_codes(self, names):
+        """Return the union-index position of each name, or -1 if no edition lists it"""
+        return self.names.get_indexer(pd.Index(names, dtype=object))
+
+    def editions_as_of(self, dates):
+        """Return the position (into self.editions) of the edition in force at each date
+
+        Dates before the first edition take the first edition; missing or
+        unparseable dates take the latest.
+        """
+        dates = dates if isinstance(dates, pd.Series) else pd.Series(dates, dtype=object)
+        if isinstance(dates.dtype, pd.CategoricalDtype):
+            date_codes, uniques = dates.cat.codes.to_numpy(), dates.cat.categories
+        else:
+            date_codes, uniques = pd.factorize(dates)
+        # Parse each distinct date once; missing dates (-1) take the trailing NaT slot
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce').to_numpy(dtype='datetime64[D]')
+        parsed = np.append(parsed, [np.datetime64('NaT')])
+        positions = np.searchsorted(self.effective_dates, parsed, side='right') - 1
+        positions = np.where(np.isnat(parsed), len(self.editions) - 1, np.maximum(positions, 0))
+        return positions.take(date_codes)
+
+    def _factorized_names(self, names):
+        """Return (per-row ids, the distinct names plus a trailing None, their union-index codes)"""
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            # Categorical columns (e.g. from Parquet dictionaries) are already factorized
+            name_ids, uniques = names.cat.codes.to_numpy(), names.cat.categories
+        else:
+            name_ids, uniques = pd.factorize(names)
+        # Missing names get id -1, which picks the trailing None slot
+        uniques = np.append(uniques.to_numpy(dtype=object), [None])
+        return name_ids, uniques, self.name_codes(uniques)
+
+    def _classified(self, names, edition_positions, **extra):
+        index = names.index if isinstance(names, pd.Series) else None
+        names = pd.Series(names, dtype=object) if index is None else names
+        # Join each distinct name once, then broadcast through the ids
+        name_ids, uniques, unique_codes = self._factorized_names(names)
+        rows = self._rows[edition_positions, unique_codes.take(name_ids)]
+        metrics.inc('aware_rows_processed', len(rows), kind='edition')
+        # The factorized names double as a categorical Antibiotic column
+        result = {'Antibiotic': pd.Categorical.from_codes(name_ids, categories=pd.Index(uniques[:-1], dtype=object),
+                                                          validate=False)}
+        for col in CLASSIFICATION_COLUMNS:
+            result[col] = self._values.take(col, rows)
+        return pd.DataFrame({**result, **extra}, index=index)
+
+    def classify(self, names, edition=None):
+        """Classify names under one edition (the latest by default), like DrugClassifier.classify"""
+        position = self._edition_position(edition or self.latest)
+        return self._classified(names, position)
+
+    def classify_as_of(self, names, dates):
+        """Classify each name under the edition in force at the matching date
+
+        Returns the DrugClassifier.classify columns plus the Edition used.
+        """
+        positions = self.editions_as_of(dates)
+        return self._classified(names, positions, Edition=pd.Categorical.from_codes(positions, categories=self.editions))
+
+    def annotate_as_of(self, frame, name_column, date_column):
+        """Return a copy of frame with each row classified under the edition in force at its date"""
+        classified = self.classify_as_of(frame[name_column], frame[date_column])
+        annotated = frame.copy()
+        for col in [*CLASSIFICATION_COLUMNS, 'Edition']:
+            annotated[col] = classified[col].array
+        return annotated
+
+    def _diff_uncached(self, old, new):
+        old_rows = self._rows[self._edition_position(old), :-1]
+        new_rows = self._rows[self._edition_position(new), :-1]
+        in_old, in_new = old_rows != self._null_row, new_rows != self._null_row
+
+        changed = {
+            col: self._values.codes[col].take(old_rows) != self._values.codes[col].take(new_rows)
+            for col in CLASSIFICATION_COLUMNS
+        }
+        change = np.select(
+            [in_new & ~in_old, in_old & ~in_new, changed['Category'],
+             changed['Class'] | changed['ATC'] | changed['EML']],
+            CHANGES,
+            default='',
+        )
+        keep = np.flatnonzero(change != '')
+
+        diff = {'Antibiotic': pd.Series(self.names.to_numpy(dtype=object)[keep], dtype=object),
+                'Change': pd.Series(change[keep], dtype=object)}
+        for col in CLASSIFICATION_COLUMNS:
+            diff[f'{col} {old}'] = self._values.take(col, old_rows[keep])
+            diff[f'{col} {new}'] = self._values.take(col, new_rows[keep])
+        return pd.DataFrame(diff)
+
+    def diff(self, old, new):
+        """Return the drugs whose entry differs between two editions
+
+        One row per drug with its Change (Added, Dropped, Moved for a new
+        Category, Updated for Class/ATC/EML edits) and the old and new
+        values. Cached per pair; do not modify the returned frame.
+        """
+        return self._diff(self.editions[self._edition_position(old)], self.editions[self._edition_position(new)])
+
+    def transitions(self, old, new):
+        """Count drugs by old -> new Category, with 'Not listed' for added/dropped drugs"""
+        diff = self.diff(old, new)
+        moved = diff[diff['Change'].isin(['Added', 'Dropped', 'Moved'])]
+        return pd.crosstab(moved[f'Category {old}'].astype(object).fillna('Not listed').rename(old),
+                           moved[f'Category {new}'].astype(object).fillna('Not listed').rename(new))
+
+    def reclassify(self, frame, old, new, name_column='Antibiotic'):
+        """Move a frame annotated under edition old onto edition new
+
+        The existing annotations are reused: only rows whose drug appears in
+        diff(old, new) are looked up again, only the columns that diff
+        touches are rewritten, and every other value is kept as is.
+        """
+        diff = self.diff(old, new)
+        old_rows = self._rows[self._edition_position(old), :-1]
+        new_rows = self._rows[self._edition_position(new), :-1]
+        # Only the columns that differ for some drug between the editions are rewritten
+        columns = [col for col in CLASSIFICATION_COLUMNS
+                   if (self._values.codes[col].take(old_rows) != self._values.codes[col].take(new_rows)).any()]
+
+        reclassified = frame.copy(deep=False)
+        if columns:
+            name_ids, _, unique_codes = self._factorized_names(frame[name_column])
+            changed_codes = self.name_codes(diff['Antibiotic'])
+            changed = np.flatnonzero(np.isin(unique_codes, changed_codes).take(name_ids))
+            changed_rows = self._rows[self._edition_position(new), unique_codes.take(name_ids[changed])]
+            for col in columns:
+                # Codes of the existing values (free if already encoded like this store's output)
+                codes = self._values.encode(col, frame[col])
+                codes[changed] = self._values.codes[col].take(changed_rows)
+                reclassified[col] = pd.Series(self._values.array(col, codes), index=frame.index)
+        if 'Edition' in reclassified.columns:
+            reclassified['Edition'] = new
+        return reclassified
+
+
+def load_editions(directory=SNAPSHOT_DIR, effective_dates=None):
+    """Build an EditionStore from every snapshot in directory (the built-in list if there are none)"""
+    editions = {edition: load_snapshot(edition, directory) for edition in available_editions(directory)}
+    if not editions:
+        editions = {BUILTIN_EDITION: create_drug_database()}
+    return EditionStore(editions, effective_dates)
+
+
+_lock = threading.Lock()
+_store = None
+
+
+def get_editions():
+    """Return the shared EditionStore, building it on first use"""
+    global _store
+    store = _store
+    if store is None:
+        with _lock:
+            if _store is None:
+                _store = load_editions()
+            store = _store
+    return store
+
+
+@on_invalidate
+def _drop_store():
+    # Reloaded with the reference, so edition and as-of classification (and the
+    # editions fingerprint keying aware.result_cache) follow the new snapshots
+    global _store
+    _store = None
+
+
+def reclassify_file(source, destination, old, new, name_column='Antibiotic', in_format=None, out_format=None,
+                    chunksize=DEFAULT_CHUNKSIZE, store=None):
+    """Reclassify a file annotated under edition old onto edition new, chunk by chunk
+
+    Returns a dict with the row count and how many rows changed.
+    """
+    in_format = in_format or detect_format(getattr(source, 'name', source))
+    out_format = out_format or detect_format(getattr(destination, 'name', destination))
+    store = store or get_editions()
+
+    summary = {'rows': 0, 'changed': 0}
+    writer = open_writer(destination, out_format)
+    try:
+        for chunk in iter_chunks(source, in_format, chunksize):
+            reclassified = store.reclassify(chunk, old, new, name_column)
+            writer.write(reclassified)
+            summary['rows'] += len(chunk)
+            summary['changed'] += int(
+                (chunk['Category'].astype(object).fillna('') != reclassified['Category'].astype(object).fillna('')).sum()
+            )
+    finally:
+        writer.close()
+    return summary
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare AWaRe editions and reclassify data between them")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = commands.add_parser('diff', help="List the drugs that changed between two editions")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('--output', help="Write the diff to this CSV file instead of printing it")
+
+    reclassify_parser = commands.add_parser('reclassify', help="Move an annotated file onto another edition")
+    reclassify_parser.add_argument('input', help="File annotated by aware.batch")
+    reclassify_parser.add_argument('output', help="Reclassified output file (.csv or .parquet)")
+    reclassify_parser.add_argument('--from', dest='old', required=True, help="Edition the input was annotated with")
+    reclassify_parser.add_argument('--to', dest='new', required=True, help="Edition to reclassify under")
+    reclassify_parser.add_argument('--column', default='Antibiotic', help="Column holding the drug name")
+    reclassify_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    args = parser.parse_args(argv)
+
+    store = get_editions()
+    if args.command == 'diff':
+        diff = store.diff(args.old, args.new)
+        diff = diff.assign(**{col: eml_labels(diff[col]) for col in diff.columns if col.startswith('EML ')})
+        if args.output:
+            diff.to_csv(args.output, index=False)
+        else:
+            print(diff.to_string(index=False) if len(diff) else f"No changes between {args.old} and {args.new}")
+        return
+
+    summary = reclassify_file(args.input, args.output, args.old, args.new, name_column=args.column,
+                              chunksize=args.chunksize, store=store)
+    print(f"Reclassified {summary['rows']:,} rows from {args.old} to {args.new}: {summary['changed']:,} changed category")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Streamed exports of classified rows as CSV, gzip CSV, Parquet or Arrow IPC
+
+Rows are written chunk by chunk through the aware.batch writers, so an
+export never builds the whole file as one string: peak memory is one chunk
+plus whatever the destination holds. Used by the download buttons in
+Main.py:
+
+- export_file() writes an export to a temporary file, handed to
+  st.download_button as a deferred download (generated on click); rewound()
+  defers the download of a file that is already written
+- iter_export() yields the export as byte blocks, for a streaming HTTP
+  response or any other consumer that takes an iterator
+"""
+import tempfile
+
+import pandas as pd
+
+from aware.batch import DEFAULT_CHUNKSIZE, open_writer
+
+
+# Format name (as understood by aware.batch.open_writer) -> (label, file suffix, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('Arrow IPC (Feather)', '.arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def export_label(fmt):
+    return EXPORT_FORMATS[fmt][0]
+
+
+def export_name(stem, fmt):
+    return stem + EXPORT_FORMATS[fmt][1]
+
+
+def export_mime(fmt):
+    return EXPORT_FORMATS[fmt][2]
+
+
+def iter_frame_chunks(rows, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield successive slices of a frame, or pass an iterable of frames through"""
+    if not isinstance(rows, pd.DataFrame):
+        yield from rows
+        return
+    if rows.empty:
+        # Still writes the header / schema
+        yield rows
+    for start in range(0, len(rows), chunksize):
+        yield rows.iloc[start:start + chunksize]
+
+
+def write_export(rows, destination, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Write a frame (or an iterable of frames) to a path or binary file object in fmt
+
+    Returns the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    n_rows = 0
+    writer = open_writer(destination, fmt)
+    try:
+        for chunk in iter_frame_chunks(rows, chunksize):
+            writer.write(chunk)
+            n_rows += len(chunk)
+    finally:
+        writer.close()
+    return n_rows
+
+
+def export_file(rows, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Write an export to an anonymous temporary file and return it, positioned at the start"""
+    output = tempfile.TemporaryFile()
+    write_export(rows, output, fmt, chunksize)
+    output.seek(0)
+    return output
+
+
+def rewound(file):
+    """A callable returning file from its start, for a deferred st.download_button(data=...)"""
+    def data():
+        file.seek(0)
+        return file
+    return data
+
+
+class _ByteSink:
+    """A write-only binary file that collects what is written until drained"""
+
+    # Tells pandas to write encoded bytes
+    mode = 'wb'
+
+    def __init__(self):
+        self._blocks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._blocks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._blocks)
+        self._blocks.clear()
+        return data
+
+
+def iter_export(rows, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield an export as byte blocks, about one block per chunk of rows
+
+    Nothing is buffered beyond the chunk being encoded, so a response can
+    be streamed at any size.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    sink = _ByteSink()
+    writer = open_writer(sink, fmt)
+    try:
+        for chunk in iter_frame_chunks(rows, chunksize):
+            writer.write(chunk)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
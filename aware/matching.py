@@ -0,0 +1,243 @@
+"""Normalized and fuzzy resolution of free-text drug names
+
+Real dispensing data rarely uses the exact reference spelling: it carries
+brand names, salts, doses, dosage forms and routes that differ from the
+`_IV`/`_oral` suffixes of names like `Vancomycin_IV`. NameMatcher maps such
+text onto reference names:
+
+1. exact reference name                          -> confidence 1.0
+2. normalized key (case, salts, doses, route,
+   brand/synonym, combination order)             -> confidence 0.95
+3. closest key by character-trigram similarity   -> confidence 0.9 x similarity
+
+When the input route does not pick a reference entry, a drug with a single
+entry is still accepted at 0.95 x that confidence; one with separate
+_IV/_oral entries is reported as ambiguous.
+
+Anything else lands in the unmatched bucket. Resolution results are cached
+per distinct input string, and batches are resolved once per distinct value,
+so repetitive extracts cost little more than a hash join.
+"""
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aware import metrics
+
+# Words that describe the salt, ester or hydrate rather than the drug
+SALT_WORDS = frozenset([
+    'acetate', 'axetil', 'calcium', 'citrate', 'dihydrate', 'disodium', 'estolate', 'ethylsuccinate',
+    'fumarate', 'hcl', 'hyclate', 'hydrate', 'hydrochloride', 'lactobionate', 'magnesium', 'mesilate',
+    'mesylate', 'monohydrate', 'palmitate', 'phosphate', 'pivoxil', 'potassium', 'proxetil', 'sodium',
+    'stearate', 'succinate', 'sulfate', 'sulphate', 'tartrate', 'trihydrate',
+])
+
+# Dosage-form and route words, mapped to the route suffix used by the reference list
+ROUTE_WORDS = {
+    'iv': 'iv', 'i.v': 'iv', 'intravenous': 'iv', 'im': 'iv', 'intramuscular': 'iv', 'parenteral': 'iv',
+    'inj': 'iv', 'injection': 'iv', 'injectable': 'iv', 'infusion': 'iv', 'vial': 'iv',
+    'oral': 'oral', 'po': 'oral', 'tab': 'oral', 'tabs': 'oral', 'tablet': 'oral', 'tablets': 'oral',
+    'cap': 'oral', 'caps': 'oral', 'capsule': 'oral', 'capsules': 'oral', 'syrup': 'oral',
+    'suspension': 'oral', 'susp': 'oral', 'granules': 'oral', 'sachet': 'oral',
+}
+
+# Packaging and filler words carrying no drug information
+NOISE_WORDS = frozenset(['for', 'powder', 'solution', 'film', 'coated', 'dispersible', 'ampoule', 'bottle', 'of'])
+
+# Spelling variants and generic synonyms, applied per combination component
+SYNONYMS = {
+    'amoxycillin': 'amoxicillin',
+    'clavulanate': 'clavulanic acid',
+    'clavulanic': 'clavulanic acid',
+    'penicillin g': 'benzylpenicillin',
+    'penicillin v': 'phenoxymethylpenicillin',
+    'rifampin': 'rifampicin',
+    'cotrimoxazole': 'sulfamethoxazole/trimethoprim',
+    'co trimoxazole': 'sulfamethoxazole/trimethoprim',
+    'co amoxiclav': 'amoxicillin/clavulanic acid',
+    'tazobactam piperacillin': 'piperacillin/tazobactam',
+}
+
+# Common brand names, mapped to the generic as spelled in the reference list
+BRAND_NAMES = {
+    'amoxil': 'amoxicillin',
+    'augmentin': 'amoxicillin/clavulanic acid',
+    'bactrim': 'sulfamethoxazole/trimethoprim',
+    'septra': 'sulfamethoxazole/trimethoprim',
+    'zithromax': 'azithromycin',
+    'klacid': 'clarithromycin',
+    'biaxin': 'clarithromycin',
+    'cipro': 'ciprofloxacin',
+    'ciproxin': 'ciprofloxacin',
+    'levaquin': 'levofloxacin',
+    'avelox': 'moxifloxacin',
+    'keflex': 'cefalexin',
+    'ancef': 'cefazolin',
+    'rocephin': 'ceftriaxone',
+    'zinacef': 'cefuroxime',
+    'zinnat': 'cefuroxime',
+    'fortum': 'ceftazidime',
+    'meronem': 'meropenem',
+    'merrem': 'meropenem',
+    'tazocin': 'piperacillin/tazobactam',
+    'zosyn': 'piperacillin/tazobactam',
+    'flagyl': 'metronidazole',
+    'vancocin': 'vancomycin',
+    'cleocin': 'clindamycin',
+    'dalacin': 'clindamycin',
+    'vibramycin': 'doxycycline',
+    'macrobid': 'nitrofurantoin',
+    'monurol': 'fosfomycin',
+    'zyvox': 'linezolid',
+    'tygacil': 'tigecycline',
+    'cubicin': 'daptomycin',
+    'invanz': 'ertapenem',
+    'zerbaxa': 'ceftolozane/tazobactam',
+    'avycaz': 'ceftazidime/avibactam',
+    'zavicefta': 'ceftazidime/avibactam',
+}
+
+MATCH_METHODS = ('exact', 'normalized', 'route-agnostic', 'fuzzy', 'ambiguous', 'unmatched')
+
+_DOSE = re.compile(r'\b\d+(?:[.,]\d+)?\s*(?:mg|g|gm|mcg|ug|iu|mu|ml|%|units?|million)?\b')
+_COMPONENT_SEPARATORS = re.compile(r'\s*(?:/|\+|&|,|\band\b|\bwith\b)\s*')
+_SEPARATOR_CHARS = re.compile(r'([/+&,])')
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _normalize_component(component):
+    component = component.replace('sulph', 'sulf')
+    if component.startswith('ceph'):
+        component = 'cef' + component[4:]
+    component = BRAND_NAMES.get(component, component)
+    return SYNONYMS.get(component, component)
+
+
+def normalize_name(name):
+    """Return (base, route) for a free-text drug name
+
+    base is the lowercase generic with salts, doses and form words removed
+    and combination components sorted; route is 'iv', 'oral' or None.
+    """
+    text = str(name).lower().replace('_', ' ').replace('-', ' ')
+    text = _DOSE.sub(' ', text)
+
+    route = None
+    words = []
+    for token in _SEPARATOR_CHARS.sub(r' \1 ', text).split():
+        word = token.strip('.;:()[]')
+        if word in ROUTE_WORDS:
+            route = ROUTE_WORDS[word]
+        elif word and word not in SALT_WORDS and word not in NOISE_WORDS:
+            words.append(word)
+
+    components = []
+    for component in _COMPONENT_SEPARATORS.split(' '.join(words)):
+        component = ' '.join(component.split())
+        if component:
+            components.extend(_normalize_component(component).split('/'))
+    return '/'.join(sorted(set(components))), route
+
+
+class NameMatcher:
+    """Resolve free-text drug names onto the reference list's Antibiotic names"""
+
+    def __init__(self, reference_names, threshold=0.7, cache_size=1_000_000):
+        self.reference_names = frozenset(reference_names)
+        self.threshold = threshold
+
+        # (base, route) -> name, and base -> every name sharing it (route variants)
+        self._by_key = {}
+        self._by_base = defaultdict(list)
+        for name in reference_names:
+            base, route = normalize_name(name)
+            self._by_key[(base, route)] = name
+            self._by_base[base].append(name)
+
+        # Trigram inverted index over the distinct bases for fuzzy candidates
+        self._bases = list(self._by_base)
+        self._base_trigrams = [_trigrams(base) for base in self._bases]
+        self._trigram_index = defaultdict(list)
+        for i, grams in enumerate(self._base_trigrams):
+            for gram in grams:
+                self._trigram_index[gram].append(i)
+
+        self.resolve_one = lru_cache(maxsize=cache_size)(self._resolve_one)
+
+    def _by_route(self, base, route, confidence, method):
+        """Pick the reference name for base, using route to split _IV/_oral variants"""
+        if (base, route) in self._by_key:
+            return self._by_key[(base, route)], confidence, method
+        names = self._by_base[base]
+        if len(names) == 1:
+            return names[0], confidence * 0.95, 'route-agnostic' if method == 'normalized' else method
+        return None, 0.0, 'ambiguous'
+
+    def _closest_base(self, base):
+        grams = _trigrams(base)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for i in self._trigram_index.get(gram, ()):
+                overlap[i] += 1
+        best, best_score = None, 0.0
+        for i, shared in overlap.items():
+            # Dice coefficient of the two trigram sets
+            score = 2 * shared / (len(grams) + len(self._base_trigrams[i]))
+            if score > best_score:
+                best, best_score = self._bases[i], score
+        return best, best_score
+
+    def _resolve_one(self, raw):
+        """Return (reference name or None, confidence, match method) for one input"""
+        if raw is None or (isinstance(raw, float) and np.isnan(raw)):
+            return None, 0.0, 'unmatched'
+        if raw in self.reference_names:
+            return raw, 1.0, 'exact'
+
+        base, route = normalize_name(raw)
+        if not base:
+            return None, 0.0, 'unmatched'
+        if base in self._by_base:
+            return self._by_route(base, route, 0.95, 'normalized')
+
+        closest, score = self._closest_base(base)
+        if closest is None or score < self.threshold:
+            return None, 0.0, 'unmatched'
+        return self._by_route(closest, route, 0.9 * score, 'fuzzy')
+
+    def resolve(self, names):
+        """Resolve a Series/array of names
+
+        Returns a DataFrame aligned to the input with columns Input,
+        Antibiotic (None when unresolved), Confidence and Match (one of
+        MATCH_METHODS).
+        """
+        if not isinstance(names, pd.Series):
+            names = pd.Series(names, dtype=object)
+        codes, uniques = pd.factorize(names)
+        resolved = [self.resolve_one(value) for value in uniques]
+        metrics.inc('aware_rows_processed', len(codes), kind='fuzzy')
+
+        # Trailing slot for missing inputs (factorize code -1)
+        matched = np.array([r[0] for r in resolved] + [None], dtype=object)
+        confidence = np.array([r[1] for r in resolved] + [0.0])
+        method = np.array([r[2] for r in resolved] + ['unmatched'], dtype=object)
+        return pd.DataFrame({
+            'Input': names.to_numpy(dtype=object),
+            'Antibiotic': matched.take(codes),
+            'Confidence': confidence.take(codes),
+            'Match': method.take(codes),
+        }, index=names.index)
+
+
+def unmatched_bucket(resolved):
+    """Count the distinct inputs that could not be resolved, most frequent first"""
+    missed = resolved.loc[resolved['Antibiotic'].isna(), ['Input', 'Match']]
+    return missed.value_counts().rename('Count').reset_index()
@@ -0,0 +1,252 @@
+"""Timing spans, counters and profiling hooks, exported as Prometheus text
+
+A process-wide registry collects:
+
+- aware_stage_duration_seconds: a histogram per named stage, recorded with
+  `with span('filter'):` around each step of a rerun or request
+- aware_rows_processed_total: rows classified, per kind of lookup
+- aware_cache_hits_total / aware_cache_misses_total / aware_cache_entries:
+  read from the registered lru caches when metrics are scraped, so cache
+  lookups themselves carry no instrumentation cost
+
+render() returns the Prometheus text format, or OpenMetrics with
+openmetrics=True. serve() exposes both on a local /metrics endpoint; the
+Streamlit app starts it when AWARE_METRICS_PORT is set, and the API serves
+GET /metrics itself. Each process has its own registry, so scrape every
+worker.
+
+Setting AWARE_PROFILE=cprofile (or pyinstrument, if installed) makes
+start_profile()/stop_profile() write one profile per Streamlit rerun to
+AWARE_PROFILE_DIR (default: the system temp directory).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram buckets in seconds, from 0.1 ms stages up to slow file jobs
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_ENV = 'AWARE_PROFILE'
+PROFILE_DIR_ENV = 'AWARE_PROFILE_DIR'
+METRICS_PORT_ENV = 'AWARE_METRICS_PORT'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+_HELP = {
+    'aware_stage_duration_seconds': "Time spent in each instrumented stage",
+    'aware_rows_processed': "Rows classified, by kind of lookup",
+    'aware_api_requests': "API requests, by response status",
+    'aware_result_cache': "Result cache lookups, by result (hit, append or miss)",
+    'aware_result_cache_evictions': "Result cache entries evicted",
+    'aware_alert_events': "Prescription events handled by the alert engine",
+    'aware_alerts': "Stewardship alerts raised, by rule",
+    'aware_alert_latency_seconds': "Time from reading an event to emitting the alerts it raised",
+    'aware_cache_hits': "Cache hits per memoized function",
+    'aware_cache_misses': "Cache misses per memoized function",
+    'aware_cache_entries': "Entries currently held per memoized function",
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class _Span:
+    # A plain class rather than @contextmanager, which costs a generator per block
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe('aware_stage_duration_seconds', time.perf_counter() - self.start, stage=self.stage)
+
+
+class Registry:
+    """Thread-safe counters, histograms and cache collectors for one process"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._caches = {}
+
+    def inc(self, name, value=1, **labels):
+        """Add value to the counter name (without the _total suffix)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one observation in the histogram name"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # One count per bucket, then sum and count
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            bucket = bisect_left(self.buckets, seconds)
+            if bucket < len(self.buckets):
+                histogram[bucket] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def span(self, stage):
+        """Time the enclosed block into aware_stage_duration_seconds{stage=...}"""
+        return _Span(self, stage)
+
+    def register_cache(self, name, cached):
+        """Report the hits, misses and size of an lru_cache-wrapped function as cache=name
+
+        Registering another function under the same name replaces it, e.g.
+        after the reference table is rebuilt.
+        """
+        with self._lock:
+            self._caches[name] = cached
+
+    def render(self, openmetrics=False):
+        """Return every metric in the Prometheus text format (or OpenMetrics)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+            caches = dict(self._caches)
+
+        for name, cached in caches.items():
+            info = cached.cache_info()
+            labels = (('cache', name),)
+            counters[('aware_cache_hits', labels)] = info.hits
+            counters[('aware_cache_misses', labels)] = info.misses
+        gauges = {('aware_cache_entries', (('cache', name),)): cached.cache_info().currsize
+                  for name, cached in caches.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            # Prometheus names the family with _total, OpenMetrics only the samples
+            family = name if openmetrics else f'{name}_total'
+            lines += [f'# HELP {family} {_HELP.get(name, name)}', f'# TYPE {family} counter']
+            lines += [f'{name}_total{_labels(labels)} {value}'
+                      for (sample, labels), value in sorted(counters.items()) if sample == name]
+        for name in sorted({name for name, _ in gauges}):
+            lines += [f'# HELP {name} {_HELP.get(name, name)}', f'# TYPE {name} gauge']
+            lines += [f'{name}{_labels(labels)} {value}'
+                      for (sample, labels), value in sorted(gauges.items()) if sample == name]
+        for name in sorted({name for name, _ in histograms}):
+            lines += [f'# HELP {name} {_HELP.get(name, name)}', f'# TYPE {name} histogram']
+            for (sample, labels), histogram in sorted(histograms.items()):
+                if sample != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", repr(bound)),))} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram[-1]}')
+                lines.append(f'{name}_sum{_labels(labels)} {histogram[-2]}')
+                lines.append(f'{name}_count{_labels(labels)} {histogram[-1]}')
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+span = REGISTRY.span
+register_cache = REGISTRY.register_cache
+render = REGISTRY.render
+
+
+def wants_openmetrics(accept):
+    """True if an HTTP Accept header asks for OpenMetrics"""
+    return 'application/openmetrics-text' in (accept or '')
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def serve(port, host='127.0.0.1'):
+    """Serve GET /metrics from a daemon thread; later calls reuse the running server"""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            openmetrics = wants_openmetrics(self.headers.get('Accept'))
+            body = render(openmetrics).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='aware-metrics', daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    """Start the /metrics endpoint if AWARE_METRICS_PORT is set"""
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        serve(int(port))
+
+
+def start_profile():
+    """Start a profiler if AWARE_PROFILE is set; returns None otherwise"""
+    mode = os.environ.get(PROFILE_ENV, '').lower()
+    if not mode:
+        return None
+    if mode == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError(f"{PROFILE_ENV}=pyinstrument needs pyinstrument: pip install pyinstrument") from None
+        profiler = Profiler()
+        profiler.start()
+    else:
+        raise ValueError(f"Unknown {PROFILE_ENV} '{mode}', expected cprofile or pyinstrument")
+    return profiler
+
+
+def stop_profile(profiler, name='rerun'):
+    """Stop a profiler from start_profile() and write it out; returns the file path"""
+    if profiler is None:
+        return None
+    import tempfile
+
+    directory = os.environ.get(PROFILE_DIR_ENV) or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f'aware-{name}-{time.time_ns()}')
+    if hasattr(profiler, 'dump_stats'):
+        profiler.disable()
+        path = stem + '.prof'
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        path = stem + '.html'
+        with open(path, 'w') as f:
+            f.write(profiler.output_html())
+    return path
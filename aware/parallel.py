@@ -0,0 +1,127 @@
+"""Parallel classification of many extract files
+
+Each file is classified by aware.batch.classify_file in a worker process.
+Workers never receive the reference table: each one loads it itself through
+get_reference(), which memory-maps the compiled snapshot (or, with a fork
+start method, inherits the parent's copy), so only file paths and small
+summaries cross process boundaries. Failed files are retried, and progress
+is reported as each file completes:
+
+    python -m aware.parallel extracts/*.csv --output-dir annotated --workers 8 --retries 2
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aware.batch import DEFAULT_CHUNKSIZE, FORMATS, classify_file
+from aware.reference import get_reference
+
+OUTPUT_SUFFIXES = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def output_path(source, output_dir, out_format='parquet'):
+    """Return the annotated file path for source, e.g. facility_a.csv -> facility_a.aware.parquet"""
+    name = os.path.basename(source)
+    # Strip every known suffix, so facility_a.csv.gz loses both
+    while os.path.splitext(name)[1].lower() in FORMATS:
+        name = os.path.splitext(name)[0]
+    return os.path.join(output_dir, name + '.aware' + OUTPUT_SUFFIXES[out_format])
+
+
+def _init_worker():
+    # Load (memory-map) the reference once per worker instead of once per file
+    get_reference()
+
+
+def _classify_one(source, destination, options):
+    start = time.perf_counter()
+    summary = classify_file(source, destination, **options)
+    return {**summary, 'seconds': time.perf_counter() - start}
+
+
+def _run_round(jobs, workers, options, attempt, progress, done, total):
+    """Classify one round of {source: destination} jobs; return {source: error} for the failures"""
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_classify_one, source, destination, options): source
+                   for source, destination in jobs.items()}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                result = {'source': source, 'destination': jobs[source], 'attempts': attempt, **future.result()}
+            except Exception as error:
+                # Includes BrokenProcessPool when a worker dies; the file is retried in a fresh pool
+                failures[source] = f"{type(error).__name__}: {error}"
+                continue
+            done.append(result)
+            if progress:
+                progress(result, len(done), total)
+    return failures
+
+
+def classify_files(sources, output_dir, workers=None, retries=1, out_format='parquet', progress=None,
+                   **options):
+    """Classify every source file into output_dir using a pool of worker processes
+
+    workers defaults to the number of CPUs. Files that fail are retried up to
+    retries more times, each time in a fresh pool. progress(result, n_done,
+    n_total) is called in the parent as each file completes. Extra keyword
+    arguments (name_column, fuzzy, atc_column, ...) go to classify_file.
+    Returns (results, failures): one summary dict per classified file and
+    {source: error message} for files that still failed.
+    """
+    workers = workers or os.cpu_count() or 1
+    options = {'out_format': out_format, 'chunksize': DEFAULT_CHUNKSIZE, **options}
+    os.makedirs(output_dir, exist_ok=True)
+
+    pending = {source: output_path(source, output_dir, out_format) for source in sources}
+    if len(set(pending.values())) < len(pending):
+        raise ValueError("Several input files map to the same output file; give them distinct names")
+    results, failures = [], {}
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        failures = _run_round(pending, min(workers, len(pending)), options, attempt + 1, progress, results,
+                              len(sources))
+        pending = {source: pending[source] for source in failures}
+    return results, failures
+
+
+def _print_progress(result, n_done, n_total):
+    rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+    print(f"[{n_done}/{n_total}] {os.path.basename(result['source'])}: {result['rows']:,} rows, "
+          f"{result['matched']:,} matched ({rate:,.0f} rows/s)", flush=True)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classify many extract files in parallel")
+    parser.add_argument('inputs', nargs='+', help="CSV (optionally .gz), Parquet, Arrow IPC or XLSX files to classify")
+    parser.add_argument('--output-dir', required=True, help="Directory for the annotated files")
+    parser.add_argument('--format', choices=sorted(OUTPUT_SUFFIXES), default='parquet', help="Output format")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--retries', type=int, default=1, help="Times a failed file is retried")
+    parser.add_argument('--column', default='Antibiotic', help="Column holding the drug name")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument('--fuzzy', action='store_true', help="Resolve brand names, salts, routes and misspellings")
+    parser.add_argument('--atc-column', help="Classify by the ATC codes in this column instead of by name")
+    parser.add_argument('--route-column', help="Route column (IV/oral, P/O) used with --atc-column")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results, failures = classify_files(
+        args.inputs, args.output_dir, workers=args.workers, retries=args.retries, out_format=args.format,
+        progress=_print_progress, name_column=args.column, chunksize=args.chunksize, fuzzy=args.fuzzy,
+        atc_column=args.atc_column, route_column=args.route_column,
+    )
+    rows = sum(result['rows'] for result in results)
+    print(f"Classified {len(results):,} file(s), {rows:,} rows in {time.perf_counter() - start:.1f}s")
+    for source, error in failures.items():
+        print(f"FAILED {source}: {error}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
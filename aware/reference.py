@@ -0,0 +1,135 @@
+"""Process-wide, read-only AWaRe reference data
+
+Streamlit re-executes Main.py on every widget interaction, but imported
+modules stay loaded, so the reference table built here is shared by every
+rerun and every session in the process. So are the memoized filter
+results, table pages, statistics and ATC rollups derived from it: a
+session only holds its widget values and selections, and serving another
+clinician costs no copy of the data. Call invalidate_reference() after the
+WHO list changes to force a rebuild on next access.
+"""
+import hashlib
+import threading
+from functools import cached_property
+
+from aware import metrics
+from aware.atc import ATCIndex
+from aware.classifier import CATEGORIES, DrugClassifier, compact_reference
+from aware.drug_database import create_drug_database
+from aware.matching import NameMatcher
+from aware.search import SearchIndex
+from aware.stats import AggregateCube
+from aware.snapshot import load_snapshot
+from aware.styling import TablePages
+
+
+class ReferenceTable:
+    """The drug database plus the derived structures every rerun needs
+
+    Treat every attribute, and every frame returned by its indexes, as
+    read-only: they are shared by all sessions, and anything that must
+    change goes through invalidate_reference().
+
+    Only the classifier is built up front. The other structures are built on
+    first access, so a batch job or API worker that only classifies names
+    never pays for the search index, ATC index or statistics. Two threads
+    racing on a first access may both build a structure; they are equal and
+    one of them is kept.
+    """
+
+    def __init__(self, drug_db):
+        # Categorical Class/ATC/Category and boolean EML, like every classification output
+        self.drug_db = compact_reference(drug_db)
+        self.classifier = DrugClassifier(drug_db)
+        self.name_index = self.classifier.name_index
+
+    @cached_property
+    def matcher(self):
+        matcher = NameMatcher(self.name_index)
+        metrics.register_cache('name_match', matcher.resolve_one)
+        return matcher
+
+    @cached_property
+    def atc_index(self):
+        atc_index = ATCIndex(self.drug_db, CATEGORIES)
+        metrics.register_cache('atc_rollup', atc_index._rollup)
+        return atc_index
+
+    @cached_property
+    def search_index(self):
+        search_index = SearchIndex(self.drug_db, atc_index=self.atc_index)
+        metrics.register_cache('search_filter', search_index._filter)
+        metrics.register_cache('search_cube', search_index._cube)
+        return search_index
+
+    @cached_property
+    def table_pages(self):
+        table_pages = TablePages(self.search_index)
+        metrics.register_cache('table_page', table_pages._page)
+        return table_pages
+
+    @cached_property
+    def drug_names(self):
+        return tuple(sorted(self.drug_db['Antibiotic'].tolist()))
+
+    @cached_property
+    def cube(self):
+        """Category x Class x EML drug counts, built once and used for every statistic"""
+        return AggregateCube.from_frame(self.drug_db)
+
+    def stats_cube(self, query='', atc_prefix=''):
+        """The cube of the rows matching a Database View search and ATC group (memoized)"""
+        if not query and not (atc_prefix or '').strip():
+            return self.cube
+        return self.search_index.cube(query, atc_prefix)
+
+    @cached_property
+    def fingerprint(self):
+        """Content hash of drug_db, to key results derived from it (e.g. aware.result_cache)"""
+        return hashlib.sha256(self.drug_db.to_csv(index=False).encode()).hexdigest()
+
+    def __len__(self):
+        return len(self.drug_db)
+
+
+def load_drug_db():
+    """Load the latest compiled snapshot, falling back to the built-in list"""
+    try:
+        return load_snapshot()
+    except FileNotFoundError:
+        return create_drug_database()
+
+
+_lock = threading.Lock()
+_reference = None
+
+# Called by invalidate_reference(), e.g. to clear caches of results derived from the old table
+_invalidation_hooks = []
+
+
+def get_reference():
+    """Return the shared ReferenceTable, building it on first use"""
+    global _reference
+    reference = _reference
+    if reference is None:
+        with _lock:
+            # Another session may have built it while we waited for the lock
+            if _reference is None:
+                _reference = ReferenceTable(load_drug_db())
+            reference = _reference
+    return reference
+
+
+def on_invalidate(hook):
+    """Call hook() whenever invalidate_reference() drops the shared table"""
+    _invalidation_hooks.append(hook)
+    return hook
+
+
+def invalidate_reference():
+    """Drop the shared ReferenceTable so the next get_reference() rebuilds it"""
+    global _reference
+    with _lock:
+        _reference = None
+        for hook in _invalidation_hooks:
+            hook()
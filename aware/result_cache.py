@@ -0,0 +1,303 @@
+"""Persistent, content-addressed cache of annotated files
+
+Weekly reports classify largely the same facility extracts again. A
+ResultCache keys every annotated output by a hash of the input bytes, of
+the reference data (and editions) it was classified against and of the
+classification options:
+
+- an unchanged file is served from disk without being parsed at all
+- a CSV file that only grew at the end (an append-only extract) reuses the
+  output cached for its earlier version, and only the new tail rows are
+  classified
+- once the cache holds more than max_bytes, the least recently used
+  entries are evicted
+
+Entries live in AWARE_CACHE_DIR (default ~/.cache/aware/results), bounded
+by AWARE_CACHE_MAX_BYTES (default 2 GiB). The File Upload tab uses it, as
+does `python -m aware.batch --cache`.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from aware import metrics
+from aware.batch import DEFAULT_CHUNKSIZE, classify_file, detect_format
+from aware.reference import get_reference
+
+CACHE_DIR_ENV = 'AWARE_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'AWARE_CACHE_MAX_BYTES'
+DEFAULT_MAX_BYTES = 2 * 2**30
+
+# Bump when the annotated output format changes, to stop serving old entries
+CACHE_VERSION = 1
+
+_READ_SIZE = 1 << 20
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser('~'), '.cache', 'aware', 'results')
+
+
+def _open_source(source):
+    """Return (binary file object at offset 0, whether we opened it)"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    source.seek(0)
+    return source, False
+
+
+def _hash_stream(stream, checkpoints=()):
+    """Return (sha256, size, last byte, {offset: sha256 of the first offset bytes}) of a stream
+
+    The prefix hashes are taken at each checkpoint offset the stream
+    reaches, in the same single pass.
+    """
+    hasher = hashlib.sha256()
+    pending = sorted(set(checkpoints))
+    prefixes, position, last = {}, 0, b''
+    while True:
+        while pending and pending[0] <= position:
+            if pending[0] == position:
+                prefixes[position] = hasher.hexdigest()
+            pending.pop(0)
+        data = stream.read(min(_READ_SIZE, pending[0] - position) if pending else _READ_SIZE)
+        if not data:
+            break
+        hasher.update(data)
+        position += len(data)
+        last = data[-1:]
+    return hasher.hexdigest(), position, last, prefixes
+
+
+def _deliver(path, destination):
+    if isinstance(destination, (str, os.PathLike)):
+        shutil.copyfile(path, destination)
+    else:
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, destination)
+
+
+class ResultCache:
+    """On-disk cache of classify_file outputs with append-only reuse and LRU eviction"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = int(max_bytes or os.environ.get(CACHE_MAX_BYTES_ENV) or DEFAULT_MAX_BYTES)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f'{key}.{suffix}')
+
+    def options_key(self, in_format, out_format, options):
+        """Hash of everything besides the input bytes that determines the output"""
+        reference = {'reference': get_reference().fingerprint}
+        if options.get('edition') is not None or options.get('date_column'):
+            # Imported here: aware.editions builds on aware.batch
+            from aware.editions import get_editions
+            reference['editions'] = get_editions().fingerprint
+        payload = json.dumps({'version': CACHE_VERSION, 'in': in_format, 'out': out_format, **reference,
+                              'options': options}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def entries(self):
+        """Metadata of every cached entry"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                # Being written or evicted by another process
+                continue
+        return entries
+
+    def lookup(self, key, out_format):
+        """Return the output path of a cached entry (marking it recently used), or None"""
+        path = self._path(key, out_format)
+        try:
+            os.utime(path)
+            with open(self._path(key, 'json')) as f:
+                return path, json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def classify_file(self, source, destination, in_format=None, out_format=None, chunksize=DEFAULT_CHUNKSIZE,
+                      **options):
+        """aware.batch.classify_file through the cache
+
+        Takes the classify_file options (name_column, fuzzy, atc_column, ...)
+        and returns its summary plus 'cache' ('hit', 'append' or 'miss') and
+        'classified_rows', the rows actually classified by this call.
+        """
+        in_format = in_format or detect_format(getattr(source, 'name', source))
+        out_format = out_format or detect_format(getattr(destination, 'name', destination))
+        options_key = self.options_key(in_format, out_format, options)
+
+        # Cached earlier versions this file may extend: same options, appendable CSV input
+        bases = []
+        if in_format == 'csv':
+            bases = [entry for entry in self.entries()
+                     if entry['options_key'] == options_key and entry.get('appendable')]
+
+        stream, opened = _open_source(source)
+        try:
+            gzipped = stream.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+            stream.seek(0)
+            with metrics.span('cache_hash'):
+                input_hash, input_size, last_byte, prefixes = _hash_stream(
+                    stream, [] if gzipped else [entry['input_size'] for entry in bases])
+            key = hashlib.sha256(f'{options_key}:{input_hash}'.encode()).hexdigest()
+
+            cached = self.lookup(key, out_format)
+            if cached is not None:
+                path, entry = cached
+                _deliver(path, destination)
+                metrics.inc('aware_result_cache', result='hit')
+                return {**entry['summary'], 'cache': 'hit', 'classified_rows': 0}
+
+            base = max((entry for entry in bases if prefixes.get(entry['input_size']) == entry['input_hash']),
+                       key=lambda entry: entry['input_size'], default=None)
+            base_output = self.lookup(base['key'], out_format) if base else None
+            entry = {
+                'key': key,
+                'options_key': options_key,
+                'input_hash': input_hash,
+                'input_size': input_size,
+                'out_format': out_format,
+                # Only a plain CSV file ending on a complete line can be extended by appending rows
+                'appendable': in_format == 'csv' and not gzipped and last_byte == b'\n',
+            }
+            output = self._path(key, f'{out_format}.{os.getpid()}-{threading.get_ident()}.tmp')
+            try:
+                summary = None
+                if base_output is not None:
+                    summary = self._classify_tail(stream, base_output, output, out_format, chunksize, options)
+                result = 'append' if summary is not None else 'miss'
+                if summary is None:
+                    stream.seek(0)
+                    # Paths are passed as such, so compressed CSV files are still recognised by suffix
+                    summary = classify_file(source if opened else stream, output, in_format=in_format,
+                                            out_format=out_format, chunksize=chunksize, **options)
+                    summary['classified_rows'] = summary['rows']
+                entry['summary'] = {name: summary[name] for name in ('rows', 'matched', 'unmatched')}
+                self._store(entry, output)
+            finally:
+                if os.path.exists(output):
+                    os.remove(output)
+        finally:
+            if opened:
+                stream.close()
+            else:
+                stream.seek(0)
+
+        _deliver(self._path(key, out_format), destination)
+        metrics.inc('aware_result_cache', result=result)
+        return {**summary, 'cache': result}
+
+    def _classify_tail(self, stream, base_output, output, out_format, chunksize, options):
+        """Classify only the rows after a cached prefix and append them to its output
+
+        Returns the combined summary, or None if the tail cannot be appended
+        (then the whole file is classified).
+        """
+        base_path, base = base_output
+        with tempfile.TemporaryFile(dir=self.directory) as tail, \
+                tempfile.NamedTemporaryFile(dir=self.directory, suffix=f'.{out_format}', delete=False) as annotated:
+            annotated.close()
+            try:
+                # The header line, then every byte after the cached prefix
+                stream.seek(0)
+                tail.write(stream.readline())
+                stream.seek(base['input_size'])
+                shutil.copyfileobj(stream, tail)
+                tail.seek(0)
+                with metrics.span('cache_tail'):
+                    tail_summary = classify_file(tail, annotated.name, in_format='csv', out_format=out_format,
+                                                 chunksize=chunksize, **options)
+                if not self._concat(base_path, annotated.name, output, out_format):
+                    return None
+            finally:
+                os.remove(annotated.name)
+        summary = {name: base['summary'][name] + tail_summary[name] for name in ('rows', 'matched', 'unmatched')}
+        return {**summary, 'classified_rows': tail_summary['rows']}
+
+    @staticmethod
+    def _concat(first, second, output, out_format):
+        """Write first followed by the rows of second to output; False if they cannot be joined"""
+        if out_format == 'csv.gz':
+            # The tail is a gzip stream of its own, header line included
+            return False
+        if out_format == 'csv':
+            with open(output, 'wb') as out, open(first, 'rb') as head, open(second, 'rb') as rest:
+                shutil.copyfileobj(head, out)
+                rest.readline()
+                shutil.copyfileobj(rest, out)
+            return True
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if out_format == 'arrow':
+            head, rest = pa.ipc.open_file(first), pa.ipc.open_file(second)
+            try:
+                with pa.OSFile(output, 'wb') as sink, pa.ipc.new_file(sink, head.schema) as writer:
+                    for ipc in (head, rest):
+                        for i in range(ipc.num_record_batches):
+                            writer.write_table(pa.Table.from_batches([ipc.get_batch(i)]).cast(head.schema))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError):
+                return False
+            return True
+
+        head, rest = pq.ParquetFile(first), pq.ParquetFile(second)
+        schema = head.schema_arrow
+        try:
+            with pq.ParquetWriter(output, schema) as writer:
+                for parquet in (head, rest):
+                    for i in range(parquet.num_row_groups):
+                        writer.write_table(parquet.read_row_group(i).cast(schema))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError):
+            return False
+        return True
+
+    def _store(self, entry, output):
+        """Move output into the cache under entry['key'], then evict down to max_bytes"""
+        key = entry['key']
+        os.replace(output, self._path(key, entry['out_format']))
+        metadata = self._path(key, f'json.{os.getpid()}-{threading.get_ident()}.tmp')
+        with open(metadata, 'w') as f:
+            json.dump({**entry, 'created': time.time()}, f)
+        os.replace(metadata, self._path(key, 'json'))
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            sized = []
+            for entry in self.entries():
+                path = self._path(entry['key'], entry['out_format'])
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                sized.append((stat.st_mtime, stat.st_size, entry['key'], path))
+            total = sum(size for _, size, _, _ in sized)
+            for _, size, key, path in sorted(sized):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                for stale in (self._path(key, 'json'), path):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                total -= size
+                metrics.inc('aware_result_cache_evictions')
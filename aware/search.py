@@ -0,0 +1,120 @@
+"""Precomputed text search and filtering for the Database View
+
+The searchable columns are lowercased once and every 1-, 2- and 3-character
+substring is mapped to the rows containing it. A query of up to three
+characters is then a single posting-list lookup; longer queries intersect
+their trigram posting lists and only verify the few surviving rows.
+An ATC prefix filter is answered by the reference ATCIndex when one is
+given. Filter results are memoized per (categories, EML values, query,
+ATC prefix), and shared read-only by every session: a filter that keeps
+every row returns the reference frame itself rather than a copy.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from aware.classifier import text_columns
+from aware.stats import AggregateCube
+
+SEARCH_COLUMNS = ('Antibiotic', 'Class', 'ATC')
+MAX_GRAM = 3
+
+# Joins the searchable columns of a row so no n-gram spans two columns
+_COLUMN_SEPARATOR = '\x00'
+
+
+class SearchIndex:
+    """Substring search plus Category/EML filtering over a fixed drug_db"""
+
+    def __init__(self, drug_db, columns=SEARCH_COLUMNS, cache_size=4096, atc_index=None):
+        self.drug_db = drug_db
+        self.columns = columns
+        self.atc_index = atc_index
+
+        # Lowercased once instead of on every keystroke
+        lowered = [drug_db[col].astype(str).str.lower().tolist() for col in columns]
+        self._texts = [_COLUMN_SEPARATOR.join(values) for values in zip(*lowered)]
+
+        postings = defaultdict(list)
+        for row, text in enumerate(self._texts):
+            grams = {
+                part[i:i + n]
+                for part in text.split(_COLUMN_SEPARATOR)
+                for n in range(1, MAX_GRAM + 1)
+                for i in range(len(part) - n + 1)
+            }
+            for gram in grams:
+                postings[gram].append(row)
+        self._postings = {gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+        # Keyed by the values the widgets show, i.e. EML as Yes/No
+        labels = text_columns(drug_db[['Category', 'EML']])
+        self._value_masks = {
+            col: {value: (labels[col] == value).to_numpy() for value in labels[col].dropna().unique()}
+            for col in ('Category', 'EML')
+        }
+        self._filter = lru_cache(maxsize=cache_size)(self._filter_uncached)
+        self._cube = lru_cache(maxsize=cache_size)(self._cube_uncached)
+
+    def search_positions(self, query):
+        """Return the sorted row positions whose searchable columns contain query"""
+        query = query.lower()
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query, np.empty(0, dtype=np.int64))
+
+        # Start from the rarest trigram so the intersections stay small
+        grams = sorted({query[i:i + MAX_GRAM] for i in range(len(query) - MAX_GRAM + 1)},
+                       key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = self._postings.get(grams[0], np.empty(0, dtype=np.int64))
+        for gram in grams[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, self._postings.get(gram, ()), assume_unique=True)
+        return np.array([row for row in candidates if query in self._texts[row]], dtype=np.int64)
+
+    def _mask_for(self, col, values):
+        masks = self._value_masks[col]
+        mask = np.zeros(len(self.drug_db), dtype=bool)
+        for value in values:
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+    def _filter_uncached(self, categories, eml, query, atc_prefix=''):
+        mask = np.ones(len(self.drug_db), dtype=bool)
+        if categories:
+            mask &= self._mask_for('Category', categories)
+        if eml:
+            mask &= self._mask_for('EML', eml)
+        if query:
+            query_mask = np.zeros(len(self.drug_db), dtype=bool)
+            query_mask[self.search_positions(query)] = True
+            mask &= query_mask
+        if atc_prefix and self.atc_index is not None:
+            atc_mask = np.zeros(len(self.drug_db), dtype=bool)
+            atc_mask[self.atc_index.prefix_positions(atc_prefix)] = True
+            mask &= atc_mask
+        if mask.all():
+            return self.drug_db
+        return self.drug_db.iloc[np.flatnonzero(mask)]
+
+    def filter(self, categories=None, eml=None, query='', atc_prefix=''):
+        """Return the rows matching every active filter
+
+        Empty filters are ignored, as in the Database View widgets. The
+        returned frame is shared between callers and must not be modified.
+        """
+        return self._filter(tuple(sorted(set(categories or ()))), tuple(sorted(set(eml or ()))), query or '',
+                            (atc_prefix or '').strip().upper())
+
+    def _cube_uncached(self, query, atc_prefix):
+        return AggregateCube.from_frame(self.filter(query=query, atc_prefix=atc_prefix))
+
+    def cube(self, query='', atc_prefix=''):
+        """Return the Category x Class x EML counts of the rows matching query and atc_prefix
+
+        Category and EML filters are left to the cube, so one cube serves
+        every combination of them. Shared between callers like filter().
+        """
+        return self._cube(query or '', (atc_prefix or '').strip().upper())
@@ -0,0 +1,101 @@
+"""Compiled, versioned snapshots of the WHO AWaRe list
+
+The shipped WHO workbook is ingested once by a build step into a numpy
+structured array saved as data/aware_<edition>.npy. At startup the snapshot
+is memory-mapped with np.load(mmap_mode='r'), so there is no xlsx parsing
+and no pyarrow import on the hot path.
+
+Build (or rebuild after a new WHO edition is published):
+
+    python -m aware.snapshot "WHO drug name classification.xlsx"
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Antibiotic', 'Class', 'ATC', 'Category', 'EML']
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_WORKBOOK = os.path.join(os.path.dirname(SNAPSHOT_DIR), 'WHO drug name classification.xlsx')
+
+_SHEET_PATTERN = re.compile(r'^AWaRe classification (\d{4})$')
+_SNAPSHOT_PATTERN = re.compile(r'^aware_(\d{4})\.npy$')
+
+
+def read_aware_workbook(path=DEFAULT_WORKBOOK):
+    """Read the AWaRe classification sheet of a WHO workbook
+
+    Returns (edition, DataFrame) with the same columns and Yes/No EML values
+    as create_drug_database().
+    """
+    sheets = pd.ExcelFile(path).sheet_names
+    matches = [m for m in map(_SHEET_PATTERN.match, sheets) if m]
+    if not matches:
+        raise ValueError(f"No 'AWaRe classification <year>' sheet found in {path}")
+    match = max(matches, key=lambda m: m.group(1))
+
+    raw = pd.read_excel(path, sheet_name=match.group(0), header=None, dtype=str)
+    # The table starts below a free-text preamble; find its header row
+    header_row = raw.index[raw[0].str.strip().eq('Antibiotic')][0]
+    df = raw.iloc[header_row + 1:, :len(COLUMNS)]
+    df.columns = COLUMNS
+    df = df.dropna(subset=['Antibiotic'])
+    df = df.apply(lambda col: col.str.strip())
+
+    # e.g. "Yes (therapeutic alternative to cloxacillin)" -> "Yes"
+    df['EML'] = np.where(df['EML'].str.startswith('Yes'), 'Yes', 'No')
+    return match.group(1), df.reset_index(drop=True)
+
+
+def snapshot_path(edition, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f'aware_{edition}.npy')
+
+
+def write_snapshot(df, edition, directory=SNAPSHOT_DIR):
+    """Save df as a fixed-width structured array and return the snapshot path"""
+    dtype = [(col, f'U{max(1, int(df[col].str.len().max()))}') for col in COLUMNS]
+    records = np.empty(len(df), dtype=dtype)
+    for col in COLUMNS:
+        records[col] = df[col].to_numpy(dtype=str)
+
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(edition, directory)
+    np.save(path, records, allow_pickle=False)
+    return path
+
+
+def available_editions(directory=SNAPSHOT_DIR):
+    """Return the editions with a snapshot on disk, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(m.group(1) for m in map(_SNAPSHOT_PATTERN.match, os.listdir(directory)) if m)
+
+
+def load_snapshot(edition=None, directory=SNAPSHOT_DIR):
+    """Memory-map a snapshot (the latest edition by default) into a drug_db DataFrame"""
+    if edition is None:
+        editions = available_editions(directory)
+        if not editions:
+            raise FileNotFoundError(f"No AWaRe snapshot found in {directory}, run: python -m aware.snapshot")
+        edition = editions[-1]
+    records = np.load(snapshot_path(edition, directory), mmap_mode='r', allow_pickle=False)
+    return pd.DataFrame({col: records[col] for col in COLUMNS})
+
+
+def main(argv=None):
+    # Imported here to keep argparse off the app's startup path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile a WHO AWaRe workbook into a versioned snapshot")
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK, help="WHO AWaRe .xlsx workbook")
+    parser.add_argument('--directory', default=SNAPSHOT_DIR, help="Where to write aware_<edition>.npy")
+    args = parser.parse_args(argv)
+
+    edition, df = read_aware_workbook(args.workbook)
+    path = write_snapshot(df, edition, args.directory)
+    print(f"Wrote {len(df)} drugs for the {edition} edition to {path}")
+
+
+if __name__ == '__main__':
+    main()
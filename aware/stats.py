@@ -0,0 +1,134 @@
+"""Precomputed Category x Class x EML aggregates
+
+An AggregateCube holds one number per (Category, Class, EML) combination:
+a drug count for the reference table, or a summed quantity for usage data.
+It is built in one groupby pass, can be extended chunk by chunk with add(),
+and answers filtered totals and breakdowns from its few hundred cells
+instead of rescanning the rows.
+
+Usage data can also be keyed by grouping columns such as Facility, Ward or
+Month (the consumption index is a cube over groups x Category), and a cube
+may keep only some of the classification dimensions.
+"""
+import numpy as np
+import pandas as pd
+
+from aware.classifier import eml_labels
+
+DIMENSIONS = ('Category', 'Class', 'EML')
+
+# Key used for rows whose drug is not in the AWaRe list
+UNCLASSIFIED = 'Unclassified'
+
+# Key used for rows with a blank grouping column (e.g. no Ward, or no parseable date)
+UNKNOWN = 'Unknown'
+
+# Chunk sums are folded into the cells after this many chunks, to bound memory
+COMPACT_EVERY = 16
+
+
+def _key_codes(values, missing):
+    """Factorize a key column into (codes, labels), with missing values labelled missing
+
+    Categorical columns factorize from their codes, so the classification
+    columns are never hashed row by row.
+    """
+    codes, uniques = pd.factorize(values)
+    labels = np.append(np.asarray(uniques, dtype=object), missing)
+    return np.where(codes < 0, len(uniques), codes), labels
+
+
+class AggregateCube:
+    """Counts or summed measures keyed by groups x dimensions
+
+    groups are extra key columns of the frames added (none for the
+    reference statistics); dimensions are the classification columns
+    kept, DIMENSIONS by default.
+    """
+
+    def __init__(self, groups=(), dimensions=DIMENSIONS):
+        self.groups = tuple(groups)
+        self.dimensions = tuple(dimensions)
+        self.dims = (*self.groups, *self.dimensions)
+        self._cells = pd.Series(dtype=float, index=pd.MultiIndex.from_tuples([], names=self.dims))
+        self._partials = []
+        # Rows whose measure was not a number, left out of the sums
+        self.n_invalid = 0
+
+    @classmethod
+    def from_frame(cls, frame, measure=None, groups=(), dimensions=DIMENSIONS):
+        """Build a cube counting rows (measure=None) or summing the measure column"""
+        return cls(groups, dimensions).add(frame, measure)
+
+    @property
+    def cells(self):
+        if self._partials:
+            self._compact()
+        return self._cells
+
+    def _compact(self):
+        parts = [self._cells, *self._partials] if len(self._cells) else self._partials
+        combined = pd.concat(parts) if len(parts) > 1 else parts[0]
+        self._cells = combined.groupby(level=list(range(len(self.dims))), sort=False, dropna=False).sum()
+        self._partials = []
+
+    def add(self, frame, measure=None):
+        """Fold another frame (e.g. the next chunk of a usage file) into the cube
+
+        Every row is kept: a blank group value is keyed as UNKNOWN and a
+        drug outside the AWaRe list as UNCLASSIFIED, so the cube's total
+        always equals the row count or the summed measure of its input. A
+        measure that is present but not a number cannot be summed; those
+        rows are counted in n_invalid.
+        """
+        codes, labels = {}, {}
+        for dim in self.dims:
+            # Keyed by text values, EML as Yes/No
+            values = eml_labels(frame[dim]) if dim == 'EML' else frame[dim]
+            codes[dim], labels[dim] = _key_codes(values, UNKNOWN if dim in self.groups else UNCLASSIFIED)
+        if measure is None:
+            quantity = np.ones(len(frame))
+        else:
+            values = frame[measure]
+            quantity = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            self.n_invalid += int((np.isnan(quantity) & values.notna().to_numpy()).sum())
+        codes['_quantity'] = quantity
+
+        keys = list(self.dims)
+        partial = pd.DataFrame(codes).groupby(keys, sort=False)['_quantity'].sum()
+        partial.index = pd.MultiIndex.from_arrays(
+            [labels[dim].take(partial.index.get_level_values(dim)) for dim in keys], names=keys)
+
+        self._partials.append(partial.rename(None))
+        if len(self._partials) >= COMPACT_EVERY:
+            self._compact()
+        return self
+
+    def _select(self, filters):
+        """Return the cells matching {dimension: values}; empty value lists are ignored"""
+        cells = self.cells
+        for dim, values in filters.items():
+            if dim not in self.dims:
+                raise KeyError(f"Unknown dimension '{dim}', expected one of {self.dims}")
+            if values:
+                cells = cells[cells.index.get_level_values(dim).isin(values)]
+        return cells
+
+    def total(self, **filters):
+        """Sum over the cells matching filters, e.g. total(Category=['Access'], EML=['Yes'])"""
+        return self._select(filters).sum()
+
+    def by(self, dims, **filters):
+        """Break the filtered cube down by one or more dimensions"""
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        cells = self._select(filters)
+        if cells.empty:
+            index = pd.MultiIndex.from_tuples([], names=dims) if len(dims) > 1 else pd.Index([], name=dims[0])
+            return pd.Series(dtype=float, index=index, name='Total')
+        return cells.groupby(level=dims).sum().rename('Total')
+
+    def shares(self, dim='Category', **filters):
+        """Each group's share of the filtered total, e.g. the Access share of usage"""
+        totals = self.by(dim, **filters)
+        grand_total = totals.sum()
+        return totals / grand_total if grand_total else totals
@@ -0,0 +1,68 @@
+"""Vectorized, paginated styling of drug tables
+
+The row colours depend only on Category, so the CSS for a whole frame is one
+vectorized map of that column broadcast across the columns, instead of a
+Python call per row. The Database View only styles and sends the visible
+page, and the CSS of each (filter, page) is cached.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import text_columns
+
+# High contrast row styles per AWaRe category
+CATEGORY_CSS = {
+    # Bright green background with dark green text
+    'Access': 'background-color: #66BB6A; color: #1B5E20; font-weight: bold',
+    # Bright yellow background with dark brown text
+    'Watch': 'background-color: #FFD54F; color: #5D4037; font-weight: bold',
+    # Bright red background with dark red text
+    'Reserve': 'background-color: #EF5350; color: #B71C1C; font-weight: bold',
+}
+
+PAGE_SIZES = (50, 100, 250, 500)
+
+
+def category_css(frame):
+    """Return a DataFrame of CSS strings shaped like frame, coloured by Category"""
+    # Anything that is not Access or Watch is shown as Reserve, as before
+    css = frame['Category'].astype(object).map(CATEGORY_CSS).fillna(CATEGORY_CSS['Reserve']).to_numpy(dtype=object)
+    return pd.DataFrame(np.repeat(css[:, None], frame.shape[1], axis=1), index=frame.index, columns=frame.columns)
+
+
+def style_frame(frame, css=None):
+    """Return a Styler applying precomputed (or freshly computed) category CSS"""
+    if css is None:
+        css = category_css(frame)
+    return frame.style.apply(lambda _: css, axis=None)
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+class TablePages:
+    """Paged, styled views of SearchIndex filter results
+
+    Pages are keyed by the same (categories, EML values, query, ATC prefix)
+    the search index memoizes, so repeat reruns reuse both the rows and their CSS.
+    """
+
+    def __init__(self, search_index, cache_size=1024):
+        self.search_index = search_index
+        self._page = lru_cache(maxsize=cache_size)(self._page_uncached)
+
+    def _page_uncached(self, categories, eml, query, atc_prefix, page, page_size):
+        filtered = self.search_index.filter(categories, eml, query, atc_prefix)
+        # Shown as text, with EML as Yes/No
+        rows = text_columns(filtered.iloc[page * page_size:(page + 1) * page_size])
+        return rows, category_css(rows)
+
+    def page(self, categories, eml, query, page, page_size, atc_prefix=''):
+        """Return a Styler for one page (0-based) of the filtered table"""
+        rows, css = self._page(tuple(sorted(set(categories or ()))), tuple(sorted(set(eml or ()))),
+                               query or '', (atc_prefix or '').strip().upper(), page, page_size)
+        # A fresh Styler per call: Stylers hold render state and are not shared
+        return style_frame(rows, css)
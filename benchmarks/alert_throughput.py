@@ -0,0 +1,118 @@
+"""Alert engine throughput and per-event latency on one core
+
+Generates --events synthetic prescription events as JSON lines across
+--wards wards, a few seconds apart in event time: most name a reference
+drug (some in lower case), some give an ATC code and route instead, and a
+few name drugs the AWaRe list does not hold. They are run through an
+AlertEngine with the default Reserve and Watch share rules at three depths:
+
+- lookup: EventIndex lookups only
+- events: AlertEngine.process on parsed event dicts
+- lines: AlertEngine.process_line on the raw JSON lines (parse, classify,
+  window, rules), the path of a followed file or socket
+
+Per-event latency percentiles are taken over the lines run, timing each
+event separately:
+
+    python -m benchmarks.alert_throughput --events 1000000 --wards 40
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from aware.alerts import AlertEngine, EventIndex, ReserveRule, WatchShareRule
+from aware.reference import get_reference
+
+
+def synthetic_events(n_events, n_wards, seed=0):
+    rng = np.random.default_rng(seed)
+    reference = get_reference()
+    names = list(reference.drug_names)
+    codes = reference.drug_db['ATC'].astype(str).tolist()
+    wards = [f'ward_{i:02d}' for i in range(n_wards)]
+
+    kinds = rng.choice(['name', 'lower', 'atc', 'unknown'], size=n_events, p=[0.75, 0.1, 0.1, 0.05])
+    drug_rows = rng.integers(len(names), size=n_events)
+    ward_ids = rng.integers(n_wards, size=n_events)
+    times = 1_767_225_600 + np.cumsum(rng.integers(0, 5, size=n_events))
+    routes = rng.choice(['IV', 'oral', 'P', 'O'], size=n_events)
+
+    events = []
+    for kind, row, ward, t, route in zip(kinds, drug_rows, ward_ids, times.tolist(), routes):
+        event = {'time': t, 'ward': wards[ward]}
+        if kind == 'name':
+            event['drug'] = names[row]
+        elif kind == 'lower':
+            event['drug'] = names[row].lower()
+        elif kind == 'atc':
+            event['atc'] = codes[row]
+            event['route'] = str(route)
+        else:
+            event['drug'] = f'unlisted-{row}'
+        events.append(event)
+    return events
+
+
+def new_engine(index):
+    return AlertEngine([ReserveRule(cooldown=3600), WatchShareRule(threshold=0.3, min_events=20)], index,
+                       window=24 * 3600)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--wards', type=int, default=40)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = EventIndex()
+    print(f"EventIndex built in {time.perf_counter() - start:.2f}s")
+    events = synthetic_events(args.events, args.wards)
+    lines = [json.dumps(event).encode() for event in events]
+
+    def lookup():
+        for event in events:
+            index.lookup(event.get('drug'), event.get('atc'), event.get('route'))
+
+    engine = new_engine(index)
+
+    def process_events():
+        for event in events:
+            engine.process(event)
+
+    line_engine = new_engine(index)
+
+    def process_lines():
+        for line in lines:
+            line_engine.process_line(line)
+
+    print(f"{args.events:,} events, {args.wards} wards")
+    print(f"{'run':>8} {'seconds':>8} {'events/s':>12}")
+    for label, func in (('lookup', lookup), ('events', process_events), ('lines', process_lines)):
+        seconds = timed(func)
+        print(f"{label:>8} {seconds:>8.2f} {args.events / seconds:>12,.0f}")
+    print(f"alerts: {line_engine.n_alerts:,} ({line_engine.n_unclassified:,} unclassified events, "
+          f"{line_engine.n_invalid:,} invalid)")
+
+    latency_engine = new_engine(index)
+    latencies = np.empty(len(lines))
+    clock = time.perf_counter
+    for i, line in enumerate(lines):
+        start = clock()
+        latency_engine.process_line(line)
+        latencies[i] = clock() - start
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) * 1e6
+    print(f"per-event latency: p50 {p50:.1f} us, p99 {p99:.1f} us, p99.9 {p999:.1f} us, "
+          f"max {latencies.max() * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
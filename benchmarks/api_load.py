@@ -0,0 +1,105 @@
+"""Load test for the classification API: requests/sec and p99 latency per batch size
+
+Starts `python -m aware.api` with the requested worker count, then drives it
+from keep-alive connections with a small asyncio HTTP/1.1 client (no extra
+dependencies). Batch size 1 uses GET, larger batches POST:
+
+    python -m benchmarks.api_load --workers 4 --concurrency 32 --batch-sizes 1 10 100 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import quote
+
+import numpy as np
+
+from aware.drug_database import create_drug_database
+
+
+async def _request(reader, writer, method, path, body=b''):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) != b'\r\n':
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _worker(host, port, requests, deadline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    while time.perf_counter() < deadline:
+        method, path, body = requests[i % len(requests)]
+        start = time.perf_counter()
+        status = await _request(reader, writer, method, path, body)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{method} {path} returned {status}")
+        i += 1
+    writer.close()
+
+
+async def run_load(host, port, requests, concurrency, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(_worker(host, port, requests[i::concurrency] or requests, deadline, latencies)
+                           for i in range(concurrency)))
+    return len(latencies) / seconds, np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3
+
+
+def make_requests(names, batch_size, distinct, rng):
+    """Build `distinct` different requests of batch_size names each"""
+    if batch_size == 1:
+        return [('GET', f'/classify?name={quote(name)}', b'') for name in rng.choice(names, distinct)]
+    return [('POST', '/classify', json.dumps({'names': rng.choice(names, batch_size).tolist()}).encode())
+            for _ in range(distinct)]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"API did not start at {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    parser.add_argument('--distinct', type=int, default=64, help="Different request bodies per batch size")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = create_drug_database()['Antibiotic'].to_numpy(dtype=object)
+    server = subprocess.Popen([sys.executable, '-m', 'aware.api', '--port', str(args.port),
+                               '--workers', str(args.workers)])
+    try:
+        wait_until_up(f'http://127.0.0.1:{args.port}/health')
+        print(f"{args.workers} worker(s), {args.concurrency} connections, {args.distinct} distinct requests per size")
+        print(f"{'batch':>7} {'req/s':>9} {'names/s':>11} {'p50 ms':>8} {'p99 ms':>8}")
+        for batch_size in args.batch_sizes:
+            requests = make_requests(names, batch_size, args.distinct, rng)
+            rps, p50, p99 = asyncio.run(run_load('127.0.0.1', args.port, requests, args.concurrency, args.seconds))
+            print(f"{batch_size:>7,} {rps:>9,.0f} {rps * batch_size:>11,.0f} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Regression benchmarks for every user-facing path of Main.py, run headlessly
+
+Each path is driven through the same aware calls the app makes, on inputs
+scaled synthetically: reference tables 1x to 1000x the WHO list (drug names
+suffixed per copy) and 1k to 10M query rows.
+
+- build: ReferenceTable with its search index, ATC index and statistics cube
+- select: the Drug Selector tab, classifying a selection and rendering its cards
+- classify: classifying query rows (the File Upload tab, chunk by chunk)
+- filter: Database View category/EML/search/ATC filters, uncached
+- style: styling one page of filter results for st.dataframe
+- export: CSV export of classified rows
+- stats: Category x Class x EML statistics of the Database View
+
+Each case reports the fastest of its runs: at least --repeat of them, and
+more for short cases, until MIN_CASE_SECONDS have been spent. Results are
+compared with a stored baseline; any case slower than --tolerance times
+its baseline, by more than --noise-floor milliseconds, fails the run. So
+does any case whose result differs from the straightforward pandas
+answer (boolean masks, str.contains, dict lookups), checked once per case:
+
+    python -m benchmarks.app_paths --save-baseline
+    python -m benchmarks.app_paths
+    python -m benchmarks.app_paths --scales 1 10 --rows 1000 100000 --cases classify filter
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.cards import render_cards
+from aware.classifier import text_columns
+from aware.drug_database import create_drug_database
+from aware.reference import ReferenceTable
+from aware.styling import style_frame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'results', 'app_paths.json')
+
+CASES = ('build', 'select', 'classify', 'filter', 'style', 'export', 'stats')
+
+# Stop repeating a case once one run takes this long
+SLOW_RUN_SECONDS = 5.0
+
+# Keep repeating a short case until its runs add up to this long
+MIN_CASE_SECONDS = 1.0
+MAX_REPEAT = 200
+
+
+def scaled_drug_db(scale):
+    """The WHO list repeated scale times, with the names made unique per copy"""
+    drug_db = create_drug_database()
+    copies = []
+    for i in range(scale):
+        copy = drug_db.copy()
+        if i:
+            copy['Antibiotic'] = copy['Antibiotic'] + f'-{i}'
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def query_names(reference, n_rows, seed=0):
+    names = np.array([*reference.drug_names, 'Unknown-drug'], dtype=object)
+    return pd.Series(np.random.default_rng(seed).choice(names, size=n_rows), dtype=object)
+
+
+def expected_positions(drug_db, categories, eml, query, atc_prefix):
+    """Row positions matching a Database View filter, computed with plain pandas masks"""
+    labels = text_columns(drug_db)
+    mask = pd.Series(True, index=drug_db.index)
+    if categories:
+        mask &= labels['Category'].isin(categories)
+    if eml:
+        mask &= labels['EML'].isin(eml)
+    if query:
+        query = query.lower()
+        mask &= (labels['Antibiotic'].str.lower().str.contains(query, regex=False)
+                 | labels['Class'].str.lower().str.contains(query, regex=False)
+                 | labels['ATC'].str.lower().str.contains(query, regex=False))
+    if atc_prefix:
+        mask &= labels['ATC'].str.upper().str.startswith(atc_prefix)
+    return np.flatnonzero(mask.to_numpy(dtype=bool, na_value=False)).tolist()
+
+
+def expected_categories(drug_db, names):
+    """Category of each name by a dict lookup, None for names not in drug_db"""
+    categories = dict(zip(drug_db['Antibiotic'], text_columns(drug_db)['Category']))
+    return [categories.get(name) for name in names]
+
+
+def measure(func, repeat):
+    """Fastest of at least repeat runs (more for short cases), and the first run's result
+
+    Slow cases stop after a run longer than SLOW_RUN_SECONDS.
+    """
+    runs, result = [], None
+    while len(runs) < MAX_REPEAT:
+        start = time.perf_counter()
+        value = func()
+        runs.append(time.perf_counter() - start)
+        if len(runs) == 1:
+            result = value
+        if runs[-1] > SLOW_RUN_SECONDS:
+            break
+        if len(runs) >= repeat and sum(runs) >= MIN_CASE_SECONDS:
+            break
+    return min(runs), result
+
+
+def reference_cases(scale):
+    """(name, func, check) triples that depend on the size of the reference table
+
+    check(result) is True when func's result is right.
+    """
+    drug_db = scaled_drug_db(scale)
+
+    def build():
+        reference = ReferenceTable(drug_db)
+        reference.search_index, reference.atc_index, reference.cube
+        return reference
+
+    reference = ReferenceTable(drug_db)
+    search_index = reference.search_index
+    table_pages = reference.table_pages
+    filters = [
+        ((), (), '', ''),
+        (('Access',), (), '', ''),
+        (('Watch', 'Reserve'), ('Yes',), '', ''),
+        ((), (), 'cef', ''),
+        ((), (), 'cillin', 'J01C'),
+    ]
+
+    expected = [expected_positions(reference.drug_db, *f) for f in filters]
+
+    def check_build(built):
+        return (len(built.search_index.filter()) == len(drug_db)
+                and built.cube.total() == len(drug_db)
+                and built.search_index.filter(query='cef').index.tolist()
+                == reference.drug_db.index[expected[3]].tolist())
+
+    def filter_all():
+        return [search_index._filter_uncached(categories, eml, query, atc_prefix)
+                for categories, eml, query, atc_prefix in filters]
+
+    def check_filter(results):
+        positions = [reference.drug_db.index.get_indexer(result.index).tolist() for result in results]
+        return positions == expected
+
+    def style():
+        # One default-sized page of the unfiltered and of a filtered table, as sent to the browser
+        pages = []
+        for categories, eml, query, atc_prefix in filters[:2]:
+            rows, css = table_pages._page_uncached(categories, eml, query, atc_prefix, 0, 100)
+            pages.append((len(rows), style_frame(rows, css).to_html()))
+        return pages
+
+    def check_style(pages):
+        return [n for n, _ in pages] == [min(len(positions), 100) for positions in expected[:2]]
+
+    def stats():
+        cube = type(reference.cube).from_frame(reference.drug_db)
+        return (cube.by('Category', Category=['Access', 'Watch'], EML=['Yes']),
+                cube.by(['Class', 'Category']).unstack(fill_value=0),
+                cube.by(['EML', 'Category']).unstack(fill_value=0))
+
+    def check_stats(tables):
+        labels = text_columns(reference.drug_db)
+        selected = labels[labels['Category'].isin(['Access', 'Watch']) & (labels['EML'] == 'Yes')]
+        by_category = tables[0]
+        return (by_category.to_dict() == selected['Category'].value_counts().astype(float).to_dict()
+                and tables[1].to_numpy().sum() == len(labels)
+                and tables[2].to_numpy().sum() == len(labels))
+
+    yield 'build', build, check_build
+    yield 'filter', filter_all, check_filter
+    yield 'style', style, check_style
+    yield 'stats', stats, check_stats
+
+
+def row_cases(reference, n_rows):
+    """(name, func, check) triples that depend on the number of query rows"""
+    names = query_names(reference, n_rows)
+    classified = reference.classifier.classify(names)
+    selection = list(names.iloc[:min(n_rows, 20)])
+    expected = expected_categories(reference.drug_db, names)
+
+    def select():
+        results = reference.classifier.classify(selection)
+        results = results.dropna(subset=['Category']).reset_index(drop=True)
+        return results, render_cards(results)
+
+    def check_select(selected):
+        results, html = selected
+        return (results['Antibiotic'].tolist() == [name for name, category in zip(selection, expected)
+                                                   if category is not None]
+                and all(name in html for name in results['Antibiotic']))
+
+    def classify():
+        return reference.classifier.classify(names)
+
+    def check_classify(result):
+        return text_columns(result)['Category'].tolist() == expected
+
+    def export():
+        output = io.StringIO()
+        text_columns(classified).to_csv(output, index=False)
+        return output.getvalue()
+
+    def check_export(csv):
+        exported = pd.read_csv(io.StringIO(csv), usecols=['Category'])['Category']
+        return exported.astype(object).where(exported.notna(), None).tolist() == expected
+
+    if n_rows <= 1000:
+        yield 'select', select, check_select
+    yield 'classify', classify, check_classify
+    yield 'export', export, check_export
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="Reference table sizes, as multiples of the WHO list")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100_000, 1_000_000, 10_000_000],
+                        help="Query row counts")
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Minimum runs per case (fastest is reported); short cases run more")
+    parser.add_argument('--baseline', default=BASELINE, help="JSON file of baseline timings")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help="Fail a case slower than this multiple of its baseline")
+    parser.add_argument('--noise-floor', type=float, default=2.0,
+                        help="Ignore slowdowns of fewer milliseconds than this, whatever the ratio")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results, regressions, wrong = {}, [], []
+    print(f"{'case':>30} {'ms':>10} {'baseline':>10} {'ratio':>7}")
+
+    def run(name, func, check):
+        seconds, result = measure(func, args.repeat)
+        results[name] = seconds
+        before = baseline.get(name)
+        ratio = seconds / before if before else None
+        if ratio is not None and ratio > args.tolerance and (seconds - before) * 1000 > args.noise_floor:
+            regressions.append(name)
+        if not check(result):
+            wrong.append(name)
+        flag = '  WRONG RESULT' if name in wrong else '  REGRESSION' if name in regressions else ''
+        print(f"{name:>30} {seconds * 1000:>10.2f} {before * 1000 if before else float('nan'):>10.2f} "
+              f"{ratio if ratio is not None else float('nan'):>7.2f}{flag}")
+        sys.stdout.flush()
+
+    for scale in args.scales:
+        for case, func, check in reference_cases(scale):
+            if case in args.cases:
+                run(f'{case}[reference={scale}x]', func, check)
+
+    reference = ReferenceTable(create_drug_database())
+    for n_rows in args.rows:
+        for case, func, check in row_cases(reference, n_rows):
+            if case in args.cases:
+                run(f'{case}[rows={n_rows}]', func, check)
+
+    if wrong:
+        # Never time, or store as a baseline, a path that gives the wrong answer
+        raise SystemExit(f"{len(wrong)} case(s) returned a wrong result: {', '.join(wrong)}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        # Keep baseline cases this run did not measure
+        record = {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'results': {**baseline, **results},
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(record, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        raise SystemExit(f"{len(regressions)} case(s) slower than {args.tolerance}x their baseline: "
+                         f"{', '.join(regressions)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark ATCIndex prefix lookups and bulk code classification
+
+Prefix queries are timed for every ATC group in the reference table, and
+classify_codes is timed on up to tens of millions of codes (with and without
+a route column) against a per-row dict lookup baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.atc_index --max-rows 20000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.atc import LEVEL_LENGTHS
+from aware.reference import get_reference
+
+
+def make_codes(atc_index, n_rows, unknown_fraction=0.05, seed=0):
+    """Draw n_rows ATC codes and routes, with some unknown codes mixed in"""
+    rng = np.random.default_rng(seed)
+    codes = np.append(atc_index.codes.astype(object), ['Z99ZZ99'])
+    weights = np.full(len(codes), (1 - unknown_fraction) / (len(codes) - 1))
+    weights[-1] = unknown_fraction
+    routes = np.array(['IV', 'oral', 'P', 'O', None], dtype=object)
+    return (pd.Series(rng.choice(codes, size=n_rows, p=weights), dtype=object),
+            pd.Series(rng.choice(routes, size=n_rows), dtype=object))
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=20_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    atc_index = get_reference().atc_index
+
+    # Every distinct group at every level, e.g. J, J01, J01C, J01CA, J01CA04
+    prefixes = sorted({code[:length] for code in atc_index.codes for length in LEVEL_LENGTHS.values()})
+    seconds = best_of(lambda: [atc_index.prefix_positions(prefix) for prefix in prefixes], args.repeat)
+    print(f"prefix lookups: {len(prefixes)} groups, {seconds / len(prefixes) * 1e6:.1f} us/lookup")
+
+    # Baseline: one dict lookup per row, as a row-wise merge on the code would do
+    drug_db = atc_index.drug_db
+    category_by_code = dict(zip(drug_db['ATC'].str.strip(), drug_db['Category']))
+
+    sizes = [n for n in (1_000_000, 10_000_000, 20_000_000) if n <= args.max_rows]
+    print(f"{'rows':>12} {'method':>16} {'seconds':>9} {'ns/row':>8}")
+    for n_rows in sizes:
+        codes, routes = make_codes(atc_index, n_rows)
+        methods = [
+            ('classify_codes', lambda: atc_index.classify_codes(codes)),
+            ('  + routes', lambda: atc_index.classify_codes(codes, routes)),
+        ]
+        if n_rows <= 10_000_000:
+            methods.append(('dict map', lambda: codes.map(category_by_code)))
+        for label, func in methods:
+            seconds = best_of(func, args.repeat)
+            print(f"{n_rows:>12,} {label:>16} {seconds:>9.3f} {seconds / n_rows * 1e9:>8.1f}")
+        del codes, routes
+
+
+if __name__ == '__main__':
+    main()
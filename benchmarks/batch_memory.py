@@ -0,0 +1,72 @@
+"""Show that classify_file peak memory depends on the chunk size, not the file size
+
+Each size runs in a fresh subprocess so ru_maxrss reflects that run alone:
+
+    python -m benchmarks.batch_memory --rows 1000000 5000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def write_extract(path, n_rows, chunk=1_000_000, seed=0):
+    """Write a synthetic dispensing extract without holding it all in memory"""
+    from aware.drug_database import create_drug_database
+
+    rng = np.random.default_rng(seed)
+    names = create_drug_database()['Antibiotic'].to_numpy(dtype=object)
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        pd.DataFrame({
+            'Facility': rng.integers(1, 500, size),
+            'Drug': rng.choice(names, size),
+            'Quantity': rng.integers(1, 30, size),
+        }).to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def run_child(source, destination, chunksize):
+    from aware.batch import classify_file
+
+    start = time.perf_counter()
+    summary = classify_file(source, destination, name_column='Drug', chunksize=chunksize)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{summary['rows']} {seconds:.2f} {peak_mb:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--output', choices=['csv', 'parquet'], default='parquet')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, args.chunksize)
+        return
+
+    print(f"{'rows':>12} {'file MB':>8} {'seconds':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            source = os.path.join(tmp, f'extract_{n_rows}.csv')
+            destination = os.path.join(tmp, f'annotated_{n_rows}.{args.output}')
+            write_extract(source, n_rows)
+            out = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.batch_memory', '--chunksize', str(args.chunksize),
+                 '--child', source, destination],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            file_mb = os.path.getsize(source) / 2 ** 20
+            print(f"{int(out[0]):>12,} {file_mb:>8.0f} {float(out[1]):>8.2f} {float(out[2]):>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
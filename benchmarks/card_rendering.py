@@ -0,0 +1,112 @@
+"""Result cards: per-row st.markdown loop vs one batched markdown element
+
+Payload is the total HTML handed to st.markdown. Render latency is a full
+headless script run through streamlit.testing's AppTest, which includes
+building and enqueuing every delta message:
+
+    python -m benchmarks.card_rendering --cards 10 100 250
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from aware.cards import CARDS_PER_PAGE, render_cards
+from aware.drug_database import create_drug_database
+
+
+def loop_card(row):
+    """The inline-styled card Main.py built per row before"""
+    if row['Category'] == 'Access':
+        color, bg_color, text_color, border_color = "🟢", "#66BB6A", "#1B5E20", "#2E7D32"
+    elif row['Category'] == 'Watch':
+        color, bg_color, text_color, border_color = "🟡", "#FFD54F", "#5D4037", "#FF8F00"
+    else:
+        color, bg_color, text_color, border_color = "🔴", "#EF5350", "#B71C1C", "#D32F2F"
+    return f"""
+    <div style="
+        background-color: {bg_color};
+        padding: 15px;
+        border-radius: 10px;
+        border-left: 5px solid {border_color};
+        margin: 10px 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    ">
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <div>
+                <h4 style="color: {text_color}; margin: 0; font-weight: bold; font-size: 1.2em;">{row['Antibiotic']}</h4>
+                <p style="margin: 5px 0; color: {text_color}; font-size: 1.1em;"><strong>{color} {row['Category']}</strong></p>
+            </div>
+            <div style="text-align: right;">
+                <p style="margin: 5px 0; color: {text_color};"><strong>Class:</strong> {row['Class']}</p>
+                <p style="margin: 5px 0; color: {text_color};"><strong>EML:</strong> {"🟢 Yes" if row['EML'] == "Yes" else "🔴 No"}</p>
+            </div>
+        </div>
+        <div style="margin-top: 10px; padding-top: 10px; border-top: 2px solid {border_color};">
+            <p style="margin: 0; color: {text_color}; font-weight: bold;"><strong>ATC Code:</strong> {row['ATC']}</p>
+        </div>
+    </div>
+    """
+
+
+SCRIPTS = {
+    'loop': """
+import pandas as pd, streamlit as st
+from benchmarks.card_rendering import loop_card
+results = pd.read_pickle({path!r})
+for _, row in results.iterrows():
+    st.markdown(loop_card(row), unsafe_allow_html=True)
+""",
+    'batched': """
+import pandas as pd, streamlit as st
+from aware.cards import render_cards
+results = pd.read_pickle({path!r})
+st.markdown(render_cards(results), unsafe_allow_html=True)
+""",
+}
+
+
+def render_ms(script, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    best = float('inf')
+    for _ in range(repeat):
+        at = AppTest.from_string(script, default_timeout=120)
+        start = time.perf_counter()
+        at.run()
+        best = min(best, time.perf_counter() - start)
+        assert not at.exception, at.exception
+    return best * 1e3, len(at.markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[10, 100, 250])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    drug_db = create_drug_database()
+    print(f"{'cards':>6} {'mode':>8} {'elements':>9} {'payload KB':>11} {'html ms':>8} {'render ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_cards in args.cards:
+            results = pd.concat([drug_db] * (-(-n_cards // len(drug_db))), ignore_index=True).iloc[:n_cards]
+            path = os.path.join(tmp, 'results.pkl')
+            results.to_pickle(path)
+
+            start = time.perf_counter()
+            loop_payload = sum(len(loop_card(row).encode()) for _, row in results.iterrows())
+            loop_html_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            batched_payload = len(render_cards(results, per_page=max(n_cards, CARDS_PER_PAGE)).encode())
+            batched_html_ms = (time.perf_counter() - start) * 1e3
+
+            for label, payload, html_ms in (('loop', loop_payload, loop_html_ms),
+                                            ('batched', batched_payload, batched_html_ms)):
+                ms, elements = render_ms(SCRIPTS[label].format(path=path), args.repeat)
+                print(f"{n_cards:>6} {label:>8} {elements:>9} {payload / 1024:>11.1f} {html_ms:>8.2f} {ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
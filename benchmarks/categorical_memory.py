@@ -0,0 +1,81 @@
+"""Memory of annotated rows with categorical vs text classification columns
+
+Classifies --rows synthetic drug names and measures the four classification
+columns (Class, ATC, Category, EML) in three layouts:
+
+- categorical: what DrugClassifier now returns (categoricals plus a boolean EML)
+- object: the previous output, pointers to shared Python strings (the strings
+  themselves are held once by the reference table, so only the pointers count)
+- str: the same values as pandas string columns, as they come back from a CSV
+  file or any other re-read of text output
+
+With --parquet, each layout is also written to Parquet to compare file size
+and write time. Run from the repository root:
+
+    python -m benchmarks.categorical_memory --rows 10000000 --parquet
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import CLASSIFICATION_COLUMNS, text_columns
+from aware.reference import get_reference
+
+
+def column_bytes(frame, deep):
+    return int(frame[CLASSIFICATION_COLUMNS].memory_usage(index=False, deep=deep).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--parquet', action='store_true', help="Also compare Parquet file size and write time")
+    args = parser.parse_args()
+
+    reference = get_reference()
+    rng = np.random.default_rng(0)
+    # One row in twenty is a name the list does not have
+    names = np.array([*reference.drug_names, 'Unknown-drug'], dtype=object)
+    weights = np.full(len(names), 0.95 / (len(names) - 1))
+    weights[-1] = 0.05
+    frame = pd.DataFrame({'Antibiotic': pd.Categorical(rng.choice(names, size=args.rows, p=weights))})
+
+    start = time.perf_counter()
+    categorical = reference.classifier.annotate(frame)
+    classify_seconds = time.perf_counter() - start
+    print(f"{args.rows:,} rows classified in {classify_seconds:.2f}s")
+
+    as_object = text_columns(categorical)
+    as_str = as_object.astype({col: 'str' for col in CLASSIFICATION_COLUMNS})
+    layouts = [
+        # Shared strings: only the per-row pointers are new memory
+        ('categorical', categorical, column_bytes(categorical, deep=True)),
+        ('object (before)', as_object, column_bytes(as_object, deep=False)),
+        ('str (read back)', as_str, column_bytes(as_str, deep=True)),
+    ]
+
+    baseline = layouts[1][2]
+    print(f"{'layout':>16} {'MiB':>9} {'bytes/row':>10} {'vs object':>10}")
+    for label, _, size in layouts:
+        print(f"{label:>16} {size / 2**20:>9.1f} {size / args.rows:>10.2f} {size / baseline:>9.1%}")
+    print("per column (categorical): "
+          + ', '.join(f"{col} {categorical[col].memory_usage(index=False, deep=True) / args.rows:.2f} B/row"
+                      for col in CLASSIFICATION_COLUMNS))
+
+    if args.parquet:
+        print(f"\n{'layout':>16} {'parquet MiB':>12} {'write s':>8}")
+        with tempfile.TemporaryDirectory() as directory:
+            for label, layout, _ in layouts:
+                path = os.path.join(directory, 'annotated.parquet')
+                start = time.perf_counter()
+                layout[CLASSIFICATION_COLUMNS].to_parquet(path, index=False)
+                seconds = time.perf_counter() - start
+                print(f"{label:>16} {os.path.getsize(path) / 2**20:>12.1f} {seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
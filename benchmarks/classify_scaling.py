@@ -0,0 +1,64 @@
+"""Check that DrugClassifier.classify stays linear in the number of input rows
+
+Run from the repository root:
+
+    python -m benchmarks.classify_scaling --max-rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import DrugClassifier
+
+
+def make_queries(classifier, n_rows, unknown_fraction=0.05, seed=0):
+    """Draw n_rows drug names from the reference list, with some unknown names mixed in"""
+    rng = np.random.default_rng(seed)
+    names = np.append(classifier.name_index.to_numpy(dtype=object), ["Unknown-drug"])
+    weights = np.full(len(names), (1 - unknown_fraction) / (len(names) - 1))
+    weights[-1] = unknown_fraction
+    return pd.Series(rng.choice(names, size=n_rows, p=weights), dtype=object)
+
+
+def time_classify(classifier, queries, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        classifier.classify(queries)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=10_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help="Max allowed ratio between the largest and smallest per-row cost")
+    args = parser.parse_args()
+
+    classifier = DrugClassifier()
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= args.max_rows]
+
+    print(f"{'rows':>12} {'dtype':>9} {'seconds':>9} {'ns/row':>8}")
+    per_row = []
+    for n_rows in sizes:
+        queries = make_queries(classifier, n_rows)
+        for label, series in (('object', queries), ('category', queries.astype('category'))):
+            seconds = time_classify(classifier, series, args.repeat)
+            print(f"{n_rows:>12,} {label:>9} {seconds:>9.3f} {seconds / n_rows * 1e9:>8.1f}")
+            if label == 'object':
+                per_row.append(seconds / n_rows)
+
+    # Small inputs are dominated by fixed overhead, so compare from 100k rows up
+    steady = per_row[1:] if len(per_row) > 2 else per_row
+    ratio = max(steady) / min(steady)
+    print(f"per-row cost ratio (largest/smallest): {ratio:.2f}")
+    if ratio > args.tolerance:
+        raise SystemExit(f"classify is not linear: per-row cost grew {ratio:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
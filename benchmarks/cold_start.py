@@ -0,0 +1,82 @@
+"""Cold start time and RSS of loading drug_db: Python list build vs memory-mapped snapshot
+
+Each measurement is a fresh interpreter. pandas is imported first (both
+paths need it) and only the loader import plus the load itself is timed,
+with RSS growth read from /proc/self/statm around it. --scale repeats the
+reference list to mimic larger combined formularies:
+
+    python -m benchmarks.cold_start --scale 1 100 1000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from aware.drug_database import create_drug_database
+from aware.snapshot import write_snapshot
+
+CHILD = """
+import os, sys, time
+import pandas
+sys.path.insert(0, {tmp!r})
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+rss = rss_mb()
+start = time.perf_counter()
+{load}
+print(time.perf_counter() - start, rss_mb() - rss)
+"""
+
+LOADERS = {
+    'python list': "from scaled_list import create_drug_database\ndrug_db = create_drug_database()",
+    'snapshot': "from aware.snapshot import load_snapshot\ndrug_db = load_snapshot('2023', {tmp!r})",
+}
+
+
+def write_fixtures(tmp, scale):
+    """Write a hard-coded-list module and a snapshot, both holding the reference list scale times"""
+    drug_db = create_drug_database()
+    rows = [[f"{row[0]}-{i}", *row[1:]] for i in range(scale) for row in drug_db.itertuples(index=False)]
+    with open(os.path.join(tmp, 'scaled_list.py'), 'w') as f:
+        f.write("import pandas as pd\n\n\ndef create_drug_database():\n    data = [\n")
+        f.writelines(f"        {row!r},\n" for row in rows)
+        f.write("    ]\n    return pd.DataFrame(data, columns=['Antibiotic', 'Class', 'ATC', 'Category', 'EML'])\n")
+    scaled = drug_db.iloc[[i % len(drug_db) for i in range(len(rows))]].reset_index(drop=True)
+    scaled['Antibiotic'] = [row[0] for row in rows]
+    write_snapshot(scaled, '2023', tmp)
+    return len(rows)
+
+
+def measure(code, runs):
+    seconds, rss = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+        seconds.append(float(out[0]))
+        rss.append(float(out[1]))
+    return statistics.median(seconds) * 1e3, statistics.median(rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'loader':>12} {'ms':>9} {'RSS MB':>8}")
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            n_rows = write_fixtures(tmp, scale)
+            # Warm-up run so the list module is measured from its cached .pyc
+            measure(CHILD.format(tmp=tmp, load=LOADERS['python list']), 1)
+            for label, load in LOADERS.items():
+                ms, rss = measure(CHILD.format(tmp=tmp, load=load.format(tmp=tmp)), args.runs)
+                print(f"{n_rows:>9,} {label:>12} {ms:>9.2f} {rss:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of the chunked consumption-index pipeline on a synthetic dispensing year
+
+Writes a Parquet file of dispensing rows (facility, ward, drug, DDD, date)
+in row groups, then times build_consumption_index over it:
+
+    python -m benchmarks.consumption_pipeline --rows 20000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aware.consumption import build_consumption_index
+from aware.drug_database import create_drug_database
+
+
+def write_dispensing(path, n_rows, facilities=500, chunk=2_000_000, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.append(create_drug_database()['Antibiotic'].to_numpy(dtype=object), ['Paracetamol', 'Insulin'])
+    dates = pd.date_range('2024-01-01', '2024-12-31').strftime('%Y-%m-%d').to_numpy(dtype=object)
+    wards = np.array(['ICU', 'Medicine', 'Surgery', 'Paediatrics', 'Maternity', 'Outpatients'], dtype=object)
+    writer = None
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        table = pa.Table.from_pandas(pd.DataFrame({
+            'Facility': rng.integers(1, facilities + 1, size).astype(str),
+            'Ward': rng.choice(wards, size),
+            'Drug': rng.choice(names, size),
+            'DDD': rng.gamma(2.0, 1.5, size),
+            'DispenseDate': rng.choice(dates, size),
+        }), preserve_index=False)
+        writer = writer or pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000_000)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'dispensing.parquet')
+        start = time.perf_counter()
+        write_dispensing(source, args.rows)
+        print(f"generated {args.rows:,} rows in {time.perf_counter() - start:.1f} s "
+              f"({os.path.getsize(source) / 2 ** 20:.0f} MB Parquet)")
+
+        start = time.perf_counter()
+        index = build_consumption_index(source, os.path.join(tmp, 'index.parquet'), 'DDD', 'Drug',
+                                        ['Facility', 'Ward'], 'DispenseDate', chunksize=args.chunksize)
+        seconds = time.perf_counter() - start
+        print(f"aggregated into {len(index):,} facility/ward/month rows in {seconds:.1f} s "
+              f"({args.rows / seconds / 1e6:.2f}M rows/s, {args.rows / seconds * 60 / 1e6:.0f}M rows/min)")
+
+
+if __name__ == '__main__':
+    main()
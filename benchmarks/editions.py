@@ -0,0 +1,106 @@
+"""Benchmark multi-edition classification, edition diffs and reclassification
+
+Builds an EditionStore from synthetic editions derived from the built-in
+list (a few drugs moved, added and dropped per edition) and times:
+
+- classify_as_of on dated records against grouping the records by edition
+  and classifying each group with its own DrugClassifier
+- a cached diff against recomputing it by merging the two full tables
+- reclassify (diff rows only) against classifying the whole frame again
+
+Run from the repository root:
+
+    python -m benchmarks.editions --rows 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import CLASSIFICATION_COLUMNS, DrugClassifier
+from aware.drug_database import create_drug_database
+from aware.editions import EditionStore
+
+CATEGORIES = ['Access', 'Watch', 'Reserve']
+
+
+def make_editions(n_editions=4, changes=10, seed=0):
+    """Derive older editions from the built-in list by undoing a few random changes each"""
+    rng = np.random.default_rng(seed)
+    editions = {'2023': create_drug_database()}
+    for year in range(2021, 2023 - 2 * n_editions, -2):
+        frame = editions[str(year + 2)].copy()
+        moved = rng.choice(len(frame), size=changes, replace=False)
+        frame.loc[frame.index[moved], 'Category'] = rng.choice(CATEGORIES, size=changes)
+        frame = frame.drop(frame.index[rng.choice(len(frame), size=changes // 2, replace=False)])
+        added = pd.DataFrame({
+            'Antibiotic': [f'Legacy-{year}-{i}' for i in range(changes // 2)],
+            'Class': 'Legacy', 'ATC': 'J01XX99', 'Category': 'Watch', 'EML': 'No',
+        })
+        editions[str(year)] = pd.concat([frame, added], ignore_index=True)
+    return editions
+
+
+def best_of(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def merge_diff(editions, old, new):
+    merged = editions[old].merge(editions[new], on='Antibiotic', how='outer', suffixes=(f' {old}', f' {new}'),
+                                 indicator=True)
+    differs = np.zeros(len(merged), dtype=bool)
+    for col in CLASSIFICATION_COLUMNS:
+        differs |= merged[f'{col} {old}'].astype(object).ne(merged[f'{col} {new}'].astype(object)).to_numpy()
+    return merged[differs | (merged['_merge'] != 'both').to_numpy()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    editions = make_editions()
+    store = EditionStore(editions)
+    print(f"{len(store.editions)} editions, {len(store.names)} distinct names")
+
+    rng = np.random.default_rng(1)
+    names = pd.Series(rng.choice(store.names.to_numpy(dtype=object), size=args.rows), dtype=object)
+    days = rng.integers(0, 365 * 10, size=args.rows)
+    dates = pd.Series((np.datetime64('2016-01-01') + days).astype(str), dtype=object)
+
+    names_cat, dates_cat = names.astype('category'), dates.astype('category')
+
+    def per_edition():
+        # Parse every date, then classify each edition's records with its own classifier
+        parsed = pd.to_datetime(dates).to_numpy(dtype='datetime64[D]')
+        positions = np.maximum(np.searchsorted(store.effective_dates, parsed, side='right') - 1, 0)
+        parts = [store.classifier(edition).classify(names[positions == e])
+                 for e, edition in enumerate(store.editions)]
+        return pd.concat(parts).sort_index()
+
+    print(f"{'operation':>34} {'seconds':>10}")
+    timings = [
+        (f'classify_as_of ({args.rows:,} rows)', lambda: store.classify_as_of(names, dates)),
+        ('  categorical names and dates', lambda: store.classify_as_of(names_cat, dates_cat)),
+        ('  per-edition classify + concat', per_edition),
+        ('diff 2021 -> 2023 (cached)', lambda: store.diff('2021', '2023')),
+        ('  full-table merge', lambda: merge_diff(editions, '2021', '2023')),
+    ]
+    annotated = store.classify(names, '2021')
+    timings += [
+        (f'reclassify 2021 -> 2023', lambda: store.reclassify(annotated, '2021', '2023')),
+        ('  classify again', lambda: DrugClassifier(editions['2023']).annotate(annotated)),
+    ]
+    for label, func in timings:
+        print(f"{label:>34} {best_of(func, args.repeat):>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
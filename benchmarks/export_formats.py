@@ -0,0 +1,107 @@
+"""Download export throughput and peak memory: one CSV string vs streamed formats
+
+Classifies --rows synthetic prescription rows, then exports them:
+
+- csv string (before): what the download buttons did, text_columns(...).to_csv()
+  into one string, encoded to bytes for st.download_button
+- csv, csv.gz, parquet, arrow: aware.export.export_file, written chunk by
+  chunk to a temporary file
+- parquet stream: aware.export.iter_export, consumed block by block as an
+  HTTP response would be
+
+Each case runs in a forked process, whose peak resident memory above its
+starting point is reported (Linux only, reads /proc):
+
+    python -m benchmarks.export_formats --rows 1000000 5000000
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.classifier import text_columns
+from aware.export import EXPORT_FORMATS, export_file, iter_export
+from aware.reference import get_reference
+
+
+def classified_rows(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([*get_reference().drug_names, 'Unknown-drug'], dtype=object)
+    frame = pd.DataFrame({
+        'Facility': pd.Series(rng.choice([f'facility_{i:03d}' for i in range(50)], size=n_rows), dtype=object),
+        'Antibiotic': pd.Series(rng.choice(names, size=n_rows), dtype=object),
+        'DDD': rng.random(n_rows).round(3),
+    })
+    return get_reference().classifier.annotate(frame)
+
+
+def _status(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"No {field} in /proc/self/status")
+
+
+def csv_string(frame):
+    return len(text_columns(frame).to_csv(index=False).encode())
+
+
+def streamed_file(fmt):
+    def export(frame):
+        with export_file(frame, fmt) as f:
+            return os.fstat(f.fileno()).st_size
+    return export
+
+
+def streamed_blocks(frame):
+    return sum(len(block) for block in iter_export(frame, 'parquet'))
+
+
+CASES = [
+    ('csv string (before)', csv_string),
+    *((fmt, streamed_file(fmt)) for fmt in EXPORT_FORMATS),
+    ('parquet stream', streamed_blocks),
+]
+
+
+def _run_case(export, frame, results):
+    # Reset the peak RSS to the current RSS, then measure the export's growth above it
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    start_rss = _status('VmRSS')
+    start = time.perf_counter()
+    size = export(frame)
+    seconds = time.perf_counter() - start
+    results.put((seconds, size, _status('VmHWM') - start_rss))
+
+
+def measure(export, frame):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(export, frame, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        frame = classified_rows(n_rows)
+        print(f"\n{n_rows:,} classified rows")
+        print(f"{'export':>20} {'seconds':>8} {'rows/s':>12} {'MiB':>8} {'peak MiB':>9}")
+        for label, export in CASES:
+            seconds, size, peak = measure(export, frame)
+            print(f"{label:>20} {seconds:>8.2f} {n_rows / seconds:>12,.0f} {size / 2**20:>8.1f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
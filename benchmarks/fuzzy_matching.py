@@ -0,0 +1,94 @@
+"""Throughput and accuracy of NameMatcher on a synthetic noisy dispensing corpus
+
+Names are drawn from the reference list and corrupted the way real extracts
+are: casing, salts, doses, dosage forms/routes, brand names, reordered
+combinations and typos. Every row keeps its true reference name:
+
+    python -m benchmarks.fuzzy_matching --rows 1000000 --variants 50000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.drug_database import create_drug_database
+from aware.matching import BRAND_NAMES, NameMatcher, normalize_name
+
+SALTS = ['sodium', 'potassium', 'hydrochloride', 'trihydrate', 'hyclate', 'sulfate']
+DOSES = ['250mg', '500 mg', '1g', '2 g', '125mg/5ml', '100 mg']
+FORMS = {'iv': ['IV', 'inj', 'injection', 'infusion'], 'oral': ['tab', 'tablets', 'capsule', 'oral susp']}
+
+
+def _typo(rng, text):
+    i = int(rng.integers(1, len(text) - 1))
+    kind = rng.integers(3)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + text[i] + text[i:]
+
+
+def make_variant(rng, name, brands_by_base):
+    """Return a noisy rendering of a reference name"""
+    base = name.lower().split('_')[0]
+    route = name.split('_')[1].lower() if '_' in name else None
+    parts = base.replace('-', ' ').split('/')
+
+    if rng.random() < 0.1 and normalize_name(name)[0] in brands_by_base:
+        parts = [rng.choice(brands_by_base[normalize_name(name)[0]])]
+    elif len(parts) > 1 and rng.random() < 0.5:
+        parts = parts[::-1]
+    text = rng.choice([' / ', '+', ' and ', '/']).join(parts)
+
+    if rng.random() < 0.3:
+        text += ' ' + rng.choice(SALTS)
+    if rng.random() < 0.5:
+        text += ' ' + rng.choice(DOSES)
+    if route or rng.random() < 0.3:
+        text += ' ' + rng.choice(FORMS[route or rng.choice(['iv', 'oral'])])
+    if rng.random() < 0.15 and len(text) > 6:
+        text = _typo(rng, text)
+    casing = rng.integers(3)
+    return text.upper() if casing == 0 else text.title() if casing == 1 else text
+
+
+def make_corpus(names, n_rows, n_variants, seed=0):
+    rng = np.random.default_rng(seed)
+    brands_by_base = {}
+    for brand, generic in BRAND_NAMES.items():
+        brands_by_base.setdefault(normalize_name(generic)[0], []).append(brand)
+
+    truth = rng.choice(names, n_variants)
+    variants = np.array([make_variant(rng, name, brands_by_base) for name in truth], dtype=object)
+    # Real extracts repeat a modest set of spellings many times
+    picks = rng.zipf(1.3, n_rows) % n_variants
+    return pd.Series(variants[picks], dtype=object), truth[picks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--variants', type=int, default=50_000)
+    args = parser.parse_args()
+
+    names = create_drug_database()['Antibiotic'].to_numpy(dtype=object)
+    corpus, truth = make_corpus(names, args.rows, args.variants)
+    print(f"{args.rows:,} rows, {corpus.nunique():,} distinct spellings")
+
+    for label in ('cold cache', 'warm cache'):
+        matcher = NameMatcher(names) if label == 'cold cache' else matcher
+        start = time.perf_counter()
+        resolved = matcher.resolve(corpus)
+        seconds = time.perf_counter() - start
+        print(f"{label:>10}: {seconds:.2f} s, {args.rows / seconds * 60 / 1e6:.1f}M names/minute")
+
+    matched = resolved['Antibiotic'].notna().to_numpy()
+    correct = resolved['Antibiotic'].to_numpy() == truth
+    print(f"matched {matched.mean():.1%}, precision {correct[matched].mean():.1%}, recall {correct.mean():.1%}")
+    print(resolved['Match'].value_counts(normalize=True).round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
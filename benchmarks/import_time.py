@@ -0,0 +1,127 @@
+"""Import time and cold start of the app and the headless entry points
+
+Every measurement runs in a fresh interpreter. For each entry point the
+module is imported under `python -X importtime` and the cumulative time of
+its top-level imports is summed; the packages with the most import time of
+their own are listed so a new slow dependency is easy to spot. Headless
+entry points fail the run if they pull in streamlit. The app cold start is the first Streamlit run of Main.py
+(via streamlit.testing) including its imports.
+
+Results are appended to a JSON-lines history and compared with the previous
+entry, so regressions show up over time:
+
+    python -m benchmarks.import_time --repeat 5
+    python -m benchmarks.import_time --no-record
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(ROOT, 'benchmarks', 'results', 'import_time.jsonl')
+
+# Headless entry points: none of these may import streamlit
+HEADLESS = ['aware.batch', 'aware.parallel', 'aware.api', 'aware.consumption', 'aware.editions', 'aware.snapshot']
+
+APP_COLD_START = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({main!r}, default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr):
+    """Return (total seconds, {top-level package: summed self seconds}) from an -X importtime log"""
+    total, packages = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        if not name[1:].startswith(' '):
+            total += int(cumulative_us) / 1e6
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1e6
+    return total, packages
+
+
+def measure_import(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def measure_app():
+    result = subprocess.run([sys.executable, '-c', APP_COLD_START.format(main=os.path.join(ROOT, 'Main.py'))],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def last_record(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per measurement (median)")
+    parser.add_argument('--top', type=int, default=5, help="Heaviest packages (by own import time) to list")
+    parser.add_argument('--history', default=HISTORY, help="JSON-lines file the results are appended to")
+    parser.add_argument('--no-record', action='store_true', help="Do not append to the history")
+    args = parser.parse_args()
+
+    results, failures = {}, []
+    print(f"{'entry point':>20} {'import ms':>10} {'previous':>9}  heaviest packages (ms)")
+    previous = (last_record(args.history) or {}).get('results', {})
+    for module in ['streamlit', 'aware.reference', *HEADLESS]:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        seconds = statistics.median(total for total, _ in runs)
+        packages = runs[0][1]
+        results[module] = seconds
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        before = f"{previous[module] * 1000:.0f}" if module in previous else '-'
+        print(f"{module:>20} {seconds * 1000:>10.0f} {before:>9}  "
+              + ', '.join(f"{name} {t * 1000:.0f}" for name, t in heaviest))
+        if module in HEADLESS and 'streamlit' in packages:
+            failures.append(module)
+
+    app = statistics.median(measure_app() for _ in range(args.repeat))
+    results['Main.py first run'] = app
+    before = f"{previous['Main.py first run'] * 1000:.0f}" if 'Main.py first run' in previous else '-'
+    print(f"{'Main.py first run':>20} {app * 1000:>10.0f} {before:>9}")
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        record = {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'results': results,
+        }
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+    if failures:
+        raise SystemExit(f"Headless entry points import streamlit: {', '.join(failures)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Measure how aware.parallel.classify_files scales with the number of worker processes
+
+Writes --files synthetic per-facility extracts to a temporary directory and
+classifies them all with 1, 2, 4, ... up to --max-workers workers (default:
+the CPU count), reporting the speedup over one worker and the parallel
+efficiency. Speedup is bounded by the number of physical cores and by disk
+bandwidth, so run it on the machine that does the nightly jobs.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_scaling --files 32 --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.parallel import classify_files
+from aware.reference import get_reference
+
+
+def write_extracts(directory, n_files, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([*get_reference().drug_names, 'Unknown-drug'], dtype=object)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(directory, f'facility_{i:03d}.csv')
+        pd.DataFrame({
+            'Facility': f'facility_{i:03d}',
+            'Antibiotic': rng.choice(names, size=n_rows),
+            'DDD': rng.random(n_rows).round(3),
+        }).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=32)
+    parser.add_argument('--rows', type=int, default=200_000, help="Rows per file")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sources = write_extracts(directory, args.files, args.rows)
+        print(f"{args.files} files x {args.rows:,} rows, {os.cpu_count()} CPU(s)")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8} {'efficiency':>11}")
+        baseline = None
+        for n_workers in workers:
+            start = time.perf_counter()
+            results, failures = classify_files(sources, os.path.join(directory, f'out_{n_workers}'),
+                                               workers=n_workers, retries=0)
+            seconds = time.perf_counter() - start
+            if failures:
+                raise SystemExit(f"{len(failures)} file(s) failed: {failures}")
+            baseline = baseline or seconds
+            rows = sum(result['rows'] for result in results)
+            speedup = baseline / seconds
+            print(f"{n_workers:>8} {seconds:>9.2f} {rows / seconds:>12,.0f} {speedup:>8.2f} "
+                  f"{speedup / n_workers:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Rerun latency and per-session memory of the reference data, per-rerun build vs shared cache
+
+Simulates concurrent Streamlit sessions as threads (as Streamlit runs them).
+Each session reruns the data-loading prologue of Main.py several times and
+keeps what its last rerun produced alive, as a live script run does:
+
+    python -m benchmarks.reference_sessions --sessions 200 --reruns 20
+"""
+import argparse
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from aware.classifier import DrugClassifier
+from aware.drug_database import create_drug_database
+from aware.reference import get_reference, invalidate_reference
+
+
+def rebuild_prologue():
+    """What every rerun did before: build the table, classifier and sorted names"""
+    drug_db = create_drug_database()
+    classifier = DrugClassifier(drug_db)
+    all_drug_names = sorted(drug_db['Antibiotic'].tolist())
+    counts = {category: len(drug_db[drug_db['Category'] == category]) for category in ('Access', 'Watch', 'Reserve')}
+    return drug_db, classifier, all_drug_names, counts
+
+
+def cached_prologue():
+    """What every rerun does now: fetch the process-wide ReferenceTable, counts from its cube"""
+    reference = get_reference()
+    return reference.drug_db, reference.classifier, reference.drug_names, reference.cube.by('Category')
+
+
+def run_sessions(prologue, n_sessions, n_reruns, trace=False):
+    latencies = [[] for _ in range(n_sessions)]
+    session_state = [None] * n_sessions
+    barrier = threading.Barrier(n_sessions)
+
+    def session(i):
+        barrier.wait()
+        for _ in range(n_reruns):
+            start = time.perf_counter()
+            session_state[i] = prologue()
+            latencies[i].append(time.perf_counter() - start)
+
+    if trace:
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n_sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if trace:
+        retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename'))
+        tracemalloc.stop()
+        return retained / n_sessions / 1024
+    latencies = np.concatenate(latencies) * 1e3
+    return np.median(latencies), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} concurrent sessions x {args.reruns} reruns")
+    print(f"{'mode':>8} {'p50 ms':>9} {'p99 ms':>9} {'KiB/session':>12}")
+    for label, prologue in (('rebuild', rebuild_prologue), ('cached', cached_prologue)):
+        invalidate_reference()
+        p50, p99 = run_sessions(prologue, args.sessions, args.reruns)
+        # Memory is measured in a separate pass since tracemalloc slows every allocation
+        invalidate_reference()
+        kib = run_sessions(prologue, args.sessions, args.reruns, trace=True)
+        print(f"{label:>8} {p50:>9.3f} {p99:>9.3f} {kib:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
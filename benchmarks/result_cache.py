@@ -0,0 +1,70 @@
+"""Re-running a batch classification through the on-disk result cache
+
+Writes a synthetic facility extract, then times classify_file on it against
+ResultCache.classify_file for the first run (miss), an unchanged re-run
+(hit) and a re-run after --append rows were added to the end of the file
+(only the tail is classified):
+
+    python -m benchmarks.result_cache --rows 2000000 --append 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.batch import classify_file
+from aware.reference import get_reference
+from aware.result_cache import ResultCache
+
+
+def extract(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    names = np.array([*get_reference().drug_names, 'Unknown-drug'], dtype=object)
+    return pd.DataFrame({
+        'Facility': 'facility_001',
+        'Antibiotic': rng.choice(names, size=n_rows),
+        'DDD': rng.random(n_rows).round(3),
+    })
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--append', type=int, default=100_000, help="Rows added before the last re-run")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='parquet', help="Output format")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'extract.csv')
+        output = os.path.join(directory, f'annotated.{args.format}')
+        extract(args.rows, 0).to_csv(source, index=False)
+        cache = ResultCache(os.path.join(directory, 'cache'))
+
+        print(f"{args.rows:,} rows, {args.format} output")
+        print(f"{'run':>34} {'seconds':>9} {'classified':>11}")
+        seconds, summary = timed(lambda: classify_file(source, output))
+        print(f"{'classify_file':>34} {seconds:>9.3f} {summary['rows']:>11,}")
+        for label in ('cache miss (first run)', 'cache hit (unchanged file)'):
+            seconds, summary = timed(lambda: cache.classify_file(source, output))
+            print(f"{label:>34} {seconds:>9.3f} {summary['classified_rows']:>11,}")
+
+        extract(args.append, 1).to_csv(source, mode='a', header=False, index=False)
+        label = f'classify_file (+{args.append:,} rows)'
+        seconds, summary = timed(lambda: classify_file(source, output))
+        print(f"{label:>34} {seconds:>9.3f} {summary['rows']:>11,}")
+        seconds, summary = timed(lambda: cache.classify_file(source, output))
+        label = f"cache {summary['cache']} (+{args.append:,} rows)"
+        print(f"{label:>34} {seconds:>9.3f} {summary['classified_rows']:>11,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Database View filter latency: per-keystroke str.contains scan vs SearchIndex
+
+The reference list is repeated --scale times to mimic combined multi-edition,
+multi-country formularies:
+
+    python -m benchmarks.search_index --scale 1 100 200
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aware.drug_database import create_drug_database
+from aware.search import SearchIndex
+
+# (category_filter, eml_filter, search_db) as typed into the Database View
+QUERIES = [
+    ([], [], 'c'), ([], [], 'ce'), ([], [], 'cef'), ([], [], 'ceft'), ([], [], 'ceftr'),
+    (['Access'], [], 'pen'), ([], ['Yes'], 'j01'), (['Watch', 'Reserve'], ['No'], 'mycin'),
+    ([], [], 'glycopeptides'), ([], [], 'j01dd04'),
+]
+
+
+def scan_filter(drug_db, category_filter, eml_filter, search_db):
+    """The filter code Main.py ran on every rerun before the index"""
+    filtered_db = drug_db.copy()
+    if category_filter:
+        filtered_db = filtered_db[filtered_db['Category'].isin(category_filter)]
+    if eml_filter:
+        filtered_db = filtered_db[filtered_db['EML'].isin(eml_filter)]
+    if search_db:
+        search_lower = search_db.lower()
+        filtered_db = filtered_db[
+            filtered_db['Antibiotic'].str.lower().str.contains(search_lower) |
+            filtered_db['Class'].str.lower().str.contains(search_lower) |
+            filtered_db['ATC'].str.lower().str.contains(search_lower)
+        ]
+    return filtered_db
+
+
+def per_query_ms(fn, repeat=5):
+    timings = []
+    for category_filter, eml_filter, query in QUERIES:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(category_filter, eml_filter, query)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best * 1e3)
+    return np.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100, 200])
+    args = parser.parse_args()
+
+    base = create_drug_database()
+    print(f"{'rows':>8} {'method':>14} {'median ms':>10} {'max ms':>8}")
+    for scale in args.scale:
+        drug_db = pd.concat([base.assign(Antibiotic=base['Antibiotic'] + f'-{i}') for i in range(scale)],
+                            ignore_index=True)
+
+        start = time.perf_counter()
+        index = SearchIndex(drug_db)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        runs = [
+            ('scan', lambda c, e, q: scan_filter(drug_db, c, e, q), 5),
+            # repeat=1 so each query is timed on an empty memo cache
+            ('index (cold)', lambda c, e, q: index._filter_uncached(tuple(c), tuple(e), q), 1),
+            ('index (memo)', index.filter, 5),
+        ]
+        for label, fn, repeat in runs:
+            median, worst = per_query_ms(fn, repeat)
+            print(f"{len(drug_db):>8,} {label:>14} {median:>10.3f} {worst:>8.3f}")
+        print(f"{'':>8} {'index build':>14} {build_ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Load test of the Streamlit app: rerun latency and server memory per session
+
+Starts `streamlit run Main.py` for each session count and connects that many
+scripted clients over the app's websocket, speaking the same protobuf
+messages as the browser. Every client runs a clinician's session: open the
+app, select drugs and classify them, switch to the Database View and search
+and filter it, pausing a random think time (--think seconds on average)
+between reruns. The widget states of each rerun are sent as the browser
+sends them, and a rerun is timed from the request to the server's
+script_finished message, so latencies include the time spent queued
+behind other sessions' reruns.
+
+Memory per session is the growth of the server's resident set size with
+every client still connected, divided by the number of sessions. Server
+CPU per rerun is the CPU time the server process used during the run,
+divided by the number of reruns: the cost of a rerun regardless of how
+many cores serve them. Linux only (reads /proc):
+
+    python -m benchmarks.session_load --sessions 50 200 500
+    python -m benchmarks.session_load --url ws://127.0.0.1:8501 --sessions 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SELECTION = ['Amoxicillin', 'Ceftriaxone', 'Meropenem', 'Colistin_IV', 'Vancomycin_IV']
+
+# (description, widget state changes by key or label) of each rerun after opening the app
+SCENARIO = [
+    ('select drugs', {'selected_drugs': ('string_array_value', SELECTION)}),
+    ('classify', {'Classify Selected Drugs': ('trigger_value', True)}),
+    ('open Database View', {'active_tab': ('string_value', 'Database View')}),
+    ('search', {'search_db': ('string_value', 'cef')}),
+    ('filter category', {'category_filter': ('string_array_value', ['Watch', 'Reserve'])}),
+    ('clear search', {'search_db': ('string_value', '')}),
+    ('ATC group', {'atc_filter': ('string_value', 'J01D')}),
+    ('back to Drug Selector', {'active_tab': ('string_value', 'Drug Selector')}),
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"No VmRSS for process {pid}")
+
+
+def cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        # utime and stime, after the parenthesized command name
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def start_server(port):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.join(ROOT, 'Main.py'), '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none'],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Streamlit server did not start")
+
+
+class Session:
+    """One scripted browser tab"""
+
+    def __init__(self, url):
+        self.url = url
+        self.widget_ids = {}
+        self.states = {}
+
+    async def rerun(self, websocket, changes=None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.page_script_hash = ''
+        triggers = []
+        for name, (field, value) in (changes or {}).items():
+            widget_id = self.widget_ids[name]
+            self.states[widget_id] = (field, value)
+            if field == 'trigger_value':
+                triggers.append(widget_id)
+        for widget_id, (field, value) in self.states.items():
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if field == 'string_array_value':
+                state.string_array_value.data.extend(value)
+            else:
+                setattr(state, field, value)
+        # Buttons are only pressed for one rerun
+        for widget_id in triggers:
+            del self.states[widget_id]
+
+        start = time.perf_counter()
+        await websocket.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await websocket.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'delta':
+                self._collect_widget_id(forward.delta)
+            elif kind == 'script_finished':
+                return time.perf_counter() - start
+
+    def _collect_widget_id(self, delta):
+        # Keyed widgets are found by key (the id suffix), buttons by label
+        kind = delta.WhichOneof('type')
+        if kind == 'new_element':
+            element = getattr(delta.new_element, delta.new_element.WhichOneof('type'))
+        elif kind == 'add_block' and delta.add_block.WhichOneof('type') == 'tab_container':
+            element = delta.add_block.tab_container
+        else:
+            return
+        widget_id = getattr(element, 'id', '')
+        if widget_id:
+            key = widget_id.rsplit('-', 1)[-1]
+            self.widget_ids[key if key != 'None' else getattr(element, 'label', '')] = widget_id
+
+
+async def run_sessions(url, n_sessions, server_pid=None, think=0.0):
+    import websockets
+
+    latencies, connected = [], asyncio.Event()
+    ready = 0
+
+    async def session():
+        nonlocal ready
+        client = Session(url)
+        # No client pings: a saturated server answers them late, which is what is being measured
+        async with websockets.connect(f'{url}/_stcore/stream', subprotocols=['streamlit'], max_size=None,
+                                      ping_interval=None, close_timeout=60) as websocket:
+            latencies.append(await client.rerun(websocket))
+            for _, changes in SCENARIO:
+                await asyncio.sleep(random.uniform(0, 2 * think))
+                latencies.append(await client.rerun(websocket, changes))
+            # Stay connected until every session has finished, so memory is measured with all of them alive
+            ready += 1
+            if ready == n_sessions:
+                connected.set()
+            await connected.wait()
+            await asyncio.sleep(1)
+
+    async def measure_memory():
+        await connected.wait()
+        return rss_bytes(server_pid) if server_pid else None
+
+    start = time.perf_counter()
+    *_, rss = await asyncio.gather(*(session() for _ in range(n_sessions)), measure_memory())
+    return np.array(latencies) * 1e3, rss, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[50, 200, 500])
+    parser.add_argument('--think', type=float, default=2.0, help="Mean seconds a clinician waits between reruns")
+    parser.add_argument('--url', help="Test a running server instead of starting one (no memory or CPU figures)")
+    args = parser.parse_args()
+
+    print(f"{len(SCENARIO) + 1} reruns per session: open app, " + ', '.join(step for step, _ in SCENARIO))
+    print(f"{'sessions':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wall s':>7} {'RSS MiB':>8} "
+          f"{'KiB/session':>12} {'CPU ms/rerun':>13}")
+    for n_sessions in args.sessions:
+        server, url, before, cpu_before = None, args.url, None, None
+        if url is None:
+            port = free_port()
+            server = start_server(port)
+            url = f'ws://127.0.0.1:{port}'
+            # Warm up: the first session pays for imports and the shared reference data
+            asyncio.run(run_sessions(url, 1))
+            before, cpu_before = rss_bytes(server.pid), cpu_seconds(server.pid)
+        try:
+            latencies, rss, wall = asyncio.run(run_sessions(url, n_sessions, server.pid if server else None,
+                                                            args.think))
+            cpu = cpu_seconds(server.pid) - cpu_before if server else None
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        if before:
+            server_use = (f"{rss / 2**20:>8.0f} {(rss - before) / n_sessions / 1024:>12.0f} "
+                          f"{cpu / len(latencies) * 1e3:>13.1f}")
+        else:
+            server_use = f"{'-':>8} {'-':>12} {'-':>13}"
+        print(f"{n_sessions:>8} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {wall:>7.1f} {server_use}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Database View styling cost: row-wise Styler over the whole table vs vectorized, paged styling
+
+Styler._compute() is what st.dataframe runs to resolve cell styles before
+serializing, and to_html() stands in for the payload sent to the browser:
+
+    python -m benchmarks.table_styling --rows 100000 --page-size 100
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from aware.drug_database import create_drug_database
+from aware.search import SearchIndex
+from aware.styling import TablePages, category_css, style_frame
+
+
+def highlight_rows_high_contrast(row):
+    """The per-row styling function Main.py used before"""
+    if row['Category'] == 'Access':
+        return ['background-color: #66BB6A; color: #1B5E20; font-weight: bold'] * len(row)
+    elif row['Category'] == 'Watch':
+        return ['background-color: #FFD54F; color: #5D4037; font-weight: bold'] * len(row)
+    else:
+        return ['background-color: #EF5350; color: #B71C1C; font-weight: bold'] * len(row)
+
+
+def timed(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    base = create_drug_database()
+    scale = -(-args.rows // len(base))
+    drug_db = pd.concat([base.assign(Antibiotic=base['Antibiotic'] + f'-{i}') for i in range(scale)],
+                        ignore_index=True).iloc[:args.rows]
+    pages = TablePages(SearchIndex(drug_db))
+
+    runs = [
+        ('row-wise, full table', lambda: drug_db.style.apply(highlight_rows_high_contrast, axis=1)),
+        ('vectorized, full table', lambda: style_frame(drug_db)),
+        ('vectorized, one page', lambda: style_frame(drug_db.iloc[:args.page_size])),
+        ('paged + cached', lambda: pages.page([], [], '', 0, args.page_size)),
+    ]
+    print(f"{len(drug_db):,} rows, page size {args.page_size}")
+    print(f"{'mode':>24} {'style ms':>10} {'html KB':>9}")
+    for label, make_styler in runs:
+        ms, styler = timed(lambda: make_styler()._compute(), args.repeat)
+        # The full-table HTML payload is only rendered once; it takes a while at 100k rows
+        html_kb = len(styler.to_html()) / 1024
+        print(f"{label:>24} {ms:>10.1f} {html_kb:>9.0f}")
+    ms, _ = timed(lambda: category_css(drug_db), args.repeat)
+    print(f"{'category_css only':>24} {ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
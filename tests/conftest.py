@@ -0,0 +1,15 @@
+import pytest
+
+from aware.drug_database import create_drug_database
+from aware.reference import get_reference
+
+
+@pytest.fixture(scope='session')
+def drug_db():
+    """The WHO list as the app used to hold it: plain text columns, EML as Yes/No"""
+    return create_drug_database()
+
+
+@pytest.fixture(scope='session')
+def reference():
+    return get_reference()
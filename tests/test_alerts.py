@@ -0,0 +1,107 @@
+"""Alert rules over per-ward sliding windows of prescription events"""
+import json
+
+import pytest
+
+from aware.alerts import (CATEGORY_CODES, UNCLASSIFIED, AlertEngine, EventIndex, ReserveRule, WardWindow,
+                          WatchShareRule)
+
+
+@pytest.fixture(scope='module')
+def index(reference):
+    return EventIndex(reference)
+
+
+@pytest.fixture(scope='module')
+def drugs(reference):
+    """The first Access, Watch and Reserve drug names of the reference list"""
+    categories = dict(zip(reference.drug_db['Antibiotic'], reference.drug_db['Category'].astype(str)))
+    return {category: next(name for name in reference.drug_names if categories[name] == category)
+            for category in CATEGORY_CODES}
+
+
+def test_window_expires_old_events():
+    window = WardWindow(seconds=10)
+    window.add(0, CATEGORY_CODES['Watch'])
+    window.add(5, CATEGORY_CODES['Access'])
+    window.add(9, UNCLASSIFIED)
+    assert window.counts == [1, 1, 0, 1]
+    assert window.share('Watch') == 0.5
+
+    # Events at or before latest - seconds leave the window
+    window.add(15, CATEGORY_CODES['Access'])
+    assert window.counts == [1, 0, 0, 1]
+    assert window.share('Watch') == 0.0
+
+    # A late event is counted, and leaves once the events before it have
+    window.add(3, CATEGORY_CODES['Reserve'])
+    assert window.counts == [1, 0, 1, 1]
+    window.add(26, CATEGORY_CODES['Access'])
+    assert window.counts == [1, 0, 0, 0]
+
+
+def test_event_index(index, drugs):
+    watch = drugs['Watch']
+
+    assert index.lookup(watch) == (watch, 'Watch')
+    assert index.lookup(watch.upper()) == (watch, 'Watch')
+    assert index.lookup('Unknown-drug') is None
+    assert index.lookup(atc=' j01xx01 ', route='P') == ('Fosfomycin_IV', 'Reserve')
+    assert index.lookup(atc='J01XX01', route='oral') == ('Fosfomycin_oral', 'Watch')
+    # Without a route, a code shared by entries of different categories has no category
+    assert index.lookup(atc='J01XX01') is None
+    assert index.lookup('Unknown-drug', atc='J01XB01') == ('Colistin_IV', 'Reserve')
+
+
+def test_reserve_rule_cooldown(index, drugs):
+    reserve = drugs['Reserve']
+    engine = AlertEngine([ReserveRule(cooldown=3600)], index)
+
+    fired = [bool(engine.process({'time': t, 'ward': ward, 'drug': reserve}))
+             for t, ward in [(0, 'ICU'), (1800, 'ICU'), (1800, 'A'), (3600, 'ICU'), (3601, 'ICU')]]
+
+    assert fired == [True, False, True, True, False]
+    assert engine.process({'time': 3700, 'ward': 'ICU', 'drug': drugs['Access']}) == []
+
+
+def test_watch_share_rule_rearms(index, drugs):
+    engine = AlertEngine([WatchShareRule(threshold=0.5, min_events=4)], index, window=100)
+
+    def share_alerts(drug, t):
+        return [alert['share'] for alert in engine.process({'time': t, 'ward': 'ICU', 'drug': drug})]
+
+    # Not judged below min_events classified prescriptions; unclassified ones do not count
+    assert [share_alerts(drugs['Watch'], t) for t in range(3)] == [[], [], []]
+    assert share_alerts('Unknown-drug', 3) == []
+    assert share_alerts(drugs['Access'], 4) == [0.75]
+    # Alerted once per crossing
+    assert share_alerts(drugs['Watch'], 5) == []
+    assert [share_alerts(drugs['Access'], t) for t in (6, 7, 8)] == [[], [], []]
+    assert engine.ward_shares()['ICU']['Watch'] == pytest.approx(4 / 8)
+    assert share_alerts(drugs['Access'], 9) == []
+    # Falling under the threshold re-armed the ward; the early events leave the window
+    assert [share_alerts(drugs['Watch'], t) for t in (104, 105)] == [[], []]
+    assert share_alerts(drugs['Watch'], 106) == [0.5]
+
+
+def test_process_lines(index, drugs):
+    alerts = []
+    engine = AlertEngine([ReserveRule()], index, emit=alerts.append)
+    lines = [
+        json.dumps({'time': '2026-03-02T10:15:00', 'ward': 'ICU', 'drug': drugs['Reserve']}),
+        json.dumps({'time': 1772446500, 'ward': 'ICU', 'atc': 'J01XX01', 'route': 'P'}).encode(),
+        json.dumps({'time': 1772446501, 'ward': 'ICU', 'drug': 'Unknown-drug'}),
+        '',
+        'not json',
+        '{"time": 1} {"time": 2}',
+        '[1, 2]',
+        json.dumps({'time': 'yesterday', 'drug': drugs['Reserve']}),
+        json.dumps({'time': 1, 'drug': 5}),
+    ]
+
+    raised = [engine.process_line(line) for line in lines]
+
+    assert [len(r) for r in raised] == [1, 1, 0, 0, 0, 0, 0, 0, 0]
+    assert [alert['drug'] for alert in alerts] == [drugs['Reserve'], 'Fosfomycin_IV']
+    assert alerts[0]['rule'] == 'reserve_prescribed' and alerts[0]['category'] == 'Reserve'
+    assert (engine.n_events, engine.n_unclassified, engine.n_invalid, engine.n_alerts) == (3, 1, 5, 2)
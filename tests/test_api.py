@@ -0,0 +1,109 @@
+"""Status codes and error paths of the ASGI classification API"""
+import asyncio
+import json
+
+import pytest
+
+from aware import api
+from aware.api import MAX_BATCH, MAX_CACHED_BODY, app
+from aware.reference import invalidate_reference
+
+
+def request(method, path, query=b'', body=b'', headers=()):
+    """Run one request through the ASGI app; return (status, content type, body)"""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': list(headers)}
+    messages = [{'type': 'http.request', 'body': body[i:i + 4096], 'more_body': i + 4096 < len(body)}
+                for i in range(0, max(len(body), 1), 4096)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, response = sent
+    return start['status'], dict(start['headers'])[b'content-type'], response['body']
+
+
+def test_health():
+    status, _, body = request('GET', '/health')
+
+    assert status == 200
+    assert json.loads(body)['status'] == 'ok'
+
+
+@pytest.mark.parametrize('query, status, category', [
+    (b'name=Amikacin', 200, 'Access'),
+    (b'name=amikacin+500mg+inj&fuzzy=1', 200, 'Access'),
+    (b'name=amikacin', 404, None),
+    (b'name=Unknown-drug&fuzzy=true', 404, None),
+])
+def test_classify_one(query, status, category):
+    got, content_type, body = request('GET', '/classify', query)
+
+    assert (got, content_type) == (status, b'application/json')
+    if category:
+        assert json.loads(body)['Category'] == category
+    else:
+        assert 'is not in the AWaRe list' in json.loads(body)['error']
+
+
+def test_classify_batch():
+    names = ['Amikacin', 'Unknown-drug', 'Meropenem']
+
+    status, _, body = request('POST', '/classify', body=json.dumps({'names': names}).encode())
+
+    assert status == 200
+    results = json.loads(body)['results']
+    assert [r['Antibiotic'] for r in results] == names
+    assert [r['Category'] for r in results] == ['Access', None, 'Watch']
+    assert results[0]['EML'] in ('Yes', 'No')
+
+
+def test_classify_large_batch():
+    # Over MAX_CACHED_BODY: read in several messages and classified on a worker thread
+    names = ['Amikacin', 'Unknown-drug'] * (MAX_CACHED_BODY // 10)
+
+    status, _, body = request('POST', '/classify', body=json.dumps({'names': names}).encode())
+
+    assert status == 200
+    assert len(json.loads(body)['results']) == len(names)
+
+
+@pytest.mark.parametrize('method, path, query, body, status, message', [
+    ('GET', '/classify', b'', b'', 400, "Missing 'name'"),
+    ('POST', '/classify', b'', b'not json', 400, "must be JSON"),
+    ('POST', '/classify', b'', b'["Amikacin"]', 400, "'names' must be a list of strings"),
+    ('POST', '/classify', b'', b'{"names": ["Amikacin", 3]}', 400, "'names' must be a list of strings"),
+    ('POST', '/classify', b'', json.dumps({'names': ['x'] * (MAX_BATCH + 1)}).encode(), 413, "At most"),
+    ('DELETE', '/classify', b'', b'', 405, "Method not allowed"),
+    ('GET', '/nowhere', b'', b'', 404, "Not found"),
+])
+def test_errors(method, path, query, body, status, message):
+    got, _, response = request(method, path, query, body)
+
+    assert got == status
+    assert message in json.loads(response)['error']
+
+
+def test_metrics():
+    request('GET', '/classify', b'name=Amikacin')
+
+    status, content_type, body = request('GET', '/metrics')
+    assert status == 200 and content_type.startswith(b'text/plain')
+    assert b'aware_api_requests' in body
+
+    _, content_type, _ = request('GET', '/metrics', headers=[(b'accept', b'application/openmetrics-text')])
+    assert content_type.startswith(b'application/openmetrics-text')
+
+
+def test_responses_cleared_on_invalidate():
+    request('GET', '/classify', b'name=Amikacin')
+    assert api._single_response.cache_info().currsize > 0
+
+    invalidate_reference()
+
+    assert api._single_response.cache_info().currsize == 0
+    assert api._batch_response_cached.cache_info().currsize == 0
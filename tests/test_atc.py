@@ -0,0 +1,82 @@
+"""ATCIndex prefix lookups and route splitting of codes shared by IV and oral entries"""
+import pandas as pd
+import pytest
+
+from aware.atc import ATCIndex
+from aware.classifier import text_columns
+
+
+@pytest.fixture(scope='module')
+def atc_index(drug_db):
+    return ATCIndex(drug_db)
+
+
+def classified(atc_index, codes, routes=None):
+    return text_columns(atc_index.classify_codes(pd.Series(codes, dtype=object), routes))
+
+
+@pytest.mark.parametrize('route, antibiotic, category', [
+    ('IV', 'Fosfomycin_IV', 'Reserve'),
+    ('intravenous', 'Fosfomycin_IV', 'Reserve'),
+    ('P', 'Fosfomycin_IV', 'Reserve'),
+    ('oral', 'Fosfomycin_oral', 'Watch'),
+    (' O ', 'Fosfomycin_oral', 'Watch'),
+    ('tablet', 'Fosfomycin_oral', 'Watch'),
+])
+def test_route_splits_shared_code(atc_index, route, antibiotic, category):
+    row = classified(atc_index, ['J01XX01'], [route]).iloc[0]
+
+    assert (row['Antibiotic'], row['Category'], row['Class']) == (antibiotic, category, 'Phosphonics')
+
+
+@pytest.mark.parametrize('route', [None, 'rectal'])
+def test_shared_code_without_usable_route(atc_index, route):
+    # Only the values both route entries agree on are filled
+    row = classified(atc_index, ['J01XX01'], [route]).iloc[0]
+
+    assert row['Class'] == 'Phosphonics'
+    assert row['Antibiotic'] is None and row['Category'] is None and row['EML'] is None
+
+
+def test_classify_codes(atc_index):
+    codes = [' j01xb01 ', 'J01AA08', 'J01AA08', 'Z99ZZ99', None, 'J01XX01']
+    routes = ['oral', 'IV', 'PO', 'IV', 'IV', None]
+
+    result = classified(atc_index, codes, routes)
+
+    assert result['Antibiotic'].tolist() == [
+        # A code with a single entry ignores the route
+        'Colistin_IV', 'Minocycline_IV', 'Minocycline_oral', None, None, None]
+    assert result['Category'].tolist() == ['Reserve', 'Reserve', 'Watch', None, None, None]
+
+
+def test_classify_without_routes(atc_index, drug_db):
+    single = drug_db[~drug_db['ATC'].duplicated(keep=False)]
+
+    result = classified(atc_index, single['ATC'].tolist())
+
+    assert result['Antibiotic'].tolist() == single['Antibiotic'].tolist()
+    assert result['Category'].tolist() == single['Category'].tolist()
+
+
+def test_annotate(atc_index):
+    frame = pd.DataFrame({'Code': ['J01XX01', 'J01XX01'], 'Route': ['IV', 'oral'], 'Qty': [1, 2]})
+
+    annotated = text_columns(atc_index.annotate(frame, 'Code', 'Route'))
+
+    assert annotated.columns.tolist() == ['Code', 'Route', 'Qty', 'Antibiotic', 'Class', 'Category', 'EML']
+    assert annotated['Antibiotic'].tolist() == ['Fosfomycin_IV', 'Fosfomycin_oral']
+
+
+@pytest.mark.parametrize('prefix', ['J', 'j01', 'J01C', 'J01XX', 'J01XX01', 'Q'])
+def test_prefix_positions(atc_index, drug_db, prefix):
+    expected = drug_db.index[drug_db['ATC'].str.upper().str.startswith(prefix.upper())]
+
+    assert drug_db.index[atc_index.prefix_positions(prefix)].tolist() == expected.tolist()
+
+
+def test_rollup(atc_index, drug_db):
+    table = atc_index.rollup(3, 'J01')
+
+    assert table.to_numpy().sum() == drug_db['ATC'].str.startswith('J01').sum()
+    assert table.loc['J01X'].sum() == drug_db['ATC'].str.startswith('J01X').sum()
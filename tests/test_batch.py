@@ -0,0 +1,46 @@
+"""Command-line errors of python -m aware.batch"""
+import pandas as pd
+import pytest
+
+from aware.batch import main
+
+
+@pytest.fixture
+def extract(tmp_path):
+    path = tmp_path / 'extract.csv'
+    pd.DataFrame({'Antibiotic': ['Amikacin', 'Unknown-drug']}).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('args, message', [
+    (['--column', 'Drug'], "Column 'Drug' not found, available columns: Antibiotic"),
+    (['--edition', '1999'], "Unknown edition '1999'"),
+])
+def test_cli_option_errors(tmp_path, capsys, extract, args, message):
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(extract), str(tmp_path / 'annotated.csv'), *args])
+
+    assert exit_info.value.code == 2
+    assert f'error: {message}' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('source, destination, message', [
+    ('extract.txt', 'annotated.csv', "Unsupported file type '.txt'"),
+    ('extract.csv', 'annotated.txt', "Unsupported file type '.txt'"),
+    ('missing.csv', 'annotated.csv', "No such file:"),
+])
+def test_cli_file_errors(tmp_path, capsys, extract, source, destination, message):
+    (tmp_path / 'extract.txt').write_text(extract.read_text())
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path / source), str(tmp_path / destination)])
+
+    assert exit_info.value.code == 2
+    assert f'error: {message}' in capsys.readouterr().err
+
+
+def test_cli_classifies(tmp_path, capsys, extract):
+    main([str(extract), str(tmp_path / 'annotated.csv')])
+
+    assert 'Classified 2 rows: 1 matched, 1 unmatched' in capsys.readouterr().out
+    assert pd.read_csv(tmp_path / 'annotated.csv')['Category'].tolist()[0] == 'Access'
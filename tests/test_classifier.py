@@ -0,0 +1,58 @@
+"""DrugClassifier against the per-drug lookups Main.py used to make on drug_db"""
+import pandas as pd
+
+from aware.classifier import CLASSIFICATION_COLUMNS, DrugClassifier, text_columns
+
+UNKNOWN_NAMES = ['Unknown-drug', 'amikacin', '', 'Amikacin ']
+
+
+def old_lookup(drug_db, drug):
+    """drug_db[drug_db['Antibiotic'] == drug], first row, as the Drug Selector did"""
+    rows = drug_db[drug_db['Antibiotic'] == drug]
+    if rows.empty:
+        return {col: None for col in CLASSIFICATION_COLUMNS}
+    return {col: rows.iloc[0][col] for col in CLASSIFICATION_COLUMNS}
+
+
+def test_classify_matches_equality_lookup(drug_db):
+    names = [*drug_db['Antibiotic'], *UNKNOWN_NAMES]
+    classified = text_columns(DrugClassifier(drug_db).classify(names))
+
+    assert classified['Antibiotic'].tolist() == names
+    for name, row in zip(names, classified[CLASSIFICATION_COLUMNS].to_dict('records')):
+        assert row == old_lookup(drug_db, name), name
+
+
+def test_classify_selection_matches_isin(drug_db):
+    selection = [*drug_db['Antibiotic'].iloc[::7], 'Unknown-drug']
+    old = drug_db[drug_db['Antibiotic'].isin(selection)]
+
+    results = text_columns(DrugClassifier(drug_db).classify(selection).dropna(subset=['Category']))
+
+    columns = ['Antibiotic', *CLASSIFICATION_COLUMNS]
+    pd.testing.assert_frame_equal(
+        results[columns].sort_values('Antibiotic').reset_index(drop=True).astype(object),
+        old[columns].sort_values('Antibiotic').reset_index(drop=True).astype(object),
+    )
+
+
+def test_classify_categorical_names(drug_db):
+    names = pd.Series([*drug_db['Antibiotic'].iloc[:20], 'Unknown-drug'] * 3)
+    classifier = DrugClassifier(drug_db)
+
+    pd.testing.assert_frame_equal(
+        text_columns(classifier.classify(names.astype('category'))).drop(columns='Antibiotic'),
+        text_columns(classifier.classify(names)).drop(columns='Antibiotic'),
+    )
+
+
+def test_encode_reordered_categories(drug_db):
+    values = DrugClassifier(drug_db)._values
+    categories = pd.Series(['Reserve', 'Access', 'Watch', None, 'Reserve'])
+    reordered = categories.astype(pd.CategoricalDtype(['Reserve', 'Access', 'Watch']))
+
+    codes = values.encode('Category', reordered)
+
+    pd.testing.assert_series_equal(pd.Series(values.array('Category', codes)),
+                                   categories.astype(values.dtypes['Category']))
+    assert codes.tolist() == values.encode('Category', categories.astype(object)).tolist()
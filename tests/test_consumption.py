@@ -0,0 +1,80 @@
+"""The consumption index keeps every unit of quantity it is given"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aware.consumption import CONSUMPTION_COLUMNS, aggregate_consumption, build_consumption_index
+from aware.stats import UNCLASSIFIED, UNKNOWN
+
+# The dispensing dates include unparseable ones on purpose
+pytestmark = pytest.mark.filterwarnings('ignore:Could not infer format')
+
+
+@pytest.fixture
+def dispensing(reference):
+    rng = np.random.default_rng(0)
+    n_rows = 5_000
+    names = np.array([*reference.drug_names[:40], 'Unknown-drug', None], dtype=object)
+    wards = np.array(['A', 'B', 'C', None], dtype=object)
+    dates = np.array(['2026-01-05', '2026-02-17', '2026-03-30', 'not a date', None], dtype=object)
+    quantity = rng.random(n_rows).round(3) * 10
+    quantity[::97] = np.nan
+    return pd.DataFrame({
+        'Facility': rng.choice(['north', 'south'], size=n_rows),
+        'Ward': rng.choice(wards, size=n_rows),
+        'Drug': rng.choice(names, size=n_rows),
+        'DDD': quantity,
+        'DispenseDate': rng.choice(dates, size=n_rows),
+    })
+
+
+def chunks(frame, size=700):
+    return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+
+def test_totals_preserved(dispensing):
+    totals = aggregate_consumption(chunks(dispensing), 'DDD', 'Drug', ['Facility', 'Ward'], 'DispenseDate')
+
+    assert totals.sum() == pytest.approx(dispensing['DDD'].sum())
+    assert totals.index.names == ['Facility', 'Ward', 'Month', 'Category']
+
+
+def test_totals_match_groupby(reference, dispensing):
+    categories = dict(zip(reference.drug_db['Antibiotic'], reference.drug_db['Category'].astype(str)))
+    months = pd.to_datetime(dispensing['DispenseDate'], errors='coerce').dt.strftime('%Y-%m')
+    expected = dispensing.assign(
+        Ward=dispensing['Ward'].fillna(UNKNOWN),
+        Month=months.astype(object).fillna(UNKNOWN),
+        Category=dispensing['Drug'].map(categories).fillna(UNCLASSIFIED),
+    ).groupby(['Ward', 'Month', 'Category'])['DDD'].sum()
+
+    totals = aggregate_consumption(chunks(dispensing), 'DDD', 'Drug', ['Ward'], 'DispenseDate')
+
+    pd.testing.assert_series_equal(totals.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_index_file(tmp_path, dispensing):
+    source = tmp_path / 'dispensing.parquet'
+    dispensing.to_parquet(source, index=False)
+
+    index = build_consumption_index(str(source), str(tmp_path / 'index.parquet'), 'DDD', 'Drug',
+                                    ['Facility'], chunksize=1_000)
+
+    assert list(index.columns) == ['Facility', *CONSUMPTION_COLUMNS]
+    assert index['AWaRe Total'].sum() + index[UNCLASSIFIED].sum() == pytest.approx(dispensing['DDD'].sum())
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / 'index.parquet'), index)
+
+
+def test_non_numeric_quantities(tmp_path, dispensing):
+    source = tmp_path / 'dispensing.csv'
+    bad = dispensing.astype({'DDD': object})
+    bad.loc[[3, 10, 500], 'DDD'] = ['unknown', '1,5', 'two']
+    bad.to_csv(source, index=False)
+
+    with pytest.raises(ValueError, match='3 row'):
+        build_consumption_index(str(source), str(tmp_path / 'index.parquet'), 'DDD', 'Drug')
+
+    index = build_consumption_index(str(source), str(tmp_path / 'index.parquet'), 'DDD', 'Drug', skip_invalid=True)
+    assert index.attrs['invalid_rows'] == 3
+    counted = pd.to_numeric(bad['DDD'], errors='coerce').sum()
+    assert index['AWaRe Total'].sum() + index[UNCLASSIFIED].sum() == pytest.approx(counted)
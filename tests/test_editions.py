@@ -0,0 +1,69 @@
+"""EditionStore diffs and reclassification between two editions"""
+import pandas as pd
+import pytest
+
+from aware import editions, reference
+from aware.classifier import CLASSIFICATION_COLUMNS, text_columns
+from aware.editions import EditionStore
+
+
+@pytest.fixture(scope='module')
+def store(drug_db):
+    new = drug_db.copy()
+    old = drug_db.copy()
+    added, moved, updated = new['Antibiotic'].iloc[[0, 1, 2]]
+    old = old[old['Antibiotic'] != added]
+    old.loc[old['Antibiotic'] == moved, 'Category'] = 'Reserve' if new.iloc[1]['Category'] != 'Reserve' else 'Access'
+    old.loc[old['Antibiotic'] == updated, 'Class'] = 'Old-class'
+    dropped = old.iloc[:1].assign(Antibiotic='Oldmycin')
+    old = pd.concat([old, dropped], ignore_index=True)
+    return EditionStore({'2021': old, '2023': new}, {'2023': '2023-07-26'})
+
+
+def test_diff(store, drug_db):
+    added, moved, updated = drug_db['Antibiotic'].iloc[[0, 1, 2]]
+
+    diff = store.diff('2021', '2023')
+
+    assert dict(zip(diff['Antibiotic'], diff['Change'])) == {
+        added: 'Added', moved: 'Moved', updated: 'Updated', 'Oldmycin': 'Dropped'}
+    row = diff.set_index('Antibiotic').loc[updated]
+    assert (row['Class 2021'], row['Class 2023']) == ('Old-class', drug_db.iloc[2]['Class'])
+    assert pd.isna(diff.set_index('Antibiotic').loc[added, 'Category 2021'])
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_reclassify_matches_classify(store, drug_db, categorical):
+    names = pd.Series([*drug_db['Antibiotic'].iloc[:10], 'Oldmycin', 'Unknown-drug', None] * 4, dtype=object)
+    frame = store.classify(names, '2021')
+    frame['Antibiotic'] = names
+    if categorical:
+        # Categories in another order than the store's, as a file written elsewhere may have them
+        for col in ('Category', 'Class'):
+            frame[col] = frame[col].astype(object).astype(
+                pd.CategoricalDtype(sorted(frame[col].dropna().unique(), reverse=True)))
+
+    reclassified = store.reclassify(frame, '2021', '2023')
+
+    expected = store.classify(names, '2023')
+    pd.testing.assert_frame_equal(text_columns(reclassified[CLASSIFICATION_COLUMNS]),
+                                  text_columns(expected[CLASSIFICATION_COLUMNS]))
+
+
+def test_classify_as_of(store, drug_db):
+    moved = drug_db['Antibiotic'].iloc[1]
+    dates = ['2022-12-31', '2023-07-25', '2023-07-26', None, 'not a date']
+
+    classified = store.classify_as_of([moved] * len(dates), dates)
+
+    assert classified['Edition'].tolist() == ['2021', '2021', '2023', '2023', '2023']
+    old_category = store.classify([moved], '2021')['Category'].iloc[0]
+    assert classified['Category'].tolist() == [old_category, old_category, *[drug_db.iloc[1]['Category']] * 3]
+
+
+def test_invalidate_reference_reloads_editions():
+    store = editions.get_editions()
+
+    reference.invalidate_reference()
+
+    assert editions.get_editions() is not store
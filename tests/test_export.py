@@ -0,0 +1,80 @@
+"""Streamed exports in every format read back as the rows written"""
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aware.batch import iter_chunks, read_columns
+from aware.classifier import text_columns
+from aware.export import EXPORT_FORMATS, export_file, export_name, iter_export, write_export
+
+
+@pytest.fixture(scope='module')
+def classified(reference):
+    rng = np.random.default_rng(0)
+    names = np.array([*reference.drug_names, 'Unknown-drug'], dtype=object)
+    frame = pd.DataFrame({
+        'Facility': rng.choice(['north', 'south', 'east'], size=2_500).astype(object),
+        'Antibiotic': rng.choice(names, size=2_500),
+        'DDD': rng.random(2_500).round(3),
+    })
+    # The first chunk's Category is all missing, which must not pin its type
+    frame.loc[:999, 'Antibiotic'] = 'Unknown-drug'
+    return reference.classifier.annotate(frame)
+
+
+def read_back(data, fmt):
+    """Every row of an export, as text columns"""
+    chunks = list(iter_chunks(io.BytesIO(data), fmt))
+    return text_columns(pd.concat(chunks, ignore_index=True))
+
+
+def as_text(frame):
+    # CSV is read back as text: compare every column as text, and DDD as a number
+    text = text_columns(frame)
+    text = text.astype({col: object for col in text.columns if col != 'DDD'}).astype({'DDD': float})
+    return text.where(text.notna(), None)
+
+
+@pytest.mark.parametrize('fmt', EXPORT_FORMATS)
+def test_export_file_round_trip(classified, fmt):
+    with export_file(classified, fmt, chunksize=1_000) as f:
+        data = f.read()
+
+    pd.testing.assert_frame_equal(as_text(read_back(data, fmt)), as_text(classified))
+
+
+@pytest.mark.parametrize('fmt', EXPORT_FORMATS)
+def test_iter_export_matches_file(classified, fmt):
+    blocks = list(iter_export(classified, fmt, chunksize=1_000))
+
+    assert len(blocks) > 1
+    with export_file(classified, fmt, chunksize=1_000) as f:
+        expected = read_back(f.read(), fmt)
+    pd.testing.assert_frame_equal(read_back(b''.join(blocks), fmt), expected)
+
+
+def test_gzip_csv_is_one_stream(classified):
+    with export_file(classified, 'csv.gz', chunksize=1_000) as f:
+        text = gzip.decompress(f.read()).decode()
+
+    assert text.count('\n') == len(classified) + 1
+    assert text.startswith('Facility,Antibiotic,DDD,Class,ATC,Category,EML\n')
+
+
+@pytest.mark.parametrize('fmt', EXPORT_FORMATS)
+def test_empty_export_keeps_columns(classified, fmt, tmp_path):
+    path = tmp_path / export_name('empty', fmt)
+
+    assert write_export(classified.iloc[:0], path, fmt) == 0
+
+    assert read_columns(str(path), fmt) == classified.columns.tolist()
+
+
+def test_unknown_format(classified):
+    with pytest.raises(ValueError, match='Unknown export format'):
+        export_file(classified, 'xlsx')
+    with pytest.raises(ValueError, match='Unknown export format'):
+        list(iter_export(classified, 'json'))
@@ -0,0 +1,71 @@
+"""NameMatcher resolution of free-text drug names"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aware.matching import NameMatcher, normalize_name, unmatched_bucket
+
+
+@pytest.fixture(scope='module')
+def matcher(drug_db):
+    return NameMatcher(drug_db['Antibiotic'])
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('Amoxicillin 500 mg capsules', ('amoxicillin', 'oral')),
+    ('Ceftriaxone sodium 1 g inj', ('ceftriaxone', 'iv')),
+    ('Clavulanic acid + Amoxicillin', ('amoxicillin/clavulanic acid', None)),
+    ('Polymyxin-B_IV', ('polymyxin b', 'iv')),
+    ('Cephalexin', ('cefalexin', None)),
+])
+def test_normalize_name(raw, expected):
+    assert normalize_name(raw) == expected
+
+
+@pytest.mark.parametrize('raw, name, method', [
+    ('Amikacin', 'Amikacin', 'exact'),
+    ('amoxycillin', 'Amoxicillin', 'normalized'),
+    ('Augmentin 625mg', 'Amoxicillin/clavulanic-acid', 'normalized'),
+    ('Clavulanic acid + Amoxicillin', 'Amoxicillin/clavulanic-acid', 'normalized'),
+    ('Vancomycin 1g IV', 'Vancomycin_IV', 'normalized'),
+    ('vancomycin oral', 'Vancomycin_oral', 'normalized'),
+    ('Ceftriaxone sodium 1 g inj', 'Ceftriaxone', 'route-agnostic'),
+    ('Ciprofloxacn', 'Ciprofloxacin', 'fuzzy'),
+    ('Vancomycin', None, 'ambiguous'),
+    ('xyzzy', None, 'unmatched'),
+    ('500 mg', None, 'unmatched'),
+    (None, None, 'unmatched'),
+])
+def test_resolve_one(matcher, raw, name, method):
+    resolved, confidence, match = matcher.resolve_one(raw)
+
+    assert (resolved, match) == (name, method)
+    expected_confidence = {'exact': 1.0, 'normalized': 0.95, 'route-agnostic': 0.95 * 0.95}.get(method)
+    if expected_confidence is not None:
+        assert confidence == pytest.approx(expected_confidence)
+    elif method == 'fuzzy':
+        assert matcher.threshold * 0.9 <= confidence < 0.9
+    else:
+        assert confidence == 0.0
+
+
+def test_threshold(drug_db):
+    assert NameMatcher(drug_db['Antibiotic'], threshold=0.99).resolve_one('Ciprofloxacn')[2] == 'unmatched'
+
+
+def test_resolve_batch(matcher):
+    names = pd.Series(['Amikacin', 'xyzzy', None, 'amoxycillin', 'xyzzy', 'Vancomycin'], index=[5, 4, 3, 2, 1, 0])
+
+    resolved = matcher.resolve(names)
+
+    assert resolved.index.tolist() == names.index.tolist()
+    assert resolved['Input'].tolist() == names.tolist()
+    assert resolved['Antibiotic'].fillna('-').tolist() == ['Amikacin', '-', '-', 'Amoxicillin', '-', '-']
+    assert resolved['Match'].tolist() == ['exact', 'unmatched', 'unmatched', 'normalized', 'unmatched', 'ambiguous']
+    np.testing.assert_allclose(resolved['Confidence'], [1.0, 0.0, 0.0, 0.95, 0.0, 0.0])
+
+    bucket = unmatched_bucket(resolved)
+    assert bucket.to_dict('records') == [
+        {'Input': 'xyzzy', 'Match': 'unmatched', 'Count': 2},
+        {'Input': 'Vancomycin', 'Match': 'ambiguous', 'Count': 1},
+    ]
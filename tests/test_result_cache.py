@@ -0,0 +1,45 @@
+"""ResultCache outputs against classifying the whole file again"""
+import pandas as pd
+import pytest
+
+from aware.batch import classify_file
+from aware.result_cache import ResultCache
+
+
+def write_extract(path, names, start=0):
+    pd.DataFrame({
+        'Facility': [f'facility_{i % 7}' for i in range(start, start + len(names))],
+        'Antibiotic': names,
+    }).to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+
+@pytest.fixture
+def names(reference):
+    drug_names = [*reference.drug_names, 'Unknown-drug']
+    return [drug_names[i * 13 % len(drug_names)] for i in range(2_000)]
+
+
+@pytest.mark.parametrize('out_format', ['csv', 'parquet'])
+def test_append_matches_full_reclassification(tmp_path, names, out_format):
+    cache = ResultCache(tmp_path / 'cache')
+    extract = tmp_path / 'extract.csv'
+
+    write_extract(extract, names[:1_500])
+    first = cache.classify_file(str(extract), str(tmp_path / f'first.{out_format}'), chunksize=400)
+    assert first['cache'] == 'miss'
+
+    write_extract(extract, names[1_500:], start=1_500)
+    appended = cache.classify_file(str(extract), str(tmp_path / f'appended.{out_format}'), chunksize=400)
+    assert appended['cache'] == 'append'
+    assert appended['classified_rows'] == 500
+
+    full = classify_file(str(extract), str(tmp_path / f'full.{out_format}'), chunksize=400)
+    assert {name: appended[name] for name in ('rows', 'matched', 'unmatched')} == full
+
+    read = pd.read_csv if out_format == 'csv' else pd.read_parquet
+    pd.testing.assert_frame_equal(read(tmp_path / f'appended.{out_format}'), read(tmp_path / f'full.{out_format}'))
+
+    hit = cache.classify_file(str(extract), str(tmp_path / f'hit.{out_format}'))
+    assert hit['cache'] == 'hit'
+    assert hit['classified_rows'] == 0
+    pd.testing.assert_frame_equal(read(tmp_path / f'hit.{out_format}'), read(tmp_path / f'full.{out_format}'))
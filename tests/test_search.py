@@ -0,0 +1,49 @@
+"""SearchIndex.filter against the str.contains filters of the Database View"""
+import pytest
+
+from aware.classifier import text_columns
+
+QUERIES = ['', 'a', 'ce', 'cef', 'CEF', 'cillin', 'j01', 'J01DD', 'glyco', 'amikacin', 'zzz', 'penem']
+
+FILTERS = [
+    ((), ()),
+    (('Access',), ()),
+    (('Watch', 'Reserve'), ()),
+    ((), ('Yes',)),
+    (('Reserve',), ('No',)),
+]
+
+
+def old_filter(drug_db, categories, eml, query):
+    filtered_db = drug_db
+    if categories:
+        filtered_db = filtered_db[filtered_db['Category'].isin(categories)]
+    if eml:
+        filtered_db = filtered_db[filtered_db['EML'].isin(eml)]
+    if query:
+        search_lower = query.lower()
+        filtered_db = filtered_db[
+            filtered_db['Antibiotic'].str.lower().str.contains(search_lower, regex=False) |
+            filtered_db['Class'].str.lower().str.contains(search_lower, regex=False) |
+            filtered_db['ATC'].str.lower().str.contains(search_lower, regex=False)
+        ]
+    return filtered_db
+
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('categories, eml', FILTERS)
+def test_filter_matches_str_contains(reference, categories, eml, query):
+    drug_db = text_columns(reference.drug_db)
+    expected = old_filter(drug_db, categories, eml, query)
+
+    filtered = reference.search_index.filter(categories, eml, query)
+
+    assert filtered.index.tolist() == expected.index.tolist()
+    assert text_columns(filtered).equals(expected)
+
+
+def test_atc_prefix_filter(reference):
+    drug_db = text_columns(reference.drug_db)
+    expected = drug_db[drug_db['ATC'].str.startswith('J01C')]
+
+    assert reference.search_index.filter(atc_prefix=' j01c ').index.tolist() == expected.index.tolist()